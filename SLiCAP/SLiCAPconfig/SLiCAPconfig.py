@@ -16,6 +16,7 @@ Default values:
 >>> MATHMLPATH  = 'mathml/' # path for mathML output
 >>> IMGPATH     = 'img/'    # path for image files
 >>> SPHINXPATH  = 'sphinx/' # path for Sphinx output
+>>> CACHEPATH   = 'cache/'  # path for cached results
 """
 PROJECTPATH = None      # Leave it for automatic detection
 # PATHS: relative to the project path
@@ -27,4 +28,5 @@ CSVPATH     = 'csv/'    # path for CSV files
 LATEXPATH   = 'tex/'    # path for LaTeX output
 MATHMLPATH  = 'mathml/' # path for mathML output
 IMGPATH     = 'img/'    # path for image files
-SPHINXPATH  = 'sphinx/' # path for Sphinx output
\ No newline at end of file
+SPHINXPATH  = 'sphinx/' # path for Sphinx output
+CACHEPATH   = 'cache/'  # path for cached results
\ No newline at end of file
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SLiCAP module with determinant decision diagrams (DDDs) for symbolic analysis
+of large circuits.
+
+A DDD is a signed, rooted, directed acyclic graph of which each nonterminal
+node represents a nonzero entry a_ij of a square matrix M. The determinant of
+the (sub)matrix represented by a node is:
+
+    D(node) = sign * a_ij * D(one) + D(zero)
+
+The 1-edge (one) points to the node that represents the minor obtained by
+deleting row i and column j, the 0-edge (zero) points to the node that
+represents the matrix in which a_ij is set to zero. Minors that coincide are
+represented by the same node; the number of nodes of the diagram is usually
+orders of magnitude smaller than the number of terms of the expanded
+determinant.
+
+The expanded determinant is never calculated. Numeric evaluation, term
+counting, extraction of the coefficients of the Laplace variable and
+enumeration of dominant terms are performed with one pass over the nodes.
+
+Imported by the module **SLiCAPplots.py**
+"""
+from SLiCAP.SLiCAPnumeric import *
+
+DDDZERO = 0
+"""
+Index of the 0-terminal of a DDD.
+"""
+
+DDDONE  = 1
+"""
+Index of the 1-terminal of a DDD.
+"""
+
+class ddd(object):
+    """
+    Determinant decision diagram of a square matrix.
+
+    The rows and the entries of each row are expanded in the reverse
+    Cuthill-McKee order of the sparsity pattern of the matrix. This order
+    reduces the bandwidth of the matrix and with that the number of distinct
+    minors.
+
+    :param M: Square matrix
+    :type M: sympy.Matrix, sympy.SparseMatrix
+
+    :Example:
+
+    >>> M = sp.Matrix([[a, b], [c, d]])
+    >>> D = ddd(M)
+    >>> D.evaluate()
+    a*d - b*c
+    >>> D.numTerms()
+    2
+    """
+    def __init__(self, M):
+        self.entries = []
+        """
+        List with nonzero entries (row, col, value) of the matrix.
+        """
+
+        self.nodes = [None, None]
+        """
+        List with nodes (entry, sign, one, zero); entry is the index of the
+        entry in **self.entries**, sign is 1 or -1, one and zero are the
+        indices of the child nodes. Child nodes always precede their parents.
+        Nodes 0 and 1 are the 0-terminal and the 1-terminal, respectively.
+        """
+
+        self.root = DDDZERO
+        """
+        Index of the node that represents the determinant of the matrix.
+        """
+
+        self._unique = {}
+        self._build(M)
+        del self._unique
+
+    def _build(self, M):
+        """
+        Builds the diagram.
+
+        :param M: Square matrix
+        :type M: sympy.Matrix, sympy.SparseMatrix
+        """
+        dim = M.shape[0]
+        if M.shape[1] != dim:
+            raise TypeError("Error: cannot create a DDD of a non-square matrix.")
+        rowCols = [[] for i in range(dim)]
+        colRows = [0 for j in range(dim)]
+        for (i, j), value in M.todok().items():
+            if value.is_zero is not True:
+                rowCols[i].append(j)
+                colRows[j] |= 1 << i
+        # Bandwidth reduction keeps the number of distinct minors small
+        rows = [i for i in range(dim) for j in rowCols[i]]
+        cols = [j for i in range(dim) for j in rowCols[i]]
+        pattern = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(dim, dim))
+        rowOrder = [int(i) for i in reverse_cuthill_mckee((pattern + pattern.T).tocsr(), symmetric_mode=True)]
+        position = [0 for i in range(dim)]
+        for k in range(dim):
+            position[rowOrder[k]] = k
+        rowEntries = [[] for i in range(dim)]
+        for i in rowOrder:
+            for j in sorted(rowCols[i], key=lambda j: position[j]):
+                rowEntries[i].append(len(self.entries))
+                self.entries.append((i, j, M[i, j]))
+        cache = {}
+
+        def build(level, rowMask, colMask, k):
+            # level: number of expanded rows, k: position in the current row
+            if level == dim:
+                return DDDONE
+            key = (rowMask, colMask, k)
+            if key in cache:
+                return cache[key]
+            i = rowOrder[level]
+            entries = rowEntries[i]
+            while k < len(entries) and not colMask >> self.entries[entries[k]][1] & 1:
+                k += 1
+            if k == len(entries):
+                node = DDDZERO
+            else:
+                j = self.entries[entries[k]][1]
+                newColMask = colMask & ~(1 << j)
+                newRowMask = rowMask & ~(1 << i)
+                one = DDDZERO
+                if all(colRows[c] & newRowMask for c in range(dim) if newColMask >> c & 1):
+                    one = build(level + 1, newRowMask, newColMask, 0)
+                zero = build(level, rowMask, colMask, k + 1)
+                if one == DDDZERO:
+                    node = zero
+                else:
+                    p = bin(rowMask & ((1 << i) - 1)).count('1')
+                    q = bin(colMask & ((1 << j) - 1)).count('1')
+                    node = self._node(entries[k], (-1)**(p + q), one, zero)
+            cache[key] = node
+            return node
+
+        if dim > 0:
+            self.root = build(0, (1 << dim) - 1, (1 << dim) - 1, 0)
+        else:
+            self.root = DDDONE
+
+    def _node(self, entry, sign, one, zero):
+        """
+        Returns the index of the node (entry, sign, one, zero), after creating
+        it if it does not exist.
+        """
+        key = (entry, sign, one, zero)
+        if key not in self._unique:
+            self._unique[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self._unique[key]
+
+    def size(self):
+        """
+        Returns the number of nonterminal nodes of the diagram.
+
+        :return: Number of nonterminal nodes
+        :rtype: int
+        """
+        return len(self.nodes) - 2
+
+    def numTerms(self):
+        """
+        Returns the number of product terms of the expanded determinant,
+        before cancellation of terms. Each entry counts with the number of
+        terms of its expanded value.
+
+        :return: Number of terms
+        :rtype: int
+        """
+        entryTerms = [len(sp.Add.make_args(sp.expand(value))) for (i, j, value) in self.entries]
+        terms = [0, 1]
+        for entry, sign, one, zero in self.nodes[2:]:
+            terms.append(entryTerms[entry]*terms[one] + terms[zero])
+        return terms[self.root]
+
+    def evaluate(self, values=None):
+        """
+        Returns the determinant as a nested (not expanded) expression.
+
+        :param values: Dictionary with key-value pairs:
+
+                       - key: *sympy.Symbol*: parameter
+                       - value: *int, float, sympy.Expr*: value of the parameter
+
+                       The values are substituted in the matrix entries.
+                       Defaults to None.
+        :type values: dict
+
+        :return: Determinant
+        :rtype: sympy.Expr
+        """
+        entryValues = [value for (i, j, value) in self.entries]
+        if values:
+            entryValues = [sp.sympify(value).xreplace(values) for value in entryValues]
+        result = [sp.S.Zero, sp.S.One]
+        for entry, sign, one, zero in self.nodes[2:]:
+            result.append(sign*entryValues[entry]*result[one] + result[zero])
+        return result[self.root]
+
+    def difference(self, valuesA, valuesB):
+        """
+        Returns the determinant D_A obtained with the parameter values
+        'valuesA' and the difference D_B - D_A, in which D_B is the
+        determinant obtained with the parameter values 'valuesB'.
+
+        The difference is propagated through the diagram:
+
+            delta(node) = sign*(a_B*delta(one) + (a_B - a_A)*D_A(one)) + delta(zero)
+
+        hence terms that cancel in D_B - D_A are never formed. This is used
+        for the calculation of the loop gain, of which the references enter
+        the matrix as rank-one updates.
+
+        :param valuesA: Dictionary with key-value pairs:
+
+                        - key: *sympy.Symbol*: parameter
+                        - value: *int, float, sympy.Expr*: value of the parameter
+        :type valuesA: dict
+
+        :param valuesB: Dictionary with key-value pairs (see valuesA)
+        :type valuesB: dict
+
+        :return: Tuple with D_A and D_B - D_A as nested expressions
+        :rtype: tuple
+        """
+        entryA = [sp.sympify(value).xreplace(valuesA) for (i, j, value) in self.entries]
+        entryB = [sp.sympify(value).xreplace(valuesB) for (i, j, value) in self.entries]
+        entryDelta = [entryB[k] - entryA[k] for k in range(len(self.entries))]
+        detA = [sp.S.Zero, sp.S.One]
+        delta = [sp.S.Zero, sp.S.Zero]
+        for entry, sign, one, zero in self.nodes[2:]:
+            detA.append(sign*entryA[entry]*detA[one] + detA[zero])
+            delta.append(sign*(entryB[entry]*delta[one] + entryDelta[entry]*detA[one]) + delta[zero])
+        return detA[self.root], delta[self.root]
+
+    def coeffs(self, var=ini.Laplace):
+        """
+        Returns the coefficients of the determinant as a polynomial in 'var'.
+        The coefficients are nested (not expanded) expressions.
+
+        :param var: Indeterminate, defaults to ini.Laplace
+        :type var: sympy.Symbol
+
+        :return: List with coefficients in ascending order of 'var', or None
+                 if an entry is not a polynomial in 'var'.
+        :rtype: list, NoneType
+        """
+        entryCoeffs = []
+        for (i, j, value) in self.entries:
+            if value.has(var):
+                try:
+                    entryCoeffs.append(sp.Poly(value, var).all_coeffs()[::-1])
+                except sp.PolynomialError:
+                    return None
+            else:
+                entryCoeffs.append([value])
+        result = [[], [sp.S.One]]
+        for entry, sign, one, zero in self.nodes[2:]:
+            a = entryCoeffs[entry]
+            b = result[one]
+            terms = [[] for k in range(max(len(a) + len(b) - 1, len(result[zero])))]
+            for k in range(len(result[zero])):
+                terms[k].append(result[zero][k])
+            for k in range(len(a)):
+                if a[k] != 0:
+                    for m in range(len(b)):
+                        terms[k + m].append(sign*a[k]*b[m])
+            result.append([sp.Add(*termList) for termList in terms])
+        coeffs = result[self.root]
+        while len(coeffs) and coeffs[-1] == 0:
+            coeffs = coeffs[:-1]
+        return coeffs
+
+    def poly(self, var=ini.Laplace):
+        """
+        Returns the determinant as a polynomial in 'var' with nested (not
+        expanded) coefficients.
+
+        :param var: Indeterminate, defaults to ini.Laplace
+        :type var: sympy.Symbol
+
+        :return: Determinant, or None if an entry is not a polynomial in
+                 'var'.
+        :rtype: sympy.Expr, NoneType
+        """
+        coeffs = self.coeffs(var)
+        if coeffs == None:
+            return None
+        return sp.Add(*[coeffs[k]*var**k for k in range(len(coeffs))])
+
+    def dominantTerms(self, values, num=10, var=None, order=0):
+        """
+        Returns the product terms of the expanded determinant with the largest
+        magnitude, in order of decreasing magnitude.
+
+        If 'var' is given, only the terms of the coefficient of var**order are
+        returned and 'var' is not included in the terms.
+
+        Terms are enumerated with a best-first search over the diagram, in
+        which the largest magnitude of the terms below each node is an exact
+        bound; the determinant is never expanded. Terms that cancel each other
+        in the expanded determinant are both returned.
+
+        :param values: Dictionary with key-value pairs:
+
+                       - key: *sympy.Symbol*: parameter
+                       - value: *int, float*: value of the parameter
+
+                       All parameters, except 'var', must have numeric values.
+        :type values: dict
+
+        :param num: Maximum number of terms, defaults to 10
+        :type num: int
+
+        :param var: Indeterminate, defaults to None
+        :type var: sympy.Symbol, NoneType
+
+        :param order: Order of 'var', defaults to 0
+        :type order: int
+
+        :return: List with tuples (term, value) with the term and its value
+                 as sympy expressions
+        :rtype: list
+        """
+        # List with (term, power of var, log of magnitude) per entry
+        entryTerms = []
+        for (i, j, value) in self.entries:
+            terms = []
+            for term in sp.Add.make_args(sp.expand(value)):
+                if var != None:
+                    coeff, power = term.as_coeff_exponent(var)
+                    if coeff.has(var):
+                        print("Error: entry '%s' is not a polynomial in '%s'."%(str(value), str(var)))
+                        return []
+                    term = coeff
+                else:
+                    power = 0
+                magnitude = sp.N(sp.Abs(sp.sympify(term).xreplace(values)))
+                if not magnitude.is_number:
+                    print("Error: cannot determine the magnitude of '%s'."%(str(term)))
+                    return []
+                if magnitude != 0:
+                    terms.append((term, int(power), float(sp.log(magnitude))))
+            entryTerms.append(terms)
+        # Logarithm of the largest magnitude per power of var below each node;
+        # logarithms prevent underflow of products with many factors.
+        best = [{}, {0: 0.0}]
+        for entry, sign, one, zero in self.nodes[2:]:
+            nodeBest = dict(best[zero])
+            for term, power, logMagnitude in entryTerms[entry]:
+                for p, m in best[one].items():
+                    value = logMagnitude + m
+                    if power + p not in nodeBest or value > nodeBest[power + p]:
+                        nodeBest[power + p] = value
+            best.append(nodeBest)
+        # Best-first search
+        found = []
+        counter = 0
+        heap = []
+        if order in best[self.root]:
+            heap.append((-best[self.root][order], counter, self.root, order, 0.0, 1, ()))
+        while len(heap) and len(found) < num:
+            bound, count, node, rem, logMagnitude, sign, factors = heappop(heap)
+            if node == DDDONE:
+                term = sign*sp.Mul(*factors)
+                found.append((term, sp.N(term.xreplace(values))))
+                continue
+            entry, nodeSign, one, zero = self.nodes[node]
+            if rem in best[zero]:
+                counter += 1
+                heappush(heap, (-(logMagnitude + best[zero][rem]), counter, zero, rem,
+                                logMagnitude, sign, factors))
+            for term, power, termLog in entryTerms[entry]:
+                if rem - power in best[one]:
+                    counter += 1
+                    heappush(heap, (-(logMagnitude + termLog + best[one][rem - power]), counter,
+                                    one, rem - power, logMagnitude + termLog, sign*nodeSign,
+                                    factors + (term,)))
+        return found
+
+def dddNumer(M, Iv, detP, detN):
+    """
+    Returns the DDD of the numerator of the detector voltage or current:
+
+    numer = det(M_P) - det(M_N)
+
+    in which M_P and M_N are obtained from M by replacing the detector columns
+    detP and detN, respectively, with the vector Iv. This equals the negative
+    determinant of M augmented with Iv as last column and with the detector
+    row as last row, which is represented by one diagram.
+
+    :param M: MNA matrix
+    :type M: sympy.Matrix, sympy.SparseMatrix
+
+    :param Iv: Vector with independent variables
+    :type Iv: sympy.Matrix
+
+    :param detP: Number (1 .. dim) of the positive detector column, 0 if
+                 there is no positive detector
+    :type detP: int
+
+    :param detN: Number (1 .. dim) of the negative detector column, 0 if
+                 there is no negative detector
+    :type detN: int
+
+    :return: Tuple with the diagram and its sign
+    :rtype: tuple
+    """
+    dim = M.shape[0]
+    entries = dict(M.todok())
+    for i in range(dim):
+        if Iv[i] != 0:
+            entries[(i, dim)] = Iv[i]
+    if detP != 0:
+        entries[(dim, detP - 1)] = sp.S.One
+    if detN != 0:
+        entries[(dim, detN - 1)] = -sp.S.One
+    return ddd(sp.SparseMatrix(dim + 1, dim + 1, entries)), -1
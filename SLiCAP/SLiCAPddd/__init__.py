@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Spyder Editor
+
+"""
+from .SLiCAPddd import *
\ No newline at end of file
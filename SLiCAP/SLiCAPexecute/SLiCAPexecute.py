@@ -41,12 +41,17 @@ def createResultObject(instr):
         if type(row) == list:
             rowCopy = [num for num in row]
             result.stepArray.append(rowCopy)
+    result.stepGrid       = [axis for axis in instr.stepGrid]
     result.source         = instr.source
     if type(instr.detector) == list:
         # Make a deep copy of the detector list
         result.detector       = [detector for detector in instr.detector]
     else:
         result.detector = instr.detector
+    if type(instr.sources) == list:
+        result.sources = [source for source in instr.sources]
+    if type(instr.detectors) == list:
+        result.detectors = [detector for detector in instr.detectors]
     result.lgRef          = instr.lgRef
     result.circuit        = instr.circuit
     result.errors         = instr.errors
@@ -62,7 +67,7 @@ def createResultObject(instr):
             result.parDefs[key] = instr.parDefs[key]
     return result
 
-def makeMaxDetPos(instr, result):
+def makeMaxDetPos(instr, result, detector=None):
     """
     Returns the index of the detector colum(s) for calculation of Cramer's rule.
 
@@ -72,6 +77,10 @@ def makeMaxDetPos(instr, result):
     :param result: **allResults()** object that holds instruction results
     :type result: :class:`allResult()`
 
+    :param detector: List with the names of the positive and the negative
+                     detector; defaults to result.detector.
+    :type detector: list, NoneType
+
     :return: tuple: (detP, detN):
 
                     - detP (*int, int*): number of the row of the vector with dependent
@@ -83,7 +92,9 @@ def makeMaxDetPos(instr, result):
     """
 
     detectors = [str(var) for var in list(result.Dv)]
-    detP, detN = result.detector
+    if detector == None:
+        detector = result.detector
+    detP, detN = detector
     if detP != None:
         try:
             detP = detectors.index(detP) + 1
@@ -137,12 +148,15 @@ def doInstruction(instr):
                         instr.circuit.elements[instr.lgRef[i]].params['value'] = sp.N(0)
                     else:
                         instr.circuit.elements[instr.lgRef[i]].params['value'] = sp.Symbol("_LGREF_" + str(i+1))
+                    instr.circuit.mnaTemplate = None
         if instr.dataType == 'numer':
             result = doNumer(instr, result)
         elif instr.dataType == 'denom':
             result = doDenom(instr, result)
         elif result.dataType == 'laplace':
             result = doLaplace(instr, result)
+        elif instr.dataType == 'ac':
+            result = doAC(instr, result)
         elif instr.dataType == 'poles':
             result = doPoles(instr, result)
         elif instr.dataType == 'zeros':
@@ -169,6 +183,8 @@ def doInstruction(instr):
             result = doTimeSolve(instr, result)
         elif instr.dataType == 'matrix':
             result = doMatrix(instr, result)
+        elif instr.dataType == 'transfermatrix':
+            result = doTransferMatrix(instr, result)
         elif instr.dataType == 'params':
             pass
         else:
@@ -183,6 +199,7 @@ def doInstruction(instr):
             for i in range(len(instr.lgRef)):
                 if instr.lgRef[i] != None:
                     instr.circuit.elements[instr.lgRef[i]].params['value'] = instr.lgValue[i]
+                    instr.circuit.mnaTemplate = None
     return result
 
 def doNumer(instr, result):
@@ -208,25 +225,23 @@ def doNumer(instr, result):
                 numer, denom = sp.fraction(doLoopGainServo(instr, result))
             else:
                 numer = doMaxInstr(instr, result).numer[0]
-            result.numer = stepFunctions(instr.stepDict, sp.simplify(numer))
+            result.numer = stepFunctions(instr.stepDict, simplifyResult(numer))
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+            def stepNumer(instr, result):
                 if instr.gainType == 'loopgain' or instr.gainType == 'servo':
                     numer, denom = sp.fraction(doLoopGainServo(instr, result))
                     result.numer.append(numer)
                 else:
                     result = doMaxInstr(instr, result)
+                return result
+            result = stepInstruction(instr, result, stepNumer)
     else:
         if instr.gainType == 'loopgain' or instr.gainType == 'servo':
             doLoopGainServo(instr, result)
         else:
             result = doMaxInstr(instr, result)
         result.numer = result.numer[0]
-        result.numer = sp.simplify(result.numer)
+        result.numer = simplifyResult(result.numer)
     result = correctDMcurrentResult(instr, result)
     return result
 
@@ -253,25 +268,23 @@ def doDenom(instr, result):
                 numer, denom = sp.fraction(doLoopGainServo(instr, result))
             else:
                 denom = doMaxInstr(instr, result).denom[0]
-            result.denom = stepFunctions(instr.stepDict, sp.simplify(denom))
+            result.denom = stepFunctions(instr.stepDict, simplifyResult(denom))
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                if instr.gainType == 'loopgain' or instr.dataType == 'servo':
+            def stepDenom(instr, result):
+                if instr.gainType == 'loopgain' or instr.gainType == 'servo':
                     numer, denom = sp.fraction(doLoopGainServo(instr, result))
                     result.denom.append(denom)
                 else:
                     result = doMaxInstr(instr, result)
+                return result
+            result = stepInstruction(instr, result, stepDenom)
     else:
         if instr.gainType == 'loopgain' or instr.gainType == 'servo':
             doLoopGainServo(instr, result)
         else:
             result = doMaxInstr(instr, result)
         result.denom = result.denom[0]
-        result.denom = sp.simplify(result.denom)
+        result.denom = simplifyResult(result.denom)
     return result
 
 def doLaplace(instr, result):
@@ -296,30 +309,119 @@ def doLaplace(instr, result):
                 laplaceFunc = doLoopGainServo(instr, result)
             else:
                 result = doMaxInstr(instr, result)
-                laplaceFunc = sp.simplify(result.laplace[0])
+                laplaceFunc = simplifyResult(result.laplace[0])
             result.laplace = stepFunctions(instr.stepDict, laplaceFunc)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+            def stepLaplace(instr, result):
                 if instr.gainType == 'loopgain' or instr.gainType == 'servo':
                     result.laplace.append(doLoopGainServo(instr, result))
                 else:
                     result = doMaxInstr(instr, result)
-        result.laplace[-1] = sp.simplify(result.laplace[-1])
+                return result
+            result = stepInstruction(instr, result, stepLaplace)
+            result.laplace[-1] = simplifyResult(result.laplace[-1])
     else:
         if instr.gainType == 'loopgain' or instr.gainType == 'servo':
             result.laplace = doLoopGainServo(instr, result)
         else:
             result = doMaxInstr(instr, result)
             result.laplace = result.laplace[0]
-        result.laplace =sp.simplify(result.laplace)
+        result.laplace =simplifyResult(result.laplace)
         result.numer, result.denom = sp.fraction(result.laplace)
     result = correctDMcurrentResult(instr, result)
     return result
 
+def doAC(instr, result):
+    """
+    Returns the numeric frequency response of a transfer function, or of a
+    detector voltage or current.
+
+    The matrix equation is solved numerically at the frequencies at which the
+    response is required. The **.ac** attribute of the return object holds an
+    **SLiCAPnumeric.acResponse()** object of which the method
+    **response(<frequencies>)** returns the complex response at the given
+    frequencies. In cases of parameter stepping, this attribute is a list
+    with these objects.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Result of the execution of the instruction.
+    :rtype: SLiCAPprotos.allResults()
+    """
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        print("Error: dataType 'ac' not available for gainType: '{0}'.".format(instr.gainType))
+        result.errors += 1
+    elif instr.step:
+        stepVars = list(instr.stepDict.keys())
+        numSteps = len(instr.stepDict[stepVars[0]])
+        for i in range(numSteps):
+            for j in range(len(stepVars)):
+                instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+            result.ac.append(makeACresponse(instr, result))
+    else:
+        result.ac = makeACresponse(instr, result)
+    return result
+
+def makeACresponse(instr, result):
+    """
+    Returns the numeric frequency response of the detector.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Frequency response, or None if the matrix equation has other
+             parameters than the Laplace variable.
+    :rtype: SLiCAPnumeric.acResponse, NoneType
+    """
+    s = ini.Laplace
+    result = makeMaxMatrices(instr, result)
+    Mk = polyMatrix(result.M, s)
+    rhs = polyRHS(result.Iv, s)
+    if Mk is None or rhs is None:
+        print("Error: dataType 'ac' requires a matrix equation without other parameters than the Laplace variable.")
+        result.errors += 1
+        return None
+    Bk, denomIv = rhs
+    lhs = makeNumDetRow(instr, result)
+    if lhs is None:
+        return None
+    denom = None
+    if denomIv != 1:
+        denom = sp.Poly(denomIv, s).all_coeffs()[::-1]
+    return acResponse(Mk, Bk, lhs, denom)
+
+def makeNumDetRow(instr, result):
+    """
+    Returns the detector row for numeric evaluation of the matrix equation.
+
+    In cases of a differential-mode current detector the row is divided by
+    two: I_diff = (I_P - I_N)/2, as with correctDMcurrentResult().
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Detector row with shape (1, n), or None in cases of errors
+    :rtype: numpy.ndarray, NoneType
+    """
+    detP, detN = makeMaxDetPos(instr, result)
+    if instr.errors != 0:
+        return None
+    lhs = detectorRow(result.M.shape[0], detP, detN)
+    if instr.convType == None and instr.detector[0] != None and instr.detector[1] != None:
+        if instr.detector[0][0] == 'I':
+            lhs = lhs/2
+    return lhs
+
 def doLoopGainServo(instr, result):
     """
     Returns the Laplace expression of the loop gain of the asymptotic-gain
@@ -359,6 +461,12 @@ def doMaxLoopGainServo(instr, result):
     Returns a tuple with the numerator and the denominator of the loop gain or
     the servo function; depeding on the gain type.
 
+    The determinant of the MNA matrix is linear in each loop gain reference.
+    Only one determinant is calculated; its change due to the references is
+    obtained from the cofactors of the references, with Maxima CAS (see
+    lgDets() in SLiCAP_python.mac) or, if ini.dddEngine is True, with a
+    determinant decision diagram (see ddd.difference()).
+
     :param instr: **instruction()** object that holds instruction data.
     :type instr: :class:`instruction()`
 
@@ -369,7 +477,6 @@ def doMaxLoopGainServo(instr, result):
     :rtype: tuple with two sympy expressions
     """
     makeMaxMatrices(instr, result)
-    Matrix_ = python2maxima(result.M)
     if instr.lgValue[0] != None:
         lg1 = instr.lgValue[0]
     else:
@@ -392,6 +499,17 @@ def doMaxLoopGainServo(instr, result):
     if instr.numeric:
         lg1 = fullSubs(lg1, instr.parDefs)
         lg2 = fullSubs(lg2, instr.parDefs)
+    if ini.dddEngine:
+        # The loop gain references enter the matrix as rank-one updates,
+        # the change of the determinant is obtained without cancellation.
+        refs = [sp.Symbol('_LGREF_1'), sp.Symbol('_LGREF_2')]
+        D_0, delta = ddd(result.M).difference({refs[0]: 0, refs[1]: 0}, {refs[0]: lg1, refs[1]: lg2})
+        if instr.gainType == 'loopgain':
+            numer, denom = -delta, D_0
+        elif instr.gainType == 'servo':
+            numer, denom = delta, D_0 + delta
+        return numer, denom
+    Matrix_ = python2maxima(result.M)
     if instr.gainType == 'loopgain':
         maxResult = doMaxFunction('doLoopGain', [Matrix_, lg1, lg2])
         numer, denom = sp.fraction(maxResult)
@@ -409,12 +527,18 @@ def doPoles(instr, result):
     :param result: **allResults()** object that holds instruction results
     :type result: :class:`allResult()`
     """
+    numResult = doNumPZ(instr, result)
+    if numResult != None:
+        return numResult
     instr.dataType = "denom"
     result.dataType = "denom"
     result = doDenom(instr, result)
     if instr.step:
-        for poly in result.denom:
-            result.poles.append(numRoots(poly, ini.Laplace))
+        if isinstance(result.denom, steppedRational):
+            result.poles = result.denom.roots('numer')
+        else:
+            for poly in result.denom:
+                result.poles.append(numRoots(poly, ini.Laplace))
         instr.dataType = "poles"
         result.dataType = "poles"
     else:
@@ -441,12 +565,18 @@ def doZeros(instr, result):
     :param result: **allResults()** object that holds instruction results
     :type result: :class:`allResult()`
     """
+    numResult = doNumPZ(instr, result)
+    if numResult != None:
+        return numResult
     instr.dataType = "numer"
     result.dataType = "numer"
     result = doNumer(instr, result)
     if instr.step:
-        for poly in result.numer:
-            result.zeros.append(numRoots(poly, ini.Laplace))
+        if isinstance(result.numer, steppedRational):
+            result.zeros = result.numer.roots('numer')
+        else:
+            for poly in result.numer:
+                result.zeros.append(numRoots(poly, ini.Laplace))
         instr.dataType = "zeros"
         result.dataType = "zeros"
     else:
@@ -473,10 +603,30 @@ def doPZ(instr, result):
     :param result: **allResults()** object that holds instruction results
     :type result: :class:`allResult()`
     """
+    numResult = doNumPZ(instr, result)
+    if numResult != None:
+        return numResult
     instr.dataType = 'laplace'
     result.dataType = 'laplace'
     result = doLaplace(instr, result)
-    if result.step:
+    if result.step and isinstance(result.laplace, steppedRational):
+        zeros = result.laplace.roots('numer')
+        poles = result.laplace.roots('denom')
+        for i in range(len(result.laplace)):
+            try:
+                poles[i], zeros[i] = cancelPZ(list(poles[i]), list(zeros[i]))
+            except:
+                pass
+            numerValue = result.laplace.numer[i][0]
+            denomValue = result.laplace.denom[i][0]
+            if numerValue == 0 and denomValue == 0:
+                result.DCvalue.append(sp.sympify("undefined"))
+            elif denomValue == 0:
+                result.DCvalue.append(sp.oo)
+            else:
+                result.DCvalue.append(sp.N(numerValue/denomValue))
+        result.poles, result.zeros = poles, zeros
+    elif result.step:
         for i in range(len(result.laplace)):
             numer, denom = sp.fraction(normalizeRational(result.laplace[i]))
             variables = list(numer.atoms(sp.Symbol))
@@ -531,6 +681,107 @@ def doPZ(instr, result):
     result.dataType = 'pz'
     return result
 
+def doNumPZ(instr, result):
+    """
+    Adds the poles and/or the zeros obtained from generalized eigenvalues of
+    the matrix equation (see **SLiCAPnumeric.numEigs()**) to result. The
+    poles are the roots of det(M(s)), the zeros are the roots of the
+    determinant of M(s) augmented with the source vector and the detector
+    row.
+
+    This requires ini.numEngine == True, a numeric instruction and a matrix
+    equation without other parameters than the Laplace variable.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Updated result object, or None if the poles and zeros cannot be
+             obtained in this way. In that case *result* is not modified.
+    :rtype: SLiCAPprotos.allResults(), NoneType
+    """
+    if not (ini.numEngine and instr.numeric) or instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        return None
+    if instr.step:
+        stepVars = list(instr.stepDict.keys())
+        numSteps = len(instr.stepDict[stepVars[0]])
+        oldDefs = {var: instr.parDefs[var] for var in stepVars if var in instr.parDefs}
+        pzList = []
+        for i in range(numSteps):
+            for j in range(len(stepVars)):
+                instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+            pz = makeNumPZ(instr, result)
+            if pz == None:
+                break
+            pzList.append(pz)
+        # Restore the parameter definitions
+        for var in stepVars:
+            if var in oldDefs:
+                instr.parDefs[var] = oldDefs[var]
+            else:
+                instr.parDefs.pop(var, None)
+        if len(pzList) != numSteps:
+            return None
+        for poles, zeros, DCvalue in pzList:
+            result.poles.append(poles)
+            result.zeros.append(zeros)
+            if instr.dataType == 'pz':
+                result.DCvalue.append(DCvalue)
+    else:
+        pz = makeNumPZ(instr, result)
+        if pz == None:
+            return None
+        result.poles, result.zeros, DCvalue = pz
+        if instr.dataType == 'pz':
+            result.DCvalue = DCvalue
+    return result
+
+def makeNumPZ(instr, result):
+    """
+    Returns the poles, the zeros and the zero-frequency gain of a numeric
+    instruction with data type 'poles', 'zeros' or 'pz'.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Tuple with a list with poles, a list with zeros and the
+             zero-frequency gain (None if not calculated), or None if the
+             matrix equation has other parameters than the Laplace variable.
+    :rtype: tuple, NoneType
+    """
+    s = ini.Laplace
+    result = makeMaxMatrices(instr, result)
+    Mk = polyMatrix(result.M, s)
+    if Mk is None or Mk.shape[1] != Mk.shape[2]:
+        return None
+    poles = []
+    zeros = []
+    DCvalue = None
+    if instr.dataType == 'poles' or instr.dataType == 'pz':
+        poles = list(numEigs(Mk))
+    if instr.dataType == 'zeros' or instr.dataType == 'pz':
+        rhs = polyRHS(result.Iv, s)
+        if rhs is None:
+            return None
+        Bk, denomIv = rhs
+        lhs = makeNumDetRow(instr, result)
+        if lhs is None:
+            return None
+        zeros = list(numEigs(augmentedMatrix(Mk, Bk, lhs)))
+        if instr.dataType == 'pz':
+            if denomIv != 1:
+                poles += list(numRoots(denomIv, s))
+            poles, zeros = cancelPZ(poles, zeros)
+            DCvalue = numDCgain(Mk, Bk, lhs)
+            if denomIv != 1 and DCvalue.is_number:
+                DCvalue = DCvalue/denomIv.subs(s, 0)
+    return poles, zeros, DCvalue
+
 def calcNumer(instr, result):
     """
     Calculates the numerator of the source-detector gain.
@@ -575,14 +826,11 @@ def doNoise(instr, result):
                 result.onoiseTerms[srcName] = stepFunctions(instr.stepDict, noiseResult.onoiseTerms[srcName][0])
                 result.inoiseTerms[srcName] = stepFunctions(instr.stepDict, noiseResult.inoiseTerms[srcName][0])
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
+            def stepNoise(instr, result):
                 if instr.source != [None, None]:
                     result = calcNumer(instr, result)
-                result = doMaxInstr(instr, result)
+                return doMaxInstr(instr, result)
+            result = stepInstruction(instr, result, stepNoise)
     else:
         if instr.source != [None, None]:
             result = calcNumer(instr, result)
@@ -630,14 +878,10 @@ def doDCvar(instr, result):
                 result.ivarTerms[srcName] = stepFunctions(instr.stepDict, varResult.ivarTerms[srcName][0])
             delDCvarSources(instr)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
+            def stepDCvar(instr, result):
                 instr.dataType = 'dcsolve'
                 result.dataType = 'dcsolve'
-                result.dcSolve = doMaxInstr(instr, result).dcSolve[i]
+                result.dcSolve = doMaxInstr(instr, result).dcSolve[-1]
                 instr.dataType = 'dcvar'
                 result.dataType = 'dcvar'
                 if instr.source != [None, None]:
@@ -645,6 +889,8 @@ def doDCvar(instr, result):
                 addDCvarSources(instr, result.dcSolve)
                 result = doMaxInstr(instr, result)
                 delDCvarSources(instr)
+                return result
+            result = stepInstruction(instr, result, stepDCvar)
     else:
         instr.dataType = 'dcsolve'
         result.dataType = 'dcsolve'
@@ -1010,12 +1256,7 @@ def doSolve(instr, result):
             sol = doMaxInstr(instr, result).solve[0]
             result.solve = stepFunctions(instr.stepDict, sol)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                result.solve.append(doMaxInstr(instr, result))
+            result = stepInstruction(instr, result, doMaxInstr)
     else:
         result.solve = doMaxInstr(instr, result).solve[0]
     return result
@@ -1039,12 +1280,7 @@ def doDCsolve(instr, result):
             sol = doMaxInstr(instr, result).dcSolve[0]
             result.dcSolve = stepFunctions(instr.stepDict, sol)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                result.dcSolve.append(doMaxInstr(instr, result))
+            result = stepInstruction(instr, result, doMaxInstr)
     else:
         result.dcSolve = doMaxInstr(instr, result).dcSolve[0]
     return result
@@ -1066,12 +1302,7 @@ def doTimeSolve(instr, result):
             sol = doMaxInstr(instr, result).timeSolve[0]
             result.timeSolve = stepFunctions(instr.stepDict, sol)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
-                result.timeSolve.append(doMaxInstr(instr, result))
+            result = stepInstruction(instr, result, doMaxInstr)
     else:
         result.timeSolve = doMaxInstr(instr, result).timeSolve[0]
     return result
@@ -1107,6 +1338,149 @@ def doMatrix(instr, result):
     result = makeMaxMatrices(instr, result)
     return result
 
+def doTransferMatrix(instr, result):
+    """
+    Calculates the transfers from all sources in instr.sources to all
+    detectors in instr.detectors.
+
+    The determinant of the MNA matrix is calculated once; the numerators of
+    all transfers are obtained in the same Maxima CAS call or, if
+    ini.numEngine is True and the instruction is numeric, from one numeric
+    evaluation of the matrix equation (see **SLiCAPnumeric.numCramer()**).
+
+    The results are stored in the following attributes of the result object:
+
+        - **.numer**: matrix with the numerators; row i holds the numerators
+          of the transfers to detector i, column j those of source j.
+        - **.denom**: the common denominator of all transfers.
+        - **.laplace**: matrix with the transfers: .numer/.denom.
+
+    In cases of parameter stepping, these attributes are lists.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Result of the execution of the instruction.
+    :rtype: SLiCAPprotos.allResults()
+    """
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        print("Error: dataType 'transfermatrix' not available for gainType: '{0}'.".format(instr.gainType))
+        result.errors += 1
+    elif instr.step:
+        if ini.stepFunction:
+            numer, denom = makeTransferMatrix(instr, result)
+            result.numer = stepFunctions(instr.stepDict, numer)
+            result.denom = stepFunctions(instr.stepDict, denom)
+        else:
+            def stepTransferMatrix(instr, result):
+                numer, denom = makeTransferMatrix(instr, result)
+                result.numer.append(numer)
+                result.denom.append(denom)
+                return result
+            result = stepInstruction(instr, result, stepTransferMatrix)
+        result.laplace = [result.numer[i]/result.denom[i] for i in range(len(result.denom))]
+    else:
+        result.numer, result.denom = makeTransferMatrix(instr, result)
+        result.laplace = result.numer/result.denom
+    return result
+
+def makeTransferMatrix(instr, result):
+    """
+    Returns the matrix with numerators and the common denominator of the
+    transfers from instr.sources to instr.detectors.
+
+    The NumPy engine (ini.numEngine) and the DDD engine (ini.dddEngine) are
+    tried in this order; Maxima CAS is used if neither of them succeeds.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Tuple with the matrix with numerators and the denominator
+    :rtype: tuple with sympy.Matrix and sympy.Expr
+    """
+    s = ini.Laplace
+    result = makeMaxMatrices(instr, result)
+    B = makeSrcMatrix(instr, result)
+    dets = [makeMaxDetPos(instr, result, detector) for detector in instr.detectors]
+    p, m = len(dets), len(instr.sources)
+    numer = None
+    if ini.numEngine and instr.numeric:
+        Mk = polyMatrix(result.M, s)
+        if Mk is not None and Mk.shape[1] == Mk.shape[2]:
+            n = Mk.shape[1]
+            lhs = np.vstack([detectorRow(n, detP, detN) for detP, detN in dets])
+            Bk = np.array(B.tolist(), dtype=float).reshape(1, n, m)
+            cramer = numCramer(Mk, Bk, lhs)
+            if cramer is not None:
+                D, N = cramer
+                numer = sp.Matrix(p, m, lambda i, j: coeffs2poly(N[i][j], s))
+                denom = coeffs2poly(D, s)
+    if numer == None and ini.dddEngine:
+        denom = ddd(result.M).poly(s)
+        if denom != None:
+            numer = sp.zeros(p, m)
+            for i in range(p):
+                for j in range(m):
+                    diagram, sign = dddNumer(result.M, B[:, j], dets[i][0], dets[i][1])
+                    poly = diagram.poly(s)
+                    if poly == None:
+                        numer = None
+                        break
+                    numer[i, j] = sign*poly
+                if numer == None:
+                    break
+    if numer == None:
+        detCols = ['[' + str(detP) + ',' + str(detN) + ']' for detP, detN in dets]
+        maxInstr = 'Matrix_: ' + python2maxima(result.M) + '$'
+        maxInstr += 'detCols_: [' + ','.join(detCols) + ']$'
+        maxInstr += 'Iv_: ' + python2maxima(B.transpose()) + '$'
+        maxInstr += maxString('doTransferMatrix(Matrix_,detCols_,Iv_)', instr.numeric)
+        denom, numer = sp.sympify(maxEval(maxInstr))
+        numer = sp.Matrix(numer)
+        if instr.numeric:
+            denom = sp.N(denom)
+            numer = sp.N(numer)
+    # Differential-mode current detectors: I_diff = (I_P - I_N)/2
+    for i in range(p):
+        detP, detN = instr.detectors[i]
+        if detP != None and detN != None and detP[0] == 'I':
+            numer[i, :] = numer[i, :]/2
+    return numer, denom
+
+def makeSrcMatrix(instr, result):
+    """
+    Returns the matrix of which column j is the vector with independent
+    variables for a unit signal at source j of instr.sources.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Matrix with shape (dim(M), number of sources)
+    :rtype: sympy.Matrix
+    """
+    depVars = instr.depVars()
+    B = sp.zeros(result.M.shape[0], len(instr.sources))
+    for j in range(len(instr.sources)):
+        source = instr.sources[j]
+        if source[0].upper() == 'I':
+            nodeP, nodeN = instr.circuit.elements[source].nodes
+            if nodeP != '0':
+                B[depVars.index('V_' + nodeP), j] -= 1
+            if nodeN != '0':
+                B[depVars.index('V_' + nodeN), j] += 1
+        elif source[0].upper() == 'V':
+            B[depVars.index('I_' + source), j] = 1
+    return B
+
 def doMaxIlt(laplaceRational):
     """
     Calculates the inverse Laplace Transform of *laplaceRational* using
@@ -1149,17 +1523,304 @@ def doMaxInstr(instr, result):
     Executes an instruction with Maxima CAS and updates *result* with the
     instruction results.
 
+    If ini.numEngine is True, fully numeric instructions are evaluated with
+    NumPy instead (see doNumInstr()). If ini.dddEngine is True, other
+    instructions of the data types 'numer', 'denom' and 'laplace' are
+    evaluated with determinant decision diagrams (see doDDDInstr()). Other
+    noise analyses are performed with the adjoint method (see
+    doNoiseInstr()).
+
     :param instr: **instruction()** object that holds instruction data.
     :type instr: :class:`instruction()`
 
     :param result: **allResults()** object that holds instruction results
     :type result: :class:`allResult()`
     """
+    if ini.numEngine and instr.numeric and instr.dataType in NUMDATATYPES:
+        numResult = doNumInstr(instr, result)
+        if numResult != None:
+            return numResult
+    if ini.dddEngine and instr.dataType in DDDDATATYPES:
+        dddResult = doDDDInstr(instr, result)
+        if dddResult != None:
+            return dddResult
+    if instr.dataType == 'noise':
+        noiseResult = doNoiseInstr(instr, result)
+        if noiseResult != None:
+            return noiseResult
     maxInstr, result = makeMaxInstr(instr, result)      # Create the maxima instruction
     maxResult = maxEval(maxInstr)                       # Execute the maxima instruction results
     result = parseMaxResult(result, instr.circuit.indepVars, maxResult) # Convert maxima results into SLiCAP results
     return result
 
+NUMDATATYPES = ['numer', 'denom', 'laplace', 'dc', 'solve', 'dcsolve', 'noise']
+"""
+Data types that can be evaluated with NumPy if the matrix equation has no
+other parameters than the Laplace variable.
+"""
+
+def doNumInstr(instr, result):
+    """
+    Executes an instruction with NumPy (see **SLiCAPnumeric.py**) and updates
+    *result* with the instruction results, in the same way as doMaxInstr().
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Updated result object, or None if the matrix equation cannot be
+             evaluated numerically. In that case *result* is not modified and
+             the instruction should be executed with Maxima CAS.
+    :rtype: SLiCAPprotos.allResults(), NoneType
+    """
+    s = ini.Laplace
+    result = makeMaxMatrices(instr, result)
+    Mk = polyMatrix(result.M, s)
+    if Mk is None or Mk.shape[1] != Mk.shape[2]:
+        return None
+    n = Mk.shape[1]
+    if instr.dataType == 'dc' or instr.dataType == 'dcsolve':
+        Iv = result.Iv.subs(s, 0)
+        if Iv.free_symbols:
+            return None
+        x = numDCsolve(Mk, np.array([float(value) for value in Iv]))
+        if x is None:
+            return None
+        if instr.dataType == 'dc':
+            detP, detN = makeMaxDetPos(instr, result)
+            result.dc.append(sp.Float(np.dot(detectorRow(n, detP, detN)[0], x)))
+        else:
+            result.dcSolve.append(sp.Matrix([sp.Float(value) for value in x]))
+        return result
+    if instr.dataType == 'noise':
+        srcVars = instr.circuit.indepVars
+    else:
+        srcVars = None
+    rhs = polyRHS(result.Iv, s, srcVars)
+    if rhs is None:
+        return None
+    Bk, denomIv = rhs
+    if instr.dataType == 'denom':
+        cramer = numCramer(Mk)
+    elif instr.dataType == 'solve':
+        cramer = numCramer(Mk, Bk)
+    else:
+        detP, detN = makeMaxDetPos(instr, result)
+        cramer = numCramer(Mk, Bk, detectorRow(n, detP, detN))
+    if cramer is None:
+        return None
+    D, N = cramer
+    if instr.dataType == 'numer':
+        result.numer.append(coeffs2poly(N[0][0], s)/denomIv)
+    elif instr.dataType == 'denom':
+        result.denom.append(coeffs2poly(D, s))
+    elif instr.dataType == 'laplace':
+        result.laplace.append(coeffs2poly(N[0][0], s)/coeffs2poly(D, s)/denomIv)
+    elif instr.dataType == 'solve':
+        D = coeffs2poly(D, s)*denomIv
+        result.solve.append(sp.Matrix([coeffs2poly(N[i][0], s)/D for i in range(n)]))
+    elif instr.dataType == 'noise':
+        return makeNoiseTerms(instr, result, D, N[0], denomIv, srcVars)
+    return result
+
+def doNoiseInstr(instr, result):
+    """
+    Executes a noise analysis with the adjoint method and updates *result*
+    with the instruction results, in the same way as doMaxInstr().
+
+    The MNA matrix is evaluated once with Maxima CAS: its determinant and one
+    Cramer determinant, with the names of all independent sources in the
+    vector with independent variables, give the numerators of the transfers
+    from all sources to the detector. This equals the solution of the
+    transposed (adjoint) network with a unit source at the detector. The
+    spectra are obtained from these polynomials with makeNoiseTerms(), as
+    with the numeric evaluation in doNumInstr().
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Updated result object, or None if the numerators or the
+             denominator are not polynomials in the Laplace variable. In that
+             case the instruction should be executed with the Maxima CAS
+             function doNoise().
+    :rtype: SLiCAPprotos.allResults(), NoneType
+    """
+    s = ini.Laplace
+    result = makeMaxMatrices(instr, result)
+    detP, detN = makeMaxDetPos(instr, result)
+    srcVars = instr.circuit.indepVars
+    maxInstr = 'Matrix_: ' + python2maxima(result.M) + '$'
+    maxInstr += 'detCols_:[' + str(detP) + ',' + str(detN) + ']$'
+    maxInstr += 'Iv_:' + python2maxima(result.Iv.transpose()) + '$'
+    maxInstr += 'sources_:[' + ','.join(srcVars) + ']$'
+    maxInstr += maxString('doNoiseNumers(Matrix_,detCols_,Iv_,sources_)', instr.numeric)
+    try:
+        D, N = sp.sympify(maxEval(maxInstr))
+        D = sp.Poly(D, s).all_coeffs()[::-1]
+        N = [sp.Poly(numer, s).all_coeffs()[::-1] for numer in N]
+    except (sp.SympifyError, sp.PolynomialError, TypeError, ValueError):
+        return None
+    if instr.numeric:
+        D = [sp.N(coeff) for coeff in D]
+        N = [[sp.N(coeff) for coeff in numer] for numer in N]
+    return makeNoiseTerms(instr, result, D, N, 1, srcVars)
+
+def makeNoiseTerms(instr, result, D, N, denomIv, srcVars):
+    """
+    Adds the detector-referred and the source-referred noise spectra and
+    their contributions to *result*.
+
+    The detector-referred contribution of source j equals:
+
+    |N_j(j.2.pi.f)|^2/|D(j.2.pi.f).denomIv(j.2.pi.f)|^2*S_j
+
+    in which S_j is the noise spectrum of source j. The source-referred
+    contribution is obtained with the numerator of the gain (result.numer)
+    instead of the denominator. The spectra are not factored, this can be
+    done with **allResults.factorNoise()**.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :param D: Coefficients of the determinant in ascending order of s
+    :type D: list
+
+    :param N: List with for each source in *srcVars* the coefficients of the
+              numerator of its transfer to the detector in ascending order of s
+    :type N: list
+
+    :param denomIv: Common denominator of the vector with independent
+                    variables
+    :type denomIv: sympy.Expr
+
+    :param srcVars: Names of the independent sources
+    :type srcVars: list
+
+    :return: Updated result object, or None if the numerator of the gain is
+             not a polynomial in the Laplace variable.
+    :rtype: SLiCAPprotos.allResults(), NoneType
+    """
+    s = ini.Laplace
+    f = ini.frequency
+    numeric = instr.numeric
+    denom = absSquared(D, f, numeric)*absSquared(sp.Poly(denomIv, s).all_coeffs()[::-1], f, numeric)
+    if instr.source != [None, None] and result.numer[0] != 0:
+        try:
+            numer = sp.Poly(result.numer[0], s).all_coeffs()[::-1]
+        except sp.PolynomialError:
+            return None
+        if numeric:
+            numer = [sp.N(coeff) for coeff in numer]
+        numer = absSquared(numer, f, numeric)
+    else:
+        numer = None
+    if numeric:
+        resolver = instr.circuit.parResolver
+        resolver.update(instr.parDefs)
+    ot = sp.N(0) # Detector-referred total
+    it = sp.N(0) # Source-referred total
+    for j in range(len(srcVars)):
+        name = srcVars[j]
+        if name not in list(result.onoiseTerms.keys()):
+            result.onoiseTerms[name] = []
+            result.inoiseTerms[name] = []
+        oTerm = sp.N(0)
+        iTerm = sp.N(0)
+        if 'noise' in list(instr.circuit.elements[name].params.keys()):
+            value = instr.circuit.elements[name].params['noise']
+            if numeric:
+                value = sp.N(fullSubs(value, resolver))
+            result.snoiseTerms[name] = value
+            gain = absSquared(N[j], f, numeric)
+            if gain != 0:
+                oTerm = gain/denom*value
+                if numer != None:
+                    iTerm = gain/numer*value
+        ot += oTerm
+        it += iTerm
+        result.onoiseTerms[name].append(oTerm)
+        result.inoiseTerms[name].append(iTerm)
+    result.onoise.append(ot)
+    result.inoise.append(it)
+    return result
+
+DDDDATATYPES = ['numer', 'denom', 'laplace']
+"""
+Data types that can be evaluated with determinant decision diagrams.
+"""
+
+def doDDDInstr(instr, result):
+    """
+    Executes an instruction with determinant decision diagrams (see
+    **SLiCAPddd.py**) and updates *result* with the instruction results, in
+    the same way as doMaxInstr().
+
+    The numerator and the denominator are polynomials in the Laplace variable
+    of which the coefficients are nested (not expanded) expressions.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Updated result object, or None if the matrix equation is not
+             polynomial in the Laplace variable. In that case *result* is not
+             modified and the instruction should be executed with Maxima CAS.
+    :rtype: SLiCAPprotos.allResults(), NoneType
+    """
+    s = ini.Laplace
+    result = makeMaxMatrices(instr, result)
+    if result.M.shape[0] != result.M.shape[1]:
+        return None
+    if instr.dataType != 'numer':
+        denom = ddd(result.M).poly(s)
+        if denom == None:
+            return None
+    if instr.dataType != 'denom':
+        detP, detN = makeMaxDetPos(instr, result)
+        if instr.errors != 0:
+            return None
+        Iv = [sp.together(value) for value in result.Iv]
+        denomIv = sp.lcm_list([sp.fraction(value)[1] for value in Iv])
+        Iv = sp.Matrix([sp.cancel(value*denomIv) for value in Iv])
+        diagram, sign = dddNumer(result.M, Iv, detP, detN)
+        numer = diagram.poly(s)
+        if numer == None:
+            return None
+        numer = sign*numer/denomIv
+    if instr.dataType == 'numer':
+        result.numer.append(numer)
+    elif instr.dataType == 'denom':
+        result.denom.append(denom)
+    else:
+        result.laplace.append(numer/denom)
+    return result
+
+def simplifyResult(expr):
+    """
+    Returns sympy.simplify(expr), or expr itself if ini.dddEngine is True.
+    Simplification of the nested expressions obtained with determinant
+    decision diagrams would require their expansion.
+
+    :param expr: Instruction result
+    :type expr: sympy.Expr
+
+    :return: Simplified instruction result
+    :rtype: sympy.Expr
+    """
+    if ini.dddEngine:
+        return expr
+    return sp.simplify(expr)
+
 def doMaxFunction(funcName, args):
     """
     Calls a Maxima CAS function and executes it with the given arguments *args*.
@@ -1230,11 +1891,14 @@ def makeMaxInstr(instr, result):
             maxInstr += 'numer_:false$'
         maxInstr += 'Iv_:' + python2maxima(result.Iv.transpose()) + '$'
         maxInstr += 'sources_:['
+        if instr.numeric == True:
+            resolver = instr.circuit.parResolver
+            resolver.update(instr.parDefs)
         for name in instr.circuit.indepVars:
             if 'noise' in list(instr.circuit.elements[name].params.keys()):
                 value = instr.circuit.elements[name].params['noise']
                 if instr.numeric == True:
-                    value = sp.N(fullSubs(value, instr.parDefs))
+                    value = sp.N(fullSubs(value, resolver))
                 result.snoiseTerms[name] = value
                 maxInstr += name + '=' + python2maxima(value) + ','
         if maxInstr[-1] == ',':
@@ -1252,12 +1916,15 @@ def makeMaxInstr(instr, result):
             maxInstr += 'numer_:false$'
         maxInstr += 'Iv_:' + python2maxima(result.Iv.transpose().subs(ini.Laplace, 0)) + '$'
         maxInstr += 'sources_:['
+        if instr.numeric == True:
+            resolver = instr.circuit.parResolver
+            resolver.update(instr.parDefs)
         for name in instr.circuit.indepVars:
             if 'dcvar' in list(instr.circuit.elements[name].params.keys()):
                 value = instr.circuit.elements[name].params['dcvar']
                 result.svarTerms[name] = value
                 if instr.numeric == True:
-                    value = sp.N(fullSubs(value, instr.parDefs))
+                    value = sp.N(fullSubs(value, resolver))
                 maxInstr += name + '=' + python2maxima(value) + ','
         if maxInstr[-1] == ',':
             maxInstr = maxInstr[0:-1]
@@ -1458,12 +2125,13 @@ def parseMaxResult(result, indepVars, maxResult):
         ot     = sp.N(0) # Detector-referred total
         it     = sp.N(0) # Source-referred total
         if result.dataType == 'noise':
+            # The terms have been factored by Maxima CAS
             for j in range(len(indepVars)):
                 if indepVars[j] not in list(result.onoiseTerms.keys()):
                     result.onoiseTerms[indepVars[j]] = []
                     result.inoiseTerms[indepVars[j]] = []
                 try:
-                    term = sp.factor(sp.sympify(oTerms[j]))
+                    term = sp.sympify(oTerms[j])
                     if term == False:
                         term = sp.N(0)
                 except:
@@ -1471,7 +2139,7 @@ def parseMaxResult(result, indepVars, maxResult):
                 ot += term
                 result.onoiseTerms[indepVars[j]].append(term)
                 try:
-                    term = sp.factor(sp.sympify(iTerms[j]))
+                    term = sp.sympify(iTerms[j])
                     if term == False:
                         term = sp.N(0)
                 except:
@@ -1527,11 +2195,145 @@ def parseMaxResult(result, indepVars, maxResult):
             pass
     return result
 
+STEPRESULTS = ['numer', 'denom', 'laplace', 'ac', 'time', 'impulse', 'stepResp',
+               'dc', 'solve', 'dcSolve', 'timeSolve', 'onoise', 'inoise',
+               'ovar', 'ivar', 'poles', 'zeros', 'DCvalue']
+"""
+Attributes of **SLiCAPprotos.allResults** that hold a list to which each
+step of a stepped instruction adds its result.
+"""
+
+STEPTERMS   = ['onoiseTerms', 'inoiseTerms', 'ovarTerms', 'ivarTerms']
+"""
+Attributes of **SLiCAPprotos.allResults** that hold a dictionary with lists
+to which each step of a stepped instruction adds its result.
+"""
+
+def stepInstruction(instr, result, function):
+    """
+    Executes all steps of a stepped instruction with ini.stepFunction == False.
+
+    For each step, the step values are assigned to the step parameters in
+    instr.parDefs, and *function(instr, result)* adds the results of this
+    step to an empty result object. These results are merged into *result*
+    in step order.
+
+    If ini.stepWorkers > 1 and Maxima CAS runs as a pool of servers
+    (ini.socket == True), the steps are executed in parallel by
+    ini.stepWorkers threads. Each thread works with its own copy of the
+    instruction and the circuit, and the Maxima CAS calls of different
+    threads are evaluated by different servers of the pool
+    (see ini.maximaPoolSize). The results do not depend on the number of
+    threads.
+
+    :param instr: **instruction()** object that holds instruction data.
+    :type instr: :class:`instruction()`
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :param function: Function that executes one step and returns the result
+                     object
+    :type function: function
+
+    :return: Result of the execution of the instruction.
+    :rtype: SLiCAPprotos.allResults()
+    """
+    stepVars = list(instr.stepDict.keys())
+    numSteps = len(instr.stepDict[stepVars[0]])
+    workers = 1
+    if ini.socket:
+        workers = max(1, min(int(ini.stepWorkers), numSteps))
+    if workers == 1:
+        for i in range(numSteps):
+            for j in range(len(stepVars)):
+                instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+            result = mergeStepResult(result, function(instr, emptyStepResult(result)))
+        return result
+    copies = Queue()
+    for i in range(workers):
+        copies.put(deepcopy(instr))
+
+    def runStep(i):
+        stepInstr = copies.get()
+        try:
+            for j in range(len(stepVars)):
+                stepInstr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+            return function(stepInstr, emptyStepResult(result))
+        finally:
+            copies.put(stepInstr)
+
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        stepResults = list(executor.map(runStep, range(numSteps)))
+    for stepResult in stepResults:
+        result = mergeStepResult(result, stepResult)
+    # Leave the step parameters at their last step values, as with one thread
+    for j in range(len(stepVars)):
+        instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][-1]
+    return result
+
+def emptyStepResult(result):
+    """
+    Returns a copy of *result* without step results and errors.
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :return: Result object for the results of one step.
+    :rtype: SLiCAPprotos.allResults()
+    """
+    stepResult = allResults()
+    vars(stepResult).update(vars(result))
+    for attr in STEPRESULTS:
+        setattr(stepResult, attr, [])
+    for attr in STEPTERMS:
+        setattr(stepResult, attr, {})
+    stepResult.errors = 0
+    return stepResult
+
+def mergeStepResult(result, stepResult):
+    """
+    Adds the results of one step in *stepResult* to *result*.
+
+    Step results are appended to the lists of *result*, errors are added and
+    the other attributes of *stepResult* replace those of *result*.
+
+    :param result: **allResults()** object that holds instruction results
+    :type result: :class:`allResult()`
+
+    :param stepResult: Result object with the results of one step
+    :type stepResult: :class:`allResult()`
+
+    :return: Updated result object
+    :rtype: SLiCAPprotos.allResults()
+    """
+    for attr, value in list(vars(stepResult).items()):
+        if attr in STEPRESULTS and type(value) == list and type(getattr(result, attr)) == list:
+            getattr(result, attr).extend(value)
+        elif attr in STEPTERMS:
+            terms = getattr(result, attr)
+            for key in list(value.keys()):
+                if type(value[key]) == list and type(terms.get(key)) == list:
+                    terms[key].extend(value[key])
+                else:
+                    terms[key] = value[key]
+        elif attr == 'errors':
+            result.errors += value
+        else:
+            setattr(result, attr, value)
+    return result
+
 def stepFunctions(stepDict, function):
     """
     Substitutes values for step parameters in *function* and returns a list
     of functions with these substitutions.
 
+    If *function* is a rational function of the Laplace variable or of the
+    frequency with coefficients that only depend on the step parameters, the
+    coefficients are evaluated for all steps at once and a
+    **SLiCAPnumeric.steppedRational** object is returned instead. Indexing
+    this object returns the function of a step.
+
     :param stepDict: Dictionary with key-value pair:
                      key: step parameter name (*sympy.Symbol*)
                      value: list with step values for this parameter.
@@ -1543,8 +2345,11 @@ def stepFunctions(stepDict, function):
              functions equals the number of steps. Function i equals
              the input function in which the step variable has been
              replaced with its i-th step value.
-    :return type: list
+    :return type: list, SLiCAPnumeric.steppedRational
     """
+    stepped = makeSteppedRational(stepDict, function)
+    if stepped != None:
+        return stepped
     stepVars = list(stepDict.keys())
     numSteps = len(stepDict[stepVars[0]])
     functions = []
@@ -1662,7 +2467,7 @@ def createConversionMatrices(instr):
     pairs, unPaired, dmVars, cmVars = pairVariables(instr)
     depVars = [var for var in instr.depVars()]
     dim = len(depVars)
-    A = sp.zeros(dim)
+    A = sp.SparseMatrix(dim, dim, {})
     n = len(pairs)
     m = len(unPaired)
     # Create conversion matrix: express nodal voltages and branch currents in
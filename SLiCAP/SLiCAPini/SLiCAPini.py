@@ -15,6 +15,9 @@ import ply.lex as lex
 import re
 import subprocess
 import socket
+import selectors
+import hashlib
+import pickle
 import scipy.integrate as integrate
 import platform
 import os
@@ -27,10 +30,18 @@ import webbrowser
 from SLiCAP.SLiCAPsetting import *
 from SLiCAP.SLiCAPconfig import *
 from copy import deepcopy
+from collections import defaultdict, deque
+from heapq import heappush, heappop
 from scipy.signal import residue
 from scipy.optimize import newton, fsolve
-from scipy.integrate import quad
+from scipy.integrate import quad, quad_vec
+from scipy.linalg import qz, eig
+from numpy.polynomial.polynomial import polyval, polyder
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
 from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
 from shutil import copy2 as cp
 from time import time, sleep
 from datetime import datetime
@@ -127,6 +138,7 @@ class settings(object):
        - imgPath           : Directory with images for HTML output
        - defaultLib        : Directory with SLiCAP basic library files
        - docPath           : Directory with html documentation
+       - cachePath         : Directory with cached results
 
     #. External programs
 
@@ -169,6 +181,17 @@ class settings(object):
          - True: use Sympy.lambify for parameter stepping
          - False : substitute step parameters in matrix
 
+       - numEngine:
+
+         - True : use NumPy for fully numeric instructions
+         - False : use Maxima for all instructions
+
+       - dddEngine:
+
+         - True : use determinant decision diagrams for symbolic numer, denom
+           and laplace instructions
+         - False : use Maxima for symbolic instructions
+
        - Hz:
 
          - True: frequency in Hz and phase in degrees
@@ -178,6 +201,7 @@ class settings(object):
        - frequency         : Parameter used for frequency variable
        - maxRecSubst       : Maximum number of recursive substitutions
        - MaximaMatrixDim   : Maximum matrix dimension for maxima.newdet()
+       - detMethod         : "ME" or "bareiss"; method for SLiCAPmath.det()
        - MaximaTimeOut     : Maximum calculation time for Maxima
        - assumePosMaxVars  : Assume postive parameters in Maxima expressions
        - lambdifyTool      : "numpy" or "mpmath"; latter one in case of overflow
@@ -214,7 +238,8 @@ class settings(object):
        - socket:
 
          - True : maxima runs in a socket (passes maxima messages)
-         - False : maxima runs as a subprocess (ignores maxima messages)
+         - False : maxima runs as a subprocess that communicates through
+           pipes (passes maxima messages)
 
        - HOST = 127.0.0.1 : Standard loopback interface address (localhost)
 
@@ -222,6 +247,20 @@ class settings(object):
 
        - maximaHandler    : Maxima client process handler
 
+       - maximaPoolSize   : Number of Maxima CAS servers in the pool
+
+       - stepWorkers      : Number of threads for parallel parameter stepping
+
+       - maximaSession    : Maxima process handler for ini.socket == False
+
+       - maximaCacheSize  : Maximum size in MB of the cache with Maxima results
+
+       - maximaCache      : Cache with Maxima results
+
+       - libraryCache     : True if compiled libraries are cached
+
+       - circuitCache     : True if flattened circuits are cached
+
     """
     def __init__(self):
         """
@@ -298,6 +337,11 @@ class settings(object):
         Path (*str*), to image files will be set by **SLiCAP.initProject()**;  defaults to None.
         """
 
+        self.cachePath          = None
+        """
+        Path (*str*) to cached results, will be set by **SLiCAP.initProject()**;  defaults to None.
+        """
+
         self.ltspice = None
         """
         Operating system command for batch generation of a netlist from an
@@ -383,6 +427,40 @@ class settings(object):
 
          """
 
+        self.numEngine          = False
+        """
+        (*Bool*)
+
+         - True: Instructions of the data types 'numer', 'denom', 'laplace',
+           'dc', 'solve', 'dcsolve', 'noise', 'poles', 'zeros' and 'pz' of
+           which the matrix equation has no other parameters than the
+           Laplace variable are evaluated with NumPy (see
+           **SLiCAPnumeric.py**).
+         - False: All instructions are evaluated with Maxima CAS.
+
+        The NumPy engine recovers polynomial coefficients from samples of the
+        Laplace variable; this may lose accuracy for circuits with widely
+        spread time constants.
+
+        Defaults to False.
+        """
+
+        self.dddEngine          = False
+        """
+        (*Bool*)
+
+         - True: Instructions of the data types 'numer', 'denom' and
+           'laplace', and the poles and zeros derived from them, as well as
+           loop gain and servo functions, are evaluated with determinant
+           decision diagrams (see **SLiCAPddd.py**). The results are
+           polynomials in the Laplace variable with nested (not expanded)
+           coefficients. This scales to symbolic analysis of circuits with
+           hundreds of elements.
+         - False: These instructions are evaluated with Maxima CAS.
+
+        Defaults to False.
+        """
+
         self.maxRecSubst        = 12
         """
         Maximum number (*int*) of recursive substitutions in equations.
@@ -511,6 +589,17 @@ class settings(object):
         Maximum size of sa square matrix to be passed to maxima.
         """
 
+        self.detMethod          = "ME"
+        """
+        Method (*str*) for calculation of determinants with
+        **SLiCAPmath.det()**:
+
+         - "ME": memoized minor expansion along the sparsest row or column
+         - "bareiss": fraction-free Gaussian elimination
+
+        Defaults to "ME".
+        """
+
         self.assumePosMaxVars   = True
         """
         Assume positive parameters in Maxima expressions. In many cases this
@@ -537,6 +626,61 @@ class settings(object):
         Maxima client process handler will be activated at start-up
         """
 
+        self.maximaSession      = None
+        """
+        Handler of the Maxima CAS process that communicates through pipes. It
+        is used if ini.socket == False and it will be started with the first
+        Maxima instruction.
+        """
+
+        self.maximaCacheSize    = 100
+        """
+        Maximum size in MB (*int, float*) of the on-disk cache with results of
+        Maxima instructions. The least recently used results will be removed
+        if this size is exceeded. A value of 0 disables the cache.
+        Defaults to 100.
+        """
+
+        self.maximaCache        = None
+        """
+        Cache (*SLiCAPpythonMaxima.maximaCache*) with results of Maxima
+        instructions. It will be created with the first Maxima instruction.
+        """
+
+        self.libraryCache       = True
+        """
+        If True, the compiled SLiCAP libraries and user libraries are stored
+        in the subdirectory 'libraries/' of ini.cachePath, and loaded from
+        there as long as the library files and the SLiCAP version have not
+        changed. Defaults to True.
+        """
+
+        self.circuitCache       = True
+        """
+        If True, the flattened circuits returned by checkCircuit() are kept
+        in memory and in the subdirectory 'circuits/' of ini.cachePath, and
+        reused as long as the netlist, the library files it calls and the
+        SLiCAP version have not changed. Defaults to True.
+        """
+
+        self.maximaPoolSize     = 1
+        """
+        Number (*int*) of Maxima CAS servers that will be started with
+        **SLiCAP.initProject()**. The servers listen on consecutive ports,
+        starting at ini.PORT. Calls to Maxima from different threads will be
+        executed in parallel by the servers in this pool. Defaults to 1.
+        """
+
+        self.stepWorkers        = 1
+        """
+        Number (*int*) of threads that execute the steps of a stepped
+        instruction in parallel if ini.stepFunction == False and
+        ini.socket == True. Each thread works with its own copy of the
+        instruction; more threads than ini.maximaPoolSize servers will wait
+        for a free server. The results are always merged in step order.
+        Defaults to 1.
+        """
+
         self.netlist            = None
         """
         gschem or lepton-schematic command for generating a netlist.
@@ -613,6 +757,7 @@ class settings(object):
         self.sphinxPath       = projectPath + SPHINXPATH
         self.mathmlPath       = projectPath + MATHMLPATH
         self.imgPath          = projectPath + IMGPATH
+        self.cachePath        = projectPath + CACHEPATH
         self.maxima           = MAXIMA
         self.ltspice          = LTSPICE
         self.ngspice          = NGSPICE
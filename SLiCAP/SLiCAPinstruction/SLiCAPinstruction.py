@@ -11,7 +11,7 @@ GAINTYPES = ['vi', 'gain', 'loopgain', 'servo', 'asymptotic', 'direct']
 CONVTYPES = ['dd', 'dc', 'cd', 'cc', 'all']
 DATATYPES = ['matrix', 'noise', 'solve', 'time', 'dc', 'dcvar', 'dcsolve', 'timesolve',
              'numer', 'denom', 'laplace', 'zeros', 'poles', 'pz', 'impulse',
-             'step', 'params']
+             'step', 'params', 'ac', 'transfermatrix']
 
 class instruction(object):
     """
@@ -63,7 +63,8 @@ class instruction(object):
 
         self.stepVars = None
         """
-        Defines the step variables for 'array' type parameter stepping.
+        Defines the step variables for 'array' and 'grid' type parameter
+        stepping.
 
         See **instruction.setStepVars(<stepVars>)** for specification of *instruction.stepVars*.
         """
@@ -110,6 +111,13 @@ class instruction(object):
         See **instruction.setStepArray(<stepArray>)** for specification of *instruction.stepArray*.
         """
 
+        self.stepGrid = []
+        """
+        List with the values of the step variables for step method 'grid'.
+
+        See **instruction.setStepGrid(<stepGrid>)** for specification of *instruction.stepGrid*.
+        """
+
         self.stepDict = {}
         """
         Dictionary with key-value pairs:
@@ -132,6 +140,20 @@ class instruction(object):
         See **instruction.setDetector(<detector>)** for specification of the detector.
         """
 
+        self.sources = None
+        """
+        List with refdes of signal sources for the data type 'transfermatrix'.
+
+        See **instruction.setSources(<sources>)** for specification of the sources.
+        """
+
+        self.detectors = None
+        """
+        List with detectors for the data type 'transfermatrix'.
+
+        See **instruction.setDetectors(<detectors>)** for specification of the detectors.
+        """
+
         self.pairExt = [None, None]
         """
         Extensions used to indicate paired nodes or elements.
@@ -442,9 +464,10 @@ class instruction(object):
         """
         Defines the data type for the instruction.
 
-        :param dataType: data type for the instruction: 'dc', 'dcsolve', 'dcvar',
-                         'denom', 'impulse', 'laplace', 'matrix', 'noise', 'numer',
-                         'params', 'poles', 'pz', 'solve', 'step', 'time' or 'zeros'.
+        :param dataType: data type for the instruction: 'ac', 'dc', 'dcsolve',
+                         'dcvar', 'denom', 'impulse', 'laplace', 'matrix', 'noise',
+                         'numer', 'params', 'poles', 'pz', 'solve', 'step', 'time',
+                         'transfermatrix' or 'zeros'.
         :type dataType: str
 
         :Example:
@@ -646,7 +669,7 @@ class instruction(object):
         """
         Defines the parameter stepping method.
 
-        :param stepMethod: 'lin', 'log', 'list' or 'array'.
+        :param stepMethod: 'lin', 'log', 'list', 'array' or 'grid'.
         :type stepMethod: str
 
         :Example:
@@ -678,7 +701,7 @@ class instruction(object):
             self.errors += 1
             print("Error: stepMethod should be type 'str'.")
         else:
-            stepMethods = ['lin', 'log', 'list', 'array']
+            stepMethods = ['lin', 'log', 'list', 'array', 'grid']
             if self.stepMethod.lower() not in stepMethods:
                 self.errors += 1
                 print("Error: unknown step method '{0}',".format(self.stepMethod))
@@ -940,6 +963,96 @@ class instruction(object):
                                 self.stepArray[i][j] = sp.N(value)
         return
 
+    def setStepGrid(self, stepGrid):
+        """
+        Defines the values of the step variables for step method 'grid'.
+
+        The steps are all combinations of the values of the step variables
+        (Cartesian product). They are numbered in row-major order: the values
+        of the last step variable change fastest.
+
+        :param stepGrid: List: stepGrid[i] defines the values of the step
+                         variable instruction.stepVars[i]. It can be:
+
+                         - ['lin', start, stop, num]: linear range
+                         - ['log', start, stop, num]: logarithmic range
+                         - list with values
+
+        :type stepGrid: list
+
+        :Example:
+
+        >>> # Create an instance of the instruction object
+        >>> my_instr = instruction()
+        >>> # check a netlist file and use the circuit from this file for this
+        >>> # instruction:
+        >>> my_instr.setCircuit('my_circuit.cir')
+        >>> # Define 'grid' type stepping:
+        >>> my_instr.setStepMethod('grid')
+        >>> # Define circuit parameters 'W' and 'L' as step variables:
+        >>> my_instr.setStepVars(['W', 'L'])
+        >>> Define the step values for 'W' and 'L':
+        >>> my_instr.setStepGrid([['log', '1u', '100u', 100], ['180n', '360n', '720n']])
+        >>> # Enable parameter stepping
+        >>> my_instr.stepOn()
+        """
+        self.stepGrid = stepGrid
+        self.checkStepGrid()
+        return
+
+    def checkStepGrid(self):
+        """
+        Checks if the values of the step variables for step method 'grid' are
+        defined properly and converts them into numpy arrays.
+
+        Called by **instruction.checkStep()** and by **instruction.setStepGrid(<stepGrid>)**.
+        """
+        if type(self.stepGrid) != list or len(self.stepGrid) == 0:
+            self.errors += 1
+            print("Error: expected a nonempty list type for 'stepGrid'.")
+            return
+        if self.stepVars != None and len(self.stepGrid) != len(self.stepVars):
+            self.errors += 1
+            print("Error: mismatch between dimensions of stepGrid and stepVars.")
+            return
+        # Convert a copy; the list passed to setStepGrid() is not modified
+        self.stepGrid = list(self.stepGrid)
+        for i in range(len(self.stepGrid)):
+            values = self.stepGrid[i]
+            if isinstance(values, np.ndarray):
+                values = list(values)
+            if type(values) != list or len(values) == 0:
+                self.errors += 1
+                print("Error: expected a nonempty list for stepGrid[{0}].".format(i))
+                continue
+            method = None
+            if type(values[0]) == str and values[0].lower() in ['lin', 'log']:
+                method = values[0].lower()
+                if len(values) != 4 or type(values[3]) != int or values[3] <= 0:
+                    self.errors += 1
+                    print("Error: expected ['{0}', start, stop, num] for stepGrid[{1}].".format(method, i))
+                    continue
+                values = values[1:3]
+            numValues = []
+            for value in values:
+                number = checkNumber(value)
+                if number == None:
+                    self.errors += 1
+                    print("Error: cannot determine numeric value of '{0}' in stepGrid[{1}].".format(str(value), i))
+                    break
+                numValues.append(float(number))
+            else:
+                if method == 'lin':
+                    self.stepGrid[i] = np.linspace(numValues[0], numValues[1], self.stepGrid[i][3])
+                elif method == 'log' and numValues[0] * numValues[1] > 0:
+                    self.stepGrid[i] = np.geomspace(numValues[0], numValues[1], self.stepGrid[i][3])
+                elif method == 'log':
+                    self.errors += 1
+                    print("Error: logarithmic stepping cannot include zero.")
+                else:
+                    self.stepGrid[i] = np.array(numValues)
+        return
+
 
     def setSource(self, source):
         """
@@ -1133,6 +1246,109 @@ class instruction(object):
             print("Error: missing detector definition.")
         return
 
+    def setSources(self, sources):
+        """
+        Defines the signal sources for the data type 'transfermatrix'.
+
+        :param sources: List with names of independent voltage or current
+                        sources that exist in the circuit.
+        :type sources: list
+
+        :Example:
+
+        >>> # Create an instance of the instruction object
+        >>> my_instr = instruction()
+        >>> # check a netlist file and use the circuit from this file for this
+        >>> # instruction:
+        >>> my_instr.setCircuit('my_circuit.cir')
+        >>> # Define the sources 'V1' and 'I1' as signal sources:
+        >>> my_instr.setSources(['V1', 'I1'])
+        """
+        self.sources = sources
+        self.checkSources()
+        return
+
+    def checkSources(self):
+        """
+        Checks if the signal sources for the data type 'transfermatrix' have
+        been defined and if they exist in the circuit.
+
+        Called by **instruction.check()** and by **instruction.setSources(<sources>)**.
+        """
+        if type(self.sources) == str:
+            self.sources = [self.sources]
+        if type(self.sources) != list or len(self.sources) == 0:
+            self.errors += 1
+            print("Error: missing list with sources.")
+            return
+        for source in self.sources:
+            if source not in self.indepVars():
+                self.errors += 1
+                print("Error: unkown source: '{0}'.".format(source))
+        return
+
+    def setDetectors(self, detectors):
+        """
+        Defines the signal detectors for the data type 'transfermatrix'.
+
+        :param detectors: List with detectors. Each detector is the name of a
+                          nodal voltage or a branch current, or a list with
+                          the names of a positive and a negative detector
+                          (see **instruction.setDetector(<detector>)**).
+        :type detectors: list
+
+        :Example:
+
+        >>> # Create an instance of the instruction object
+        >>> my_instr = instruction()
+        >>> # check a netlist file and use the circuit from this file for this
+        >>> # instruction:
+        >>> my_instr.setCircuit('my_circuit.cir')
+        >>> # Voltage at node 'out' and the voltage between 'N001' and 'out':
+        >>> my_instr.setDetectors(['V_out', ['V_N001', 'V_out']])
+        """
+        self.detectors = detectors
+        self.checkDetectors()
+        return
+
+    def checkDetectors(self):
+        """
+        Checks if the signal detectors for the data type 'transfermatrix' have
+        been defined and if they exist in the circuit. Each detector is
+        converted into a list [<detP>, <detN>].
+
+        Called by **instruction.check()** and by **instruction.setDetectors(<detectors>)**.
+        """
+        if type(self.detectors) == str:
+            self.detectors = [self.detectors]
+        if type(self.detectors) != list or len(self.detectors) == 0:
+            self.errors += 1
+            print("Error: missing list with detectors.")
+            return
+        for i in range(len(self.detectors)):
+            detector = self.detectors[i]
+            if type(detector) == str:
+                detector = [detector, None]
+            elif type(detector) == list and len(detector) == 1:
+                detector = [detector[0], None]
+            elif type(detector) != list or len(detector) != 2:
+                self.errors += 1
+                print("Error: detector must be 'str' or a list with two names.")
+                continue
+            self.detectors[i] = detector
+            detP, detN = detector
+            if detP == None and detN == None:
+                self.errors += 1
+                print("Error: missing detector specification.")
+            elif detP == detN:
+                self.errors += 1
+                print("Error: equal positive and negative detector.")
+            for det in detector:
+                if det != None and det not in self.depVars():
+                    self.errors += 1
+                    print("Error: unkown detector: '{0}'.".format(det))
+        return
+
     def setLGref(self, lgRef):
         """
         Defines the loop gain reference (name of a controlled source).
@@ -1523,6 +1739,14 @@ class instruction(object):
                         for j in range(len(tmpLst)):
                             tmpLst[j] = sp.N(tmpLst[j])
                         self.stepDict[self.stepVars[i]] = tmpLst
+            elif self.stepMethod == 'grid':
+                self.checkStepVars()
+                if self.errors == 0:
+                    self.checkStepGrid()
+                if self.errors == 0:
+                    # The values at the grid points are created on request
+                    for i in range(len(self.stepVars)):
+                        self.stepDict[self.stepVars[i]] = gridAxis(self.stepGrid, i)
         return
 
     def check(self):
@@ -1556,6 +1780,10 @@ class instruction(object):
                     if self.dataType == 'laplace':
                         # need detector
                         self.checkDetector()
+                    elif self.dataType == 'ac':
+                        # need numeric and detector
+                        self.checkNumeric()
+                        self.checkDetector()
                     elif self.dataType == 'noise':
                         # need detector
                         self.checkDetector()
@@ -1593,6 +1821,11 @@ class instruction(object):
                         # need source and detector
                         self.checkDetector()
                         self.checkSource()
+                    elif self.dataType == 'ac':
+                        # need numeric, source and detector
+                        self.checkNumeric()
+                        self.checkDetector()
+                        self.checkSource()
                     elif self.dataType == 'numer':
                         # need source and detector
                         self.checkDetector()
@@ -1622,6 +1855,13 @@ class instruction(object):
                         #self.checkNumeric()
                         self.checkDetector()
                         self.checkSource()
+                    elif self.dataType == 'transfermatrix':
+                        # need sources and detectors, no conversion
+                        self.checkSources()
+                        self.checkDetectors()
+                        if self.convType != None:
+                            self.errors += 1
+                            print("Error: dataType 'transfermatrix' not available for conversion type: '{0}'.".format(self.convType))
                     else:
                         self.errors += 1
                         print("Error: dataType '{0}' not available for gainType: '{1}'.".format(self.dataType, self.gainType))
@@ -7,19 +7,32 @@ Imported by the module **SLiCAPprotos.py**.
 """
 from SLiCAP.SLiCAPpythonMaxima import *
 
-def det(M):
+def det(M, method=None):
     """
-    Returns the determinant of a square matrix 'M' calculated using recursive
-    minor expansion (Laplace expansion).
-    For large matrices with symbolic entries, this is faster than the built-in
-    sympy.Matrix.det() method.
+    Returns the determinant of a square matrix 'M'.
+
+    Two methods are available:
+
+    - 'ME': Minor expansion (Laplace expansion) along the sparsest row or
+      column of each minor. Minors are stored with their remaining row and
+      column sets as key, such that coinciding minors are calculated only
+      once. For large matrices with symbolic entries, this is much faster
+      than the built-in sympy.Matrix.det() method.
+    - 'bareiss': Fraction-free Gaussian elimination (Bareiss algorithm).
+      Each pivot is the simplest nonzero entry in its column.
 
     :param M: Sympy matrix
-    :type M: sympy.Matrix
+    :type M: sympy.Matrix, sympy.SparseMatrix
+
+    :param method: Method: 'ME' or 'bareiss', defaults to ini.detMethod
+    :type method: str
 
     :return: Determinant of 'M'
     :rtype:  sympy.Expr
 
+    :raises TypeError: If 'M' is not square
+    :raises ValueError: If 'M' is empty
+
     :Example:
 
     >>> dim = 6
@@ -30,7 +43,7 @@ def det(M):
     >>> t1 = time()
     >>> D1 = M.det()
     >>> t2=time()
-    >>> D2 = determinant(M)
+    >>> D2 = det(M)
     >>> t3=time()
     >>> print('M.det :', t2-t1, 's')
     >>> print('det(M):', t3-t2, 's')
@@ -38,20 +51,118 @@ def det(M):
     M.det : 150.64841532707214 s
     det(M): 0.4860818386077881 s
     0
-    0
+    """
+    rows, cols = M.shape
+    if rows != cols:
+        raise TypeError("Error: cannot calculate the determinant of a non-square matrix.")
+    if rows == 0:
+        raise ValueError("Error: cannot calculate the determinant of an empty matrix.")
+    if method == None:
+        method = ini.detMethod
+    if method == 'ME':
+        return _detME(M)
+    elif method == 'bareiss':
+        return _detBareiss(M)
+    print("Error: unknown determinant method: '%s'."%(method))
+    return None
+
+def _detME(M):
+    """
+    Returns the determinant of the square matrix 'M' calculated with memoized
+    minor expansion along the sparsest row or column.
+
+    A minor is identified by the bit masks of its remaining rows and columns.
+    The nonzero entries are converted once into elements of a sparse
+    polynomial ring, such that products and sums of minors need no
+    expansion.
+
+    :param M: Sympy matrix
+    :type M: sympy.Matrix, sympy.SparseMatrix
+
+    :return: Determinant of 'M'
+    :rtype:  sympy.Expr
     """
     dim = M.shape[0]
-    if dim == 2:
-        D = sp.expand(M[0,0]*M[1,1]-M[1,0]*M[0,1])
-    else:
-        D = 0
-        for i in range(dim):
-            if M[i,0] != 0:
-                newM = M.copy()
-                newM.row_del(i)
-                newM.col_del(0)
-                D += M[i,0] * (-1)**(i%2)*det(newM)
-    return sp.expand(D)
+    positions = []
+    values = []
+    for (i, j), value in M.todok().items():
+        if value.is_zero is not True:
+            positions.append((i, j))
+            values.append(value)
+    if len(values) == 0:
+        return sp.S.Zero
+    ring, values = sp.sring(values)
+    rowEntries = [{} for i in range(dim)]
+    for k in range(len(positions)):
+        i, j = positions[k]
+        rowEntries[i][j] = values[k]
+    minors = {}
+
+    def minor(rowMask, colMask):
+        key = (rowMask, colMask)
+        if key in minors:
+            return minors[key]
+        remRows = [i for i in range(dim) if rowMask >> i & 1]
+        remCols = [j for j in range(dim) if colMask >> j & 1]
+        if len(remRows) == 1:
+            D = rowEntries[remRows[0]].get(remCols[0], ring.zero)
+        else:
+            # Find the sparsest row or column: list with (row, col, sign)
+            lines = [[] for i in range(2*len(remRows))]
+            for p in range(len(remRows)):
+                entries = rowEntries[remRows[p]]
+                for q in range(len(remCols)):
+                    if remCols[q] in entries:
+                        lines[p].append((remRows[p], remCols[q], (p + q) % 2))
+                        lines[len(remRows) + q].append((remRows[p], remCols[q], (p + q) % 2))
+            D = ring.zero
+            for i, j, odd in min(lines, key=len):
+                term = rowEntries[i][j]*minor(rowMask & ~(1 << i), colMask & ~(1 << j))
+                if odd:
+                    D -= term
+                else:
+                    D += term
+        minors[key] = D
+        return D
+
+    return minor((1 << dim) - 1, (1 << dim) - 1).as_expr()
+
+def _detBareiss(M):
+    """
+    Returns the determinant of the square matrix 'M' calculated with
+    fraction-free Gaussian elimination (Bareiss algorithm).
+
+    The entries are converted into elements of a rational function field,
+    in which the divisions by the previous pivot are exact.
+
+    :param M: Sympy matrix
+    :type M: sympy.Matrix, sympy.SparseMatrix
+
+    :return: Determinant of 'M'
+    :rtype:  sympy.Expr
+    """
+    dim = M.shape[0]
+    field, values = sp.sfield([M[i, j] for i in range(dim) for j in range(dim)])
+    A = [values[i*dim: (i + 1)*dim] for i in range(dim)]
+    sign = 1
+    prev = field.one
+    for k in range(dim - 1):
+        pivots = [i for i in range(k, dim) if A[i][k]]
+        if len(pivots) == 0:
+            return sp.S.Zero
+        # Select the pivot with the fewest terms
+        p = min(pivots, key=lambda i: len(A[i][k].numer) + len(A[i][k].denom))
+        if p != k:
+            A[k], A[p] = A[p], A[k]
+            sign = -sign
+        for i in range(k + 1, dim):
+            if not A[i][k] and prev == A[k][k]:
+                # Row i remains unchanged
+                continue
+            for j in range(k + 1, dim):
+                A[i][j] = (A[k][k]*A[i][j] - A[i][k]*A[k][j])/prev
+        prev = A[k][k]
+    return sp.expand(sign*A[dim - 1][dim - 1].as_expr())
 
 def polyCoeffs(expr, var):
     """
@@ -414,6 +525,301 @@ def checkExpression(expr):
         print("Error in expression:", input_expr)
     return expr
 
+class parResolver(object):
+    """
+    Resolves parameters with their definitions.
+
+    The definitions form a directed acyclic graph: each parameter depends on
+    the parameters in its definition. The fully-resolved value of each
+    parameter is calculated once, after the values of the parameters on
+    which it depends, and it is stored. A change of a definition only
+    discards the stored values of the parameters that depend on it, directly
+    or indirectly.
+
+    An instance can be passed to **fullSubs()** instead of a dictionary with
+    parameter definitions.
+
+    :param parDefs: Dictionary with key-value pairs:
+
+                    - key (*sympy.Symbol*): parameter name
+                    - value (*sympy object, int, float*): value of the parameter
+    :type parDefs: dict
+    """
+    def __init__(self, parDefs={}):
+        self.parDefs = {}
+        """
+        Copy (*dict*) of the parameter definitions.
+        """
+
+        self.deps    = {}
+        """
+        (*dict*) with a parameter (*sympy.Symbol*) as key and the set of
+        symbols in its definition as value.
+        """
+
+        self.users   = {}
+        """
+        (*dict*) with a symbol (*sympy.Symbol*) as key and the set of
+        parameters of which the definition contains this symbol as value.
+        """
+
+        self.values  = {}
+        """
+        (*dict*) with a parameter (*sympy.Symbol*) as key and its
+        fully-resolved value as value.
+        """
+
+        self.upstream = {}
+        """
+        (*dict*) with a parameter (*sympy.Symbol*) as key and the set of
+        symbols on which it depends, including itself, as value.
+        """
+        self.update(parDefs)
+
+    def define(self, param, value):
+        """
+        Adds or modifies the definition of a parameter.
+
+        :param param: Name of the parameter
+        :type param: sympy.Symbol
+
+        :param value: Value or expression of the parameter
+        :type value: sympy object, int, float
+        """
+        self._removeEdges(param)
+        self.parDefs[param] = value
+        try:
+            self.deps[param] = value.atoms(sp.Symbol)
+        except AttributeError:
+            self.deps[param] = set()
+        for symbol in self.deps[param]:
+            self.users.setdefault(symbol, set()).add(param)
+        self.invalidate(param)
+
+    def delete(self, param):
+        """
+        Deletes the definition of a parameter.
+
+        :param param: Name of the parameter
+        :type param: sympy.Symbol
+        """
+        if param in self.parDefs:
+            self._removeEdges(param)
+            del self.parDefs[param]
+            del self.deps[param]
+            self.invalidate(param)
+
+    def _removeEdges(self, param):
+        for symbol in self.deps.get(param, set()):
+            self.users[symbol].discard(param)
+
+    def invalidate(self, param):
+        """
+        Discards the stored values of *param* and of all parameters that
+        depend on it.
+
+        :param param: Name of the parameter
+        :type param: sympy.Symbol
+        """
+        todo = [param]
+        done = set(todo)
+        while todo:
+            symbol = todo.pop()
+            self.values.pop(symbol, None)
+            self.upstream.pop(symbol, None)
+            for user in self.users.get(symbol, set()):
+                if user not in done:
+                    done.add(user)
+                    todo.append(user)
+
+    def update(self, parDefs):
+        """
+        Updates the definitions with those of *parDefs* and returns the
+        parameters of which the definition has been changed.
+
+        :param parDefs: Dictionary with parameter definitions
+        :type parDefs: dict
+
+        :return: List with names (*sympy.Symbol*) of changed parameters
+        :rtype: list
+        """
+        changed = []
+        for param, value in parDefs.items():
+            if param not in self.parDefs:
+                changed.append(param)
+            elif self.parDefs[param] is not value and self.parDefs[param] != value:
+                changed.append(param)
+        for param in self.parDefs:
+            if param not in parDefs:
+                changed.append(param)
+        for param in changed:
+            if param in parDefs:
+                self.define(param, parDefs[param])
+            else:
+                self.delete(param)
+        return changed
+
+    def order(self, param=None, done=None):
+        """
+        Returns the parameters that must be evaluated for *param*, dependencies
+        first. Parameters in *done* are skipped. If *param* is None, the
+        order of all parameters is returned (topological sort).
+
+        :param param: Name of the parameter
+        :type param: sympy.Symbol, NoneType
+
+        :param done: Parameters that do not need to be evaluated
+        :type done: dict, set, NoneType
+
+        :return: List with names (*sympy.Symbol*) of parameters
+        :rtype: list
+        """
+        if param == None:
+            order = []
+            done = set(done or [])
+            for param in self.parDefs:
+                if param not in done:
+                    newOrder = self.order(param, done)
+                    done.update(newOrder)
+                    order += newOrder
+            return order
+        if done == None:
+            done = set()
+        order = []
+        stack = [param]
+        visiting = set(stack)
+        while stack:
+            symbol = stack[-1]
+            for dep in self.deps[symbol]:
+                if dep in self.parDefs and dep not in done and dep not in visiting:
+                    stack.append(dep)
+                    visiting.add(dep)
+                    break
+            else:
+                order.append(stack.pop())
+        return order
+
+    def resolve(self, param):
+        """
+        Returns the fully-resolved value of a parameter.
+
+        :param param: Name of the parameter
+        :type param: sympy.Symbol
+
+        :return: Value of the parameter, or *param* itself if it has not been
+                 defined.
+        :rtype: sympy object, int, float
+        """
+        if param in self.values:
+            return self.values[param]
+        if param not in self.parDefs:
+            return param
+        for symbol in self.order(param, self.values):
+            value = self.parDefs[symbol]
+            substDict = {}
+            for dep in self.deps[symbol]:
+                if dep in self.values:
+                    substDict[dep] = self.values[dep]
+                elif dep in self.parDefs:
+                    print("Warning: circular parameter definition of '{0}'.".format(str(symbol)))
+            if len(substDict) != 0:
+                value = value.xreplace(substDict)
+            self.values[symbol] = value
+        return self.values[param]
+
+    def subs(self, expr):
+        """
+        Returns *expr* after substitution of the fully-resolved values of its
+        parameters.
+
+        :param expr: Expression
+        :type expr: sympy object, int, float
+
+        :return: Expression or value
+        :rtype: sympy object, int, float
+        """
+        if not isinstance(expr, sp.Basic):
+            return expr
+        substDict = {}
+        for symbol in expr.atoms(sp.Symbol):
+            if symbol in self.parDefs:
+                substDict[symbol] = self.resolve(symbol)
+        if len(substDict) == 0:
+            return expr
+        return expr.xreplace(substDict)
+
+    def dependencies(self, expr):
+        """
+        Returns the symbols on which *expr* depends directly or through the
+        parameter definitions.
+
+        :param expr: Expression
+        :type expr: sympy.Expr, int, float
+
+        :return: Set with symbols (*sympy.Symbol*)
+        :rtype: set
+        """
+        try:
+            symbols = sp.sympify(expr).atoms(sp.Symbol)
+        except (sp.SympifyError, AttributeError, TypeError):
+            return set()
+        deps = set()
+        for symbol in symbols:
+            if symbol in self.parDefs:
+                if symbol not in self.upstream:
+                    for param in self.order(symbol, self.upstream):
+                        upstream = set([param])
+                        for dep in self.deps[param]:
+                            upstream |= self.upstream.get(dep, set([dep]))
+                        self.upstream[param] = upstream
+                deps |= self.upstream[symbol]
+            else:
+                deps.add(symbol)
+        return deps
+
+    def lambdify(self, inputs=[]):
+        """
+        Returns a vectorized function that evaluates all parameters of which
+        the fully-resolved value is a number, or only depends on the
+        parameters *inputs*.
+
+        :param inputs: Names (*str, sympy.Symbol*) of parameters that are
+                       arguments of the function, e.g. step parameters.
+        :type inputs: list
+
+        :return: Tuple with:
+
+                 #. List with names (*sympy.Symbol*) of the evaluated
+                    parameters
+                 #. Function of the values of *inputs* (*float* or
+                    *numpy.ndarray*) that returns an array of which row i
+                    holds the value(s) of parameter i of this list.
+
+        :rtype: tuple
+
+        :Example:
+
+        >>> params, func = my_circuit.parResolver.lambdify(['R'])
+        >>> values = func(np.array([1e3, 2e3]))
+        """
+        inputs = [sp.Symbol(str(param)) for param in inputs]
+        held = set(inputs)
+        exprs = {}
+        for param in self.order():
+            if param not in held:
+                value = self.parDefs[param]
+                substDict = {dep: exprs[dep] for dep in self.deps[param] if dep in exprs}
+                if len(substDict) != 0:
+                    value = value.xreplace(substDict)
+                exprs[param] = sp.sympify(value)
+        params = [param for param in exprs if exprs[param].free_symbols <= held]
+        func = sp.lambdify(inputs, [exprs[param] for param in params], 'numpy')
+
+        def evaluate(*values):
+            return np.array(np.broadcast_arrays(*func(*values)))
+
+        return params, evaluate
+
 def fullSubs(valExpr, parDefs):
     """
     Returns 'valExpr' after all parameters of 'parDefs' have been substituted
@@ -422,6 +828,9 @@ def fullSubs(valExpr, parDefs):
 
     The maximum number opf recursive substitutions is set by ini.maxRexSubst.
 
+    If 'parDefs' is a **parResolver** object, the stored fully-resolved values
+    of the parameters are substituted in one pass.
+
     :param valExpr: Eympy expression in which the parameters should be substituted.
     :type valExpr: sympy.Expr, sympy.Symbol, int, float
 
@@ -430,11 +839,15 @@ def fullSubs(valExpr, parDefs):
                     - key (*sympy.Symbol*): parameter name
                     - value (*sympy object, int, float*): value of the parameter
 
+                    or a **parResolver** object.
+    :type parDefs: dict, parResolver
+
     :return: Expression or value obtained from recursive substitutions of
              parameter definitions into 'valExpr'.
     :rtype: sympy object, int, float
     """
-
+    if isinstance(parDefs, parResolver):
+        return parDefs.subs(valExpr)
     strValExpr = str(valExpr)
     i = 0
     newvalExpr = 0
@@ -569,8 +982,9 @@ def phaseMargin(LaplaceExpr):
 
     :param LaplaceExpr: Univariate function (sympy.Expr*) or list with
                         univariate functions (sympy.Expr*) of the Laplace
-                        variable.
-    :type LaplaceExpr: sympy.Expr, list
+                        variable, or stepped functions
+                        (SLiCAPnumeric.steppedRational).
+    :type LaplaceExpr: sympy.Expr, list, SLiCAPnumeric.steppedRational
 
     :return: Tuple with phase margin (*float*) and unity-gain frequency
              (*float*), or Tuple with lists with phase margins (*float*) and
@@ -580,7 +994,7 @@ def phaseMargin(LaplaceExpr):
     """
     freqs = []
     mrgns = []
-    if type(LaplaceExpr) != list:
+    if type(LaplaceExpr) != list and not hasattr(LaplaceExpr, 'evaluate'):
         LaplaceExpr = [LaplaceExpr]
     for expr in LaplaceExpr:
         expr = normalizeRational(sp.N(expr))
@@ -635,6 +1049,206 @@ def makeNumData(yFunc, xVar, x):
         y = [sp.N(yFunc) for i in range(len(x))]
     return y
 
+RESPONSECACHE = 64
+"""
+Maximum number of frequency response objects that is kept by
+**makeRationalResponse()**.
+"""
+
+_responses = {}
+
+class rationalResponse(object):
+    """
+    Frequency response of a rational function of the Laplace variable of
+    which the numerator and the denominator are given by their numeric
+    coefficients.
+
+    The complex response is calculated once per frequency grid; the
+    magnitude, the phase and the group delay at the same frequencies are
+    derived from it. The group delay is calculated from the derivatives of
+    the numerator and the denominator polynomials.
+
+    :param numer: Coefficients of the numerator in ascending order of s
+    :type numer: list, numpy.ndarray
+
+    :param denom: Coefficients of the denominator in ascending order of s
+    :type denom: list, numpy.ndarray
+    """
+    def __init__(self, numer, denom):
+        self.numer = np.array(numer)
+        """
+        Coefficients (*numpy.ndarray*) of the numerator in ascending order of
+        s.
+        """
+
+        self.denom = np.array(denom)
+        """
+        Coefficients (*numpy.ndarray*) of the denominator in ascending order
+        of s.
+        """
+
+        self._grid = None
+        self._values = None
+
+    def response(self, x):
+        """
+        Returns the complex frequency response at the frequencies *x*.
+
+        The Laplace variable is replaced with 2.pi.j.x if ini.Hz == True, else
+        with j.x. The response at the last requested frequencies is cached.
+
+        :param x: Frequencies
+        :type x: float, list, numpy.ndarray
+
+        :return: Complex frequency response; a scalar for a scalar *x*
+        :rtype: numpy.ndarray, numpy.complex128
+        """
+        return self._scalar(self._response(x), x)
+
+    def _response(self, x):
+        """
+        Returns the complex frequency response at the frequencies *x* as a
+        one-dimensional array.
+        """
+        x = np.atleast_1d(np.array(x, dtype=float))
+        if self._grid != None and self._grid[0] == ini.Hz and np.array_equal(self._grid[1], x):
+            return self._values
+        if ini.Hz:
+            s = 2j * np.pi * x
+        else:
+            s = 1j * x
+        self._values = self.solve(s)
+        self._grid = (ini.Hz, x)
+        return self._values
+
+    def _scalar(self, values, x):
+        """
+        Returns the single element of *values* if *x* is a scalar, else
+        *values*.
+        """
+        if np.ndim(x) == 0:
+            return values[0]
+        return values
+
+    def mag(self, x):
+        """
+        Returns the magnitude of the frequency response at the frequencies *x*.
+
+        :param x: Frequencies
+        :type x: float, list, numpy.ndarray
+
+        :return: Magnitudes; a scalar for a scalar *x*
+        :rtype: numpy.ndarray, numpy.float64
+        """
+        return self._scalar(np.abs(self._response(x)), x)
+
+    def dBmag(self, x):
+        """
+        Returns the dB magnitude of the frequency response at the frequencies
+        *x*.
+
+        :param x: Frequencies
+        :type x: float, list, numpy.ndarray
+
+        :return: dB magnitudes; a scalar for a scalar *x*
+        :rtype: numpy.ndarray, numpy.float64
+        """
+        with np.errstate(divide='ignore'):
+            return self._scalar(20 * np.log10(np.abs(self._response(x))), x)
+
+    def phase(self, x):
+        """
+        Returns the unwrapped phase of the frequency response at the
+        frequencies *x*, in degrees if ini.Hz == True, else in radians.
+
+        :param x: Frequencies
+        :type x: float, list, numpy.ndarray
+
+        :return: Phase angles; a scalar for a scalar *x*
+        :rtype: numpy.ndarray, numpy.float64
+        """
+        phase = np.unwrap(np.angle(self._response(x)))
+        if ini.Hz:
+            phase = phase * 180/np.pi
+        return self._scalar(phase, x)
+
+    def delay(self, x, delta=None):
+        """
+        Returns the group delay of the frequency response at the frequencies
+        *x*:
+
+        delay = -d(phase)/d(omega) = Re(D'(s)/D(s) - N'(s)/N(s))
+
+        :param x: Frequencies
+        :type x: float, list, numpy.ndarray
+
+        :param delta: Not used, the delay is calculated analytically.
+        :type delta: float, NoneType
+
+        :return: Group delays; a scalar for a scalar *x*
+        :rtype: numpy.ndarray, numpy.float64
+        """
+        s = np.atleast_1d(np.array(x, dtype=float))
+        if ini.Hz:
+            s = 2j * np.pi * s
+        else:
+            s = 1j * s
+        with np.errstate(all='ignore'):
+            delay = np.real(polyval(s, polyder(self.denom))/polyval(s, self.denom) -
+                            polyval(s, polyder(self.numer))/polyval(s, self.numer))
+        return self._scalar(delay, x)
+
+    def solve(self, s):
+        """
+        Returns the values of the rational function at the values *s* of the
+        Laplace variable.
+
+        :param s: Values of the Laplace variable
+        :type s: numpy.ndarray
+
+        :return: Function values
+        :rtype: numpy.ndarray
+        """
+        s = np.atleast_1d(np.array(s, dtype=complex))
+        with np.errstate(all='ignore'):
+            return polyval(s, self.numer) / polyval(s, self.denom)
+
+def makeRationalResponse(LaplaceExpr):
+    """
+    Returns the frequency response of a rational function of the Laplace
+    variable with numeric coefficients.
+
+    The coefficients are obtained once for each function; the last
+    RESPONSECACHE responses are kept, such that the magnitude, phase and
+    delay functions share the same response object.
+
+    :param LaplaceExpr: Univariate function of the Laplace variable.
+    :type LaplaceExpr: sympy.Expr
+
+    :return: Frequency response, or None if *LaplaceExpr* is not a rational
+             function of the Laplace variable with real numeric coefficients,
+             or if ini.lambdifyTool is not "numpy".
+    :rtype: SLiCAPmath.rationalResponse, NoneType
+    """
+    if ini.lambdifyTool != "numpy" or not isinstance(LaplaceExpr, sp.Expr):
+        return None
+    if LaplaceExpr in _responses:
+        return _responses[LaplaceExpr]
+    response = None
+    if LaplaceExpr.free_symbols <= set([ini.Laplace]):
+        numer, denom = LaplaceExpr.as_numer_denom()
+        try:
+            numer = [float(coeff) for coeff in sp.Poly(sp.expand(numer), ini.Laplace).all_coeffs()[::-1]]
+            denom = [float(coeff) for coeff in sp.Poly(sp.expand(denom), ini.Laplace).all_coeffs()[::-1]]
+            if np.all(np.isfinite(numer + denom)):
+                response = rationalResponse(numer, denom)
+        except (sp.PolynomialError, TypeError):
+            response = None
+    if len(_responses) >= RESPONSECACHE:
+        del _responses[next(iter(_responses))]
+    _responses[LaplaceExpr] = response
+    return response
+
 def magFunc_f(LaplaceExpr, f):
     """
     Calculates the magnitude at the real frequency f (Fourier) from the
@@ -646,8 +1260,13 @@ def magFunc_f(LaplaceExpr, f):
     If ini.Hz == False, the Laplace variable will be replaced with
     sp.I*ini.frequency.
 
-    :param LaplaceExpr: Univariate function of the Laplace variable.
-    :type LaplaceExpr: sympy.Expr
+    :param LaplaceExpr: Univariate function of the Laplace variable, or a
+                        numeric frequency response (*SLiCAPnumeric.acResponse*
+                        or *SLiCAPmath.rationalResponse*). Rational functions
+                        with numeric coefficients are evaluated with a
+                        **rationalResponse** object.
+    :type LaplaceExpr: sympy.Expr, SLiCAPnumeric.acResponse,
+                       SLiCAPmath.rationalResponse
 
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
@@ -657,6 +1276,12 @@ def magFunc_f(LaplaceExpr, f):
 
     :rtype: float, numpy.array
     """
+    if hasattr(LaplaceExpr, 'response'):
+        # Numeric frequency response (SLiCAPnumeric.acResponse)
+        return LaplaceExpr.mag(f)
+    response = makeRationalResponse(LaplaceExpr)
+    if response != None:
+        return response.mag(f)
 
     if type(f) == list:
         # Convert lists into numpy arrays
@@ -680,8 +1305,13 @@ def dBmagFunc_f(LaplaceExpr, f):
     If ini.Hz == False, the Laplace variable will be replaced with
     sp.I*ini.frequency.
 
-    :param LaplaceExpr: Univariate function of the Laplace variable.
-    :type LaplaceExpr: sympy.Expr
+    :param LaplaceExpr: Univariate function of the Laplace variable, or a
+                        numeric frequency response (*SLiCAPnumeric.acResponse*
+                        or *SLiCAPmath.rationalResponse*). Rational functions
+                        with numeric coefficients are evaluated with a
+                        **rationalResponse** object.
+    :type LaplaceExpr: sympy.Expr, SLiCAPnumeric.acResponse,
+                       SLiCAPmath.rationalResponse
 
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
@@ -691,6 +1321,12 @@ def dBmagFunc_f(LaplaceExpr, f):
 
     :rtype: float, numpy.array
     """
+    if hasattr(LaplaceExpr, 'response'):
+        # Numeric frequency response (SLiCAPnumeric.acResponse)
+        return LaplaceExpr.dBmag(f)
+    response = makeRationalResponse(LaplaceExpr)
+    if response != None:
+        return response.dBmag(f)
 
     if type(f) == list:
         f = np.array(f)
@@ -712,8 +1348,13 @@ def phaseFunc_f(LaplaceExpr, f):
     If ini.Hz == False, the Laplace variable will be replaced with
     sp.I*ini.frequency.
 
-    :param LaplaceExpr: Univariate function of the Laplace variable.
-    :type LaplaceExpr: sympy.Expr
+    :param LaplaceExpr: Univariate function of the Laplace variable, or a
+                        numeric frequency response (*SLiCAPnumeric.acResponse*
+                        or *SLiCAPmath.rationalResponse*). Rational functions
+                        with numeric coefficients are evaluated with a
+                        **rationalResponse** object.
+    :type LaplaceExpr: sympy.Expr, SLiCAPnumeric.acResponse,
+                       SLiCAPmath.rationalResponse
 
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
@@ -723,6 +1364,12 @@ def phaseFunc_f(LaplaceExpr, f):
 
     :rtype: float, numpy.array
     """
+    if hasattr(LaplaceExpr, 'response'):
+        # Numeric frequency response (SLiCAPnumeric.acResponse)
+        return LaplaceExpr.phase(f)
+    response = makeRationalResponse(LaplaceExpr)
+    if response != None:
+        return response.phase(f)
     if type(f) == list:
         f = np.array(f)
     if ini.Hz == True:
@@ -763,17 +1410,33 @@ def delayFunc_f(LaplaceExpr, f, delta=10**(-ini.disp)):
     If ini.Hz == False, the Laplace variable will be replaced with
     sp.I*ini.frequency.
 
-    :param LaplaceExpr: Univariate function of the Laplace variable.
-    :type LaplaceExpr: sympy.Expr
+    :param LaplaceExpr: Univariate function of the Laplace variable, or a
+                        numeric frequency response (*SLiCAPnumeric.acResponse*
+                        or *SLiCAPmath.rationalResponse*). Rational functions
+                        with numeric coefficients are evaluated with a
+                        **rationalResponse** object.
+    :type LaplaceExpr: sympy.Expr, SLiCAPnumeric.acResponse,
+                       SLiCAPmath.rationalResponse
 
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
 
+    :param delta: Relative frequency step for the differentiation of the phase.
+                  Not used for rational functions with numeric coefficients:
+                  their group delay is calculated analytically.
+    :type delta: float
+
     :return: Group delay at the specified frequency, or list with group delays
              at the specified frequencies.
 
     :rtype: float, numpy.array
     """
+    if hasattr(LaplaceExpr, 'response'):
+        # Numeric frequency response (SLiCAPnumeric.acResponse)
+        return LaplaceExpr.delay(f, delta)
+    response = makeRationalResponse(LaplaceExpr)
+    if response != None:
+        return response.delay(f)
 
     if type(f) == list:
         f = np.array(f)
@@ -1216,12 +1879,22 @@ def rmsNoise(noiseResult, noise, fmin, fmax, source=None, CDS=False, tau=None):
     rms = []
     if errors == 0:
         numSteps = 1
-        if type(noiseResult.onoise) == list:
+        if type(noiseResult.onoise) == list or hasattr(noiseResult.onoise, 'evaluate'):
             numSteps = len(noiseResult.onoise)
+        stepped = {}
+        if numlimits and not CDS:
+            for src in noiseSources:
+                if hasattr(noiseData[src], 'evaluate'):
+                    # Stepped spectra (SLiCAPnumeric.steppedRational), integrate all steps at once
+                    spectra = noiseData[src]
+                    stepped[src] = quad_vec(lambda f: np.real(spectra.evaluate(f)[:, 0]), fmin, fmax)[0]
         for i in range(numSteps):
             var_i = 0
             for src in noiseSources:
-                if type(noiseData[src]) != list:
+                if src in stepped:
+                    var_i += sp.Float(stepped[src][i])
+                    continue
+                if type(noiseData[src]) != list and not hasattr(noiseData[src], 'evaluate'):
                     data = noiseData[src]
                 else:
                     data = noiseData[src][i]
@@ -1478,6 +2151,55 @@ if __name__ == "__main__":
     print(t3-t2)
     print(t4-t3)
 
+    # Benchmark of det() against recursive minor expansion along column 0
+    # with matrix copies (the former implementation of det()) and against
+    # sympy.Matrix.det(), for the symbolic MNA matrix of an RC ladder network
+    def detRecursive(M):
+        dim = M.shape[0]
+        if dim == 2:
+            D = sp.expand(M[0,0]*M[1,1]-M[1,0]*M[0,1])
+        else:
+            D = 0
+            for i in range(dim):
+                if M[i,0] != 0:
+                    newM = M.copy()
+                    newM.row_del(i)
+                    newM.col_del(0)
+                    D += M[i,0] * (-1)**(i%2)*detRecursive(newM)
+        return sp.expand(D)
+
+    def ladderMatrix(dim):
+        M = sp.zeros(dim, dim)
+        M[0, 0] = 1/sp.Symbol('R_s')
+        for i in range(dim):
+            M[i, i] += s*sp.Symbol('C_' + str(i))
+            if i + 1 < dim:
+                g = 1/sp.Symbol('R_' + str(i))
+                M[i, i] += g
+                M[i + 1, i + 1] += g
+                M[i, i + 1] -= g
+                M[i + 1, i] -= g
+        return M
+
+    for dim in (6, 9, 12):
+        M = ladderMatrix(dim)
+        t1 = time()
+        D1 = det(M, method='ME')
+        t2 = time()
+        D2 = det(M, method='bareiss')
+        t3 = time()
+        D3 = detRecursive(M)
+        t4 = time()
+        print('dim:', dim, 'terms:', len(D1.args))
+        print('det(M, "ME")     :', t2-t1, 's')
+        print('det(M, "bareiss"):', t3-t2, 's')
+        print('recursive        :', t4-t3, 's')
+        if dim <= 6:
+            t5 = time()
+            D4 = M.det()
+            t6 = time()
+            print('M.det()          :', t6-t5, 's')
+
     LG = sp.sympify("-0.00647263929159112*(1.42481097731728e-5*s**2 + s)/(6.46865378347277e-16*s**3 + 2.0274790076825e-8*s**2 + 0.0014352663537982*s + 1.0)")
     print(findServoBandwidth(LG))
 
@@ -90,6 +90,12 @@ def makeMatrices(instr):
     Returns the MNA matrix and the vector with dependent variables of a circuit.
     The entries in the matrix depend on the instruction type.
 
+    The stamps of the elements are kept in a matrix template that is stored
+    in the circuit object (see **mnaTemplate**). If only parameter
+    definitions have been changed since the previous call, as with parameter
+    stepping, only the elements that depend on the changed parameters are
+    stamped again.
+
     :param cir: Circuit of which the matrices need to be returned.
     :type cir: SLiCAPprotos.circuit
 
@@ -102,228 +108,427 @@ def makeMatrices(instr):
 
     :return: tuple with two sympy matrices:
 
-             #. MNA matrix M
+             #. MNA matrix M (*sympy.SparseMatrix*)
              #. Vector with dependent variables Dv
     :return type: tuple
     """
     cir      = instr.circuit
-    parDefs  = instr.parDefs
-    numeric  = instr.numeric
+    template = cir.mnaTemplate
+    if template == None or template.numeric != instr.numeric:
+        template = mnaTemplate(cir, instr.parDefs, instr.numeric)
+        cir.mnaTemplate = template
+    else:
+        template.update(instr.parDefs)
+    return template.matrices()
+
+class mnaTemplate(object):
+    """
+    Stamped MNA matrix of a circuit.
+
+    The stamps are collected in a dict with (row, col) keys and dicts with
+    lists of terms per element as values. The row and the column of the
+    ground node are left out of the matrix. An index with the parameters on
+    which the elements depend is used to re-stamp only the affected elements
+    after a change of parameter definitions.
+
+    The template is stored in the circuit object and it is discarded by
+    **circuit.defPar()**, **circuit.delPar()**, **circuit.defPars()** and
+    **updateCirData()**.
+
+    :param cir: Circuit of which the matrix needs to be stamped.
+    :type cir: SLiCAPprotos.circuit
+
+    :param parDefs: Dict with key value pairs:
+
+                    - key  : parameter name (sympy.Symbol)
+                    - value: numeric value of sympy expression
+    :type parDefs: dict
 
+    :param numeric: If True is uses full substitution and sympy.N for
+                    converting parameters to sympy floats
+    :type numeric: bool
+    """
+    def __init__(self, cir, parDefs, numeric):
+        self.cir     = cir
+        """
+        Circuit (*SLiCAPprotos.circuit*) of this template.
+        """
+
+        self.numeric = numeric
+        """
+        (*bool*) True if the entries have been evaluated numerically.
+        """
+
+        self.resolver = parResolver(parDefs)
+        """
+        Resolver (*SLiCAPmath.parResolver*) with the parameter definitions
+        used for stamping.
+        """
+
+        self.stamps  = defaultdict(dict)
+        """
+        (*dict*) with key-value pairs:
+
+        - key: position (row, col) (*tuple*) in the matrix without ground
+        - value: (*dict*) with refDes (*str*) as key and a list with terms
+          (*sympy.Expr*) as value
+        """
+
+        self.entries = {}
+        """
+        (*dict*) with nonzero matrix entries; key: position (*tuple*),
+        value: sum of the terms of all elements (*sympy.Expr*)
+        """
+
+        self.elements = {}
+        """
+        (*dict*) with refDes (*str*) as key and a list with the positions
+        (*tuple*) of its stamps as value.
+        """
+
+        self.index   = defaultdict(set)
+        """
+        (*dict*) with a parameter (*sympy.Symbol*) as key and a set with
+        refDes (*str*) of elements that depend on it as value.
+        """
+
+        self.deps    = {}
+        """
+        (*dict*) with refDes (*str*) as key and the set of parameters
+        (*sympy.Symbol*) on which the element depends as value.
+        """
+
+        varIndex = cir.varIndex
+        dim      = len(list(varIndex.keys()))
+        gndPos   = varIndex['0']
+        # Matrix positions without the ground node
+        self.pos = [i for i in range(dim)]
+        for i in range(gndPos + 1, dim):
+            self.pos[i] -= 1
+        self.pos[gndPos] = None
+        self.dim = dim - 1
+        self.Dv  = [sp.Symbol(cir.depVars[i]) for i in range(dim) if i != gndPos]
+        for refDes in list(cir.elements.keys()):
+            self.stamp(refDes)
+        for position in list(self.stamps.keys()):
+            self.sumEntry(position)
+
+    def stamp(self, refDes):
+        """
+        Stamps the element *refDes* and updates the parameter index.
+
+        :param refDes: Reference designator of the element
+        :type refDes: str
+
+        :return: Positions of the stamps of the element
+        :rtype: list
+        """
+        elmt = self.cir.elements[refDes]
+        positions = []
+        for (row, col), terms in stampElement(elmt, self.cir, self.numeric, self.resolver).items():
+            row, col = self.pos[row], self.pos[col]
+            if row != None and col != None:
+                self.stamps[row, col][refDes] = terms
+                positions.append((row, col))
+        self.elements[refDes] = positions
+        if self.numeric:
+            deps = set()
+            for param in list(elmt.params.values()):
+                deps |= self.resolver.dependencies(param)
+            if elmt.model == 'K':
+                for ref in elmt.refs:
+                    for param in list(self.cir.elements[ref].params.values()):
+                        deps |= self.resolver.dependencies(param)
+            self.deps[refDes] = deps
+            for param in deps:
+                self.index[param].add(refDes)
+        return positions
+
+    def sumEntry(self, position):
+        """
+        Sums the terms of all elements at *position*.
+
+        :param position: Position (row, col) in the matrix
+        :type position: tuple
+        """
+        terms = []
+        for elTerms in list(self.stamps[position].values()):
+            terms += elTerms
+        value = sp.Add(*terms)
+        if value != 0:
+            self.entries[position] = value
+        else:
+            self.entries.pop(position, None)
+
+    def update(self, parDefs):
+        """
+        Re-stamps the elements that depend on parameters of which the
+        definition differs from the one used for the previous stamping.
+
+        :param parDefs: Dict with key value pairs:
+
+                        - key  : parameter name (sympy.Symbol)
+                        - value: numeric value of sympy expression
+        :type parDefs: dict
+        """
+        changed = self.resolver.update(parDefs)
+        if not self.numeric or len(changed) == 0:
+            return
+        affected = set()
+        for param in changed:
+            affected |= self.index.get(param, set())
+        positions = set()
+        for refDes in affected:
+            # Remove the old stamps and the old index entries
+            for position in self.elements[refDes]:
+                del self.stamps[position][refDes]
+                positions.add(position)
+            for param in self.deps[refDes]:
+                self.index[param].discard(refDes)
+            positions |= set(self.stamp(refDes))
+        for position in positions:
+            self.sumEntry(position)
+
+    def matrices(self):
+        """
+        Returns the MNA matrix and the vector with dependent variables.
+
+        :return: tuple with two sympy matrices:
+
+                 #. MNA matrix M (*sympy.SparseMatrix*)
+                 #. Vector with dependent variables Dv
+        :return type: tuple
+        """
+        M = sp.SparseMatrix(self.dim, self.dim, dict(self.entries))
+        return (M, sp.Matrix(self.Dv))
+
+def stampElement(elmt, cir, numeric, parDefs):
+    """
+    Returns the stamps of an element in the MNA matrix.
+
+    :param elmt: element object
+    :type elmt: SLiCAPprotos.element
+
+    :param cir: Circuit that holds the element
+    :type cir: SLiCAPprotos.circuit
+
+    :param numeric: If True is uses full substitution and sympy.N for
+                    converting parameters to sympy floats
+    :type numeric: bool
+
+    :param parDefs: Dict with key value pairs:
+
+                    - key  : parameter name (sympy.Symbol)
+                    - value: numeric value of sympy expression
+    :type parDefs: dict
+
+    :return: Dict with the position (row, col) in the matrix including the
+             ground node as key and a list with terms as value.
+    :rtype: dict
+    """
     varIndex = cir.varIndex
-    dim = len(list(cir.varIndex.keys()))
-    Dv = sp.Matrix([0 for i in range(dim)])
-    M  = sp.zeros(dim)
-    for i in range(len(cir.depVars)):
-        Dv[i] = sp.Symbol(cir.depVars[i])
-    for el in list(cir.elements.keys()):
-        elmt = cir.elements[el]
-        if elmt.model == 'C':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, pos0] += value * ini.Laplace
-            M[pos0, pos1] -= value * ini.Laplace
-            M[pos1, pos0] -= value * ini.Laplace
-            M[pos1, pos1] += value * ini.Laplace
-        elif elmt.model == 'L':
-            dVarPos = varIndex['I_'+ elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-            M[dVarPos, dVarPos] -= value * ini.Laplace
-        elif elmt.model == 'R':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = 1/getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, pos0] += value
-            M[pos0, pos1] -= value
-            M[pos1, pos0] -= value
-            M[pos1, pos1] += value
-        elif elmt.model == 'r':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-            M[dVarPos, dVarPos] -= value
-        elif elmt.model == 'E':
-            dVarPos = varIndex['Io_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += denom
-            M[dVarPos, pos1] -= denom
-            M[dVarPos, pos2] -= numer
-            M[dVarPos, pos3] += numer
-        elif elmt.model == 'EZ':
-            dVarPos = varIndex['Io_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
-            (zoN, zoD) = getValues(elmt, 'zo', numeric, parDefs)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += denom * zoD
-            M[dVarPos, pos1] -= denom * zoD
-            M[dVarPos, pos2] -= numer * zoD
-            M[dVarPos, pos3] += numer * zoD
-            M[dVarPos, dVarPos] -= zoN * denom
-        elif elmt.model == 'F':
-            dVarPos = varIndex['Ii_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPos] += numer
-            M[pos1, dVarPos] -= numer
-            M[pos2, dVarPos] += denom
-            M[pos3, dVarPos] -= denom
-            M[dVarPos, pos2] += 1
-            M[dVarPos, pos3] -= 1
-        elif elmt.model == 'g':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            value = getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, pos2] += value
-            M[pos0, pos3] -= value
-            M[pos1, pos2] -= value
-            M[pos1, pos3] += value
-        elif elmt.model == 'G':
-            dVarPos = varIndex['Io_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos2] += numer
-            M[dVarPos, pos3] -= numer
-            M[dVarPos, dVarPos] -= denom
-        elif elmt.model == 'H':
-            dVarPosO = varIndex['Io_' + elmt.refDes]
-            dVarPosI = varIndex['Ii_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPosO] += 1
-            M[pos1, dVarPosO] -= 1
-            M[pos2, dVarPosI] += 1
-            M[pos3, dVarPosI] -= 1
-            M[dVarPosI, pos2] += 1
-            M[dVarPosI, pos3] -= 1
-            M[dVarPosO, pos0] += denom
-            M[dVarPosO, pos1] -= denom
-            M[dVarPosO, dVarPosI] -= numer
-        elif elmt.model == 'HZ':
-            dVarPosO = varIndex['Io_' + elmt.refDes]
-            dVarPosI = varIndex['Ii_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
-            (zoN, zoD) = getValues(elmt, 'zo', numeric, parDefs)
-            M[pos0, dVarPosO] += 1
-            M[pos1, dVarPosO] -= 1
-            M[pos2, dVarPosI] += 1
-            M[pos3, dVarPosI] -= 1
-            M[dVarPosI, pos2] += 1
-            M[dVarPosI, pos3] -= 1
-            M[dVarPosO, pos0] += denom * zoD
-            M[dVarPosO, pos1] -= denom * zoD
-            M[dVarPosO, dVarPosI] -= numer * zoD
-            M[dVarPosO, dVarPosO] -= zoN * denom
-        elif elmt.model == 'N':
-            dVarPos = varIndex['Io_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos2] += 1
-            M[dVarPos, pos3] -= 1
-        elif elmt.model == 'T':
-            dVarPos = varIndex['Io_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            value = getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[pos2, dVarPos] -= value
-            M[pos3, dVarPos] += value
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-            M[dVarPos, pos2] -= value
-            M[dVarPos, pos3] += value
-        elif elmt.model == 'V':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            dVarPos = varIndex['I_' + elmt.refDes]
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-        elif elmt.model == 'VZ':
-            (zoN, zoD) = getValues(elmt, 'zo', numeric, parDefs)
-            pos1 = varIndex[elmt.nodes[1]]
-            pos0 = varIndex[elmt.nodes[0]]
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += zoD
-            M[dVarPos, pos1] -= zoD
-            M[dVarPos, dVarPos] -= zoN
-        elif elmt.model == 'W':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            value = getValue(elmt, 'value', numeric, parDefs)
-            M[pos0, pos2] += value
-            M[pos0, pos3] -= value
-            M[pos1, pos2] -= value
-            M[pos1, pos3] += value
-            M[pos2, pos0] -= value
-            M[pos2, pos1] += value
-            M[pos3, pos0] += value
-            M[pos3, pos1] -= value
-        elif elmt.model == 'K':
-            refPos1 = varIndex['I_' + elmt.refs[0]]
-            refPos0 = varIndex['I_' + elmt.refs[1]]
-            ind0    = getValue(cir.elements[elmt.refs[0]], 'value', numeric, parDefs)
-            ind1    = getValue(cir.elements[elmt.refs[1]], 'value', numeric, parDefs)
-            value = getValue(elmt, 'value', numeric, parDefs)
-            value = value * ini.Laplace * sp.sqrt(ind0 * ind1)
-            M[refPos0, refPos1] -= value
-            M[refPos1, refPos0] -= value
-    gndPos = varIndex['0']
-    M.row_del(gndPos)
-    M.col_del(gndPos)
-    Dv = sp.Matrix(Dv)
-    Dv.row_del(gndPos)
-    return (M, Dv)
+    M = defaultdict(list)
+    if elmt.model == 'C':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, pos0].append(value * ini.Laplace)
+        M[pos0, pos1].append(-value * ini.Laplace)
+        M[pos1, pos0].append(-value * ini.Laplace)
+        M[pos1, pos1].append(value * ini.Laplace)
+    elif elmt.model == 'L':
+        dVarPos = varIndex['I_'+ elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos0].append(1)
+        M[dVarPos, pos1].append(-1)
+        M[dVarPos, dVarPos].append(-value * ini.Laplace)
+    elif elmt.model == 'R':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = 1/getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, pos0].append(value)
+        M[pos0, pos1].append(-value)
+        M[pos1, pos0].append(-value)
+        M[pos1, pos1].append(value)
+    elif elmt.model == 'r':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos0].append(1)
+        M[dVarPos, pos1].append(-1)
+        M[dVarPos, dVarPos].append(-value)
+    elif elmt.model == 'E':
+        dVarPos = varIndex['Io_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos0].append(denom)
+        M[dVarPos, pos1].append(-denom)
+        M[dVarPos, pos2].append(-numer)
+        M[dVarPos, pos3].append(numer)
+    elif elmt.model == 'EZ':
+        dVarPos = varIndex['Io_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
+        (zoN, zoD) = getValues(elmt, 'zo', numeric, parDefs)
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos0].append(denom * zoD)
+        M[dVarPos, pos1].append(-denom * zoD)
+        M[dVarPos, pos2].append(-numer * zoD)
+        M[dVarPos, pos3].append(numer * zoD)
+        M[dVarPos, dVarPos].append(-zoN * denom)
+    elif elmt.model == 'F':
+        dVarPos = varIndex['Ii_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPos].append(numer)
+        M[pos1, dVarPos].append(-numer)
+        M[pos2, dVarPos].append(denom)
+        M[pos3, dVarPos].append(-denom)
+        M[dVarPos, pos2].append(1)
+        M[dVarPos, pos3].append(-1)
+    elif elmt.model == 'g':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        value = getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, pos2].append(value)
+        M[pos0, pos3].append(-value)
+        M[pos1, pos2].append(-value)
+        M[pos1, pos3].append(value)
+    elif elmt.model == 'G':
+        dVarPos = varIndex['Io_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos2].append(numer)
+        M[dVarPos, pos3].append(-numer)
+        M[dVarPos, dVarPos].append(-denom)
+    elif elmt.model == 'H':
+        dVarPosO = varIndex['Io_' + elmt.refDes]
+        dVarPosI = varIndex['Ii_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPosO].append(1)
+        M[pos1, dVarPosO].append(-1)
+        M[pos2, dVarPosI].append(1)
+        M[pos3, dVarPosI].append(-1)
+        M[dVarPosI, pos2].append(1)
+        M[dVarPosI, pos3].append(-1)
+        M[dVarPosO, pos0].append(denom)
+        M[dVarPosO, pos1].append(-denom)
+        M[dVarPosO, dVarPosI].append(-numer)
+    elif elmt.model == 'HZ':
+        dVarPosO = varIndex['Io_' + elmt.refDes]
+        dVarPosI = varIndex['Ii_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = getValues(elmt, 'value', numeric, parDefs)
+        (zoN, zoD) = getValues(elmt, 'zo', numeric, parDefs)
+        M[pos0, dVarPosO].append(1)
+        M[pos1, dVarPosO].append(-1)
+        M[pos2, dVarPosI].append(1)
+        M[pos3, dVarPosI].append(-1)
+        M[dVarPosI, pos2].append(1)
+        M[dVarPosI, pos3].append(-1)
+        M[dVarPosO, pos0].append(denom * zoD)
+        M[dVarPosO, pos1].append(-denom * zoD)
+        M[dVarPosO, dVarPosI].append(-numer * zoD)
+        M[dVarPosO, dVarPosO].append(-zoN * denom)
+    elif elmt.model == 'N':
+        dVarPos = varIndex['Io_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos2].append(1)
+        M[dVarPos, pos3].append(-1)
+    elif elmt.model == 'T':
+        dVarPos = varIndex['Io_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        value = getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[pos2, dVarPos].append(-value)
+        M[pos3, dVarPos].append(value)
+        M[dVarPos, pos0].append(1)
+        M[dVarPos, pos1].append(-1)
+        M[dVarPos, pos2].append(-value)
+        M[dVarPos, pos3].append(value)
+    elif elmt.model == 'V':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        dVarPos = varIndex['I_' + elmt.refDes]
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos0].append(1)
+        M[dVarPos, pos1].append(-1)
+    elif elmt.model == 'VZ':
+        (zoN, zoD) = getValues(elmt, 'zo', numeric, parDefs)
+        pos1 = varIndex[elmt.nodes[1]]
+        pos0 = varIndex[elmt.nodes[0]]
+        M[pos0, dVarPos].append(1)
+        M[pos1, dVarPos].append(-1)
+        M[dVarPos, pos0].append(zoD)
+        M[dVarPos, pos1].append(-zoD)
+        M[dVarPos, dVarPos].append(-zoN)
+    elif elmt.model == 'W':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        value = getValue(elmt, 'value', numeric, parDefs)
+        M[pos0, pos2].append(value)
+        M[pos0, pos3].append(-value)
+        M[pos1, pos2].append(-value)
+        M[pos1, pos3].append(value)
+        M[pos2, pos0].append(-value)
+        M[pos2, pos1].append(value)
+        M[pos3, pos0].append(value)
+        M[pos3, pos1].append(-value)
+    elif elmt.model == 'K':
+        refPos1 = varIndex['I_' + elmt.refs[0]]
+        refPos0 = varIndex['I_' + elmt.refs[1]]
+        ind0    = getValue(cir.elements[elmt.refs[0]], 'value', numeric, parDefs)
+        ind1    = getValue(cir.elements[elmt.refs[1]], 'value', numeric, parDefs)
+        value = getValue(elmt, 'value', numeric, parDefs)
+        value = value * ini.Laplace * sp.sqrt(ind0 * ind1)
+        M[refPos0, refPos1].append(-value)
+        M[refPos1, refPos0].append(-value)
+    return M
 
 def makeSrcVector(cir, parDefs, elid, value = 'id', numeric = True):
     """
@@ -0,0 +1,1495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SLiCAP module for numeric evaluation of the matrix equation with NumPy.
+
+The MNA matrix of a circuit of which all parameters have numeric values is a
+polynomial matrix in the Laplace variable:
+
+    M(s) = M_0 + s M_1 + s^2 M_2 + ...
+
+Network functions are obtained from samples of the determinant and of the
+solution of the matrix equation on circles in the complex plane. The
+coefficients of the polynomials are found with the FFT. This replaces the
+symbolic evaluation with Maxima CAS for fully numeric instructions.
+
+Imported by the module **SLiCAPddd.py**
+"""
+from SLiCAP.SLiCAPmatrices import *
+
+NUMSNR     = 1e3
+"""
+Minimum ratio of the magnitude of a coefficient and its noise level. The
+noise level is estimated from the coefficients above the degree bound, which
+should be zero. Coefficients that do not reach this ratio on any of the
+sampled circles are considered zero.
+"""
+
+NUMEXTRA   = 8
+"""
+Number of sample points above the degree bound used for estimation of the
+noise level.
+"""
+
+NUMMAXPASS = 12
+"""
+Maximum number of sample circles below and above the initial sample circle.
+"""
+
+NUMSTEP    = 1e3
+"""
+Ratio of the radii of two successive sample circles.
+"""
+
+NUMCHUNK   = 2**20
+"""
+Maximum number of matrix entries that is stacked for a batched solution of
+the matrix equation at multiple frequencies.
+"""
+
+NUMACCHECK = 1e-6
+"""
+Maximum relative difference between a frequency response obtained from the
+QZ decomposition and the one obtained from an LU decomposition at a check
+frequency. If it is exceeded, the response is calculated with LU
+decompositions at all frequencies.
+"""
+
+NUMEIGMAX  = 1e12
+"""
+Generalized eigenvalues of which the magnitude exceeds NUMEIGMAX times the
+frequency scale of the matrix are considered infinite.
+"""
+
+MCCHUNK    = 2**16
+"""
+Number of samples that is evaluated at once in a Monte Carlo analysis. The
+memory use of the analysis is bounded by a few arrays of this length per
+evaluated quantity.
+"""
+
+MCDATA     = {'laplace': 'laplace', 'numer': 'numer', 'denom': 'denom',
+              'dc': 'dc', 'solve': 'solve', 'dcsolve': 'dcSolve'}
+"""
+Attributes of an **allResults()** object that hold the symbolic results of
+the data types that can be used in a Monte Carlo analysis.
+"""
+
+def polyMatrix(M, var=ini.Laplace):
+    """
+    Returns the coefficient matrices of a polynomial matrix.
+
+    :param M: Sympy matrix of which the entries are polynomials in *var* with
+              numeric coefficients.
+    :type M: sympy.Matrix
+
+    :param var: Indeterminate of the polynomials
+    :type var: sympy.Symbol
+
+    :return: Array with shape (order+1, rows, cols) of which element k holds
+             the coefficients of var^k, or None if an entry is not a numeric
+             polynomial in *var*.
+    :rtype: numpy.ndarray, NoneType
+    """
+    rows, cols = M.shape
+    coeffs = {}
+    order = 0
+    for pos, value in M.todok().items():
+        if value.free_symbols - {var}:
+            return None
+        try:
+            poly = sp.Poly(value, var)
+        except sp.PolynomialError:
+            return None
+        entryCoeffs = poly.all_coeffs()[::-1]
+        order = max(order, len(entryCoeffs) - 1)
+        coeffs[pos] = [complex(coeff) for coeff in entryCoeffs]
+    Mk = np.zeros((order + 1, rows, cols))
+    for (i, j), entryCoeffs in coeffs.items():
+        for k in range(len(entryCoeffs)):
+            if entryCoeffs[k].imag != 0:
+                return None
+            Mk[k, i, j] = entryCoeffs[k].real
+    return Mk
+
+def polyRHS(Iv, var=ini.Laplace, srcVars=None):
+    """
+    Returns the coefficient matrices of the right-hand side of the matrix
+    equation and the common denominator of its entries.
+
+    :param Iv: Vector with independent variables.
+    :type Iv: sympy.Matrix
+
+    :param var: Laplace variable
+    :type var: sympy.Symbol
+
+    :param srcVars: List with names of independent sources of which the
+                    vector *Iv* is a linear combination. If None, *Iv* itself
+                    is the only right-hand side.
+    :type srcVars: list, NoneType
+
+    :return: Tuple with the coefficient matrices (*numpy.ndarray* with shape
+             (order+1, rows, number of right-hand sides)) and the common
+             denominator (*sympy.Expr*) of the entries, or None.
+    :rtype: tuple, NoneType
+    """
+    if srcVars != None:
+        B = Iv.jacobian([sp.Symbol(name) for name in srcVars])
+    else:
+        B = Iv
+    denom = sp.S(1)
+    for value in B:
+        valueDenom = sp.fraction(sp.together(value))[1]
+        if valueDenom.has(var):
+            denom = sp.lcm(denom, valueDenom)
+    if denom != 1:
+        B = (B * denom).applyfunc(sp.cancel)
+    Bk = polyMatrix(B, var)
+    if Bk is None or denom.free_symbols - {var}:
+        return None
+    return Bk, denom
+
+def _evalPoly(Mk, s):
+    """
+    Returns the values of a polynomial matrix at the points *s*.
+
+    :param Mk: Coefficient matrices with shape (order+1, rows, cols).
+    :type Mk: numpy.ndarray
+
+    :param s: Array with points in the complex plane.
+    :type s: numpy.ndarray
+
+    :return: Array with shape (len(s), rows, cols)
+    :rtype: numpy.ndarray
+    """
+    powers = s[:, None]**np.arange(Mk.shape[0])[None, :]
+    return np.tensordot(powers, Mk, axes=(1, 0))
+
+def _samplePass(Mk, Bk, lhs, K, r, adjoint):
+    """
+    Samples the determinant of M(s) and the numerators lhs.adj(M).B on a
+    circle with radius *r* and returns the scaled polynomial coefficients.
+
+    Rows and columns of the sampled matrices are scaled with powers of two,
+    which improves the accuracy of the LU decompositions without changing
+    the results.
+
+    :return: Tuple with:
+
+             #. Array with shape (K, 1 + rows(lhs)*cols(B)) of which row j
+                holds the coefficients of s^j of the determinant and of the
+                numerators, multiplied with r^j/exp(L).
+             #. Array with the noise levels of these coefficients
+             #. Logarithmic scale factor L
+
+             or None if the matrix is singular on this circle.
+    :rtype: tuple, NoneType
+    """
+    Ks = K + NUMEXTRA
+    for theta in (0.1, 0.37, 0.73):
+        s = r * np.exp(1j * (2 * np.pi * np.arange(Ks) / Ks + theta))
+        with np.errstate(all='ignore'):
+            Ms = _evalPoly(Mk, s)
+            Bs = _evalPoly(Bk, s)
+        if not (np.all(np.isfinite(Ms)) and np.all(np.isfinite(Bs))):
+            return None
+        rowMax = np.max(np.abs(Ms), axis=(0, 2))
+        if np.any(rowMax == 0):
+            return None
+        R = 2.0**-np.round(np.log2(rowMax))
+        colMax = np.max(np.abs(Ms * R[None, :, None]), axis=(0, 1))
+        if np.any(colMax == 0):
+            return None
+        C = 2.0**-np.round(np.log2(colMax))
+        Ms = Ms * R[None, :, None] * C[None, None, :]
+        sign, logDet = np.linalg.slogdet(Ms)
+        if not np.all(np.isfinite(logDet)):
+            continue
+        logDet -= np.sum(np.log(R)) + np.sum(np.log(C))
+        try:
+            if adjoint:
+                # Y = M^-T.lhs^T, numerators: Y^T.B
+                Y = np.linalg.solve(np.transpose(Ms, (0, 2, 1)),
+                                    np.broadcast_to((lhs * C[None, :]).T, (Ks,) + lhs.T.shape))
+                Y = Y * R[None, :, None]
+                N = np.einsum('kip,kim->kpm', Y, Bs)
+                ref = np.einsum('kip,kim->kpm', np.abs(Y), np.abs(Bs))
+            else:
+                X = np.linalg.solve(Ms, Bs * R[None, :, None])
+                X = X * C[None, :, None]
+                N = np.einsum('pi,kim->kpm', lhs, X)
+                ref = np.einsum('pi,kim->kpm', np.abs(lhs), np.abs(X))
+        except np.linalg.LinAlgError:
+            continue
+        L = np.max(logDet)
+        d = sign * np.exp(logDet - L)
+        p, m = N.shape[1:]
+        values = np.concatenate((d[:, None], (d[:, None, None] * N).reshape(Ks, p * m)), axis=1)
+        ref = np.concatenate((np.abs(d)[:, None], (np.abs(d)[:, None, None] * ref).reshape(Ks, p * m)), axis=1)
+        coeffs = np.fft.fft(values, axis=0) / Ks
+        coeffs *= np.exp(-1j * theta * np.arange(Ks))[:, None]
+        noise = np.maximum(np.max(np.abs(coeffs[K:]), axis=0), 1e-15 * np.max(ref, axis=0))
+        return coeffs[:K].real, noise, L
+    return None
+
+def numCramer(Mk, Bk=None, lhs=None):
+    """
+    Returns the coefficients of the determinant D(s) of a polynomial matrix
+    M(s) and of the numerators N(s) = D(s).lhs.M(s)^-1.B(s).
+
+    With lhs = [[.., 1, .., -1, ..]] the numerator equals the difference of
+    the determinants of the Cramer matrices of the positive and the negative
+    detector, which is what Maxima CAS calculates with doNumer().
+
+    The polynomials are evaluated on circles in the complex plane. The radius
+    of the first circle is the geometric balance point of the coefficient
+    matrices. Additional circles with smaller and larger radii are added
+    until coefficients no longer emerge above the noise level. This resolves
+    polynomials with widely spread roots.
+
+    If rows(lhs) < cols(B) the numerators are obtained from solutions of the
+    transposed (adjoint) system. This requires only one solution per point,
+    irrespective of the number of right-hand sides.
+
+    :param Mk: Coefficient matrices of M(s) with shape (order+1, n, n)
+    :type Mk: numpy.ndarray
+
+    :param Bk: Coefficient matrices of B(s) with shape (order+1, n, m). If
+               None, only the determinant will be returned.
+    :type Bk: numpy.ndarray, NoneType
+
+    :param lhs: Array with shape (p, n); defaults to the identity matrix.
+    :type lhs: numpy.ndarray, NoneType
+
+    :return: Tuple with:
+
+             #. List with coefficients (*sympy.Float*) of D(s) in ascending
+                order of s
+             #. Nested list with shape (p, m) with lists of coefficients of the
+                numerators in ascending order of s
+
+             or None if the matrix is singular.
+    :rtype: tuple, NoneType
+    """
+    n = Mk.shape[1]
+    if Bk is None:
+        Bk = np.zeros((1, n, 0))
+        lhs = np.zeros((0, n))
+    elif lhs is None:
+        lhs = np.eye(n)
+    p, m = lhs.shape[0], Bk.shape[2]
+    # Degree bound of the determinant
+    nonZero = Mk != 0
+    degrees = np.arange(Mk.shape[0])[:, None]
+    colDegrees = np.max(np.where(np.any(nonZero, axis=1), degrees, -1), axis=0)
+    rowDegrees = np.max(np.where(np.any(nonZero, axis=2), degrees, -1), axis=0)
+    if np.any(colDegrees < 0) or np.any(rowDegrees < 0):
+        return None
+    K = min(np.sum(colDegrees), np.sum(rowDegrees)) + Bk.shape[0]
+    # Initial radius: balance point of the lowest and highest order matrices
+    r = 1.0
+    order = Mk.shape[0] - 1
+    if order > 0:
+        lowest, highest = np.max(np.abs(Mk[0])), np.max(np.abs(Mk[order]))
+        if lowest > 0 and highest > 0:
+            r = (lowest/highest)**(1/order)
+    npoly = 1 + p * m
+    bestSnr = np.zeros((K, npoly))
+    bestLog = np.full((K, npoly), -np.inf)
+    bestSign = np.zeros((K, npoly))
+
+    def addPass(radius):
+        sampled = _samplePass(Mk, Bk, lhs, K, radius, p < m)
+        if sampled is None:
+            return None
+        coeffs, noise, L = sampled
+        with np.errstate(divide='ignore', invalid='ignore'):
+            snr = np.abs(coeffs) / noise[None, :]
+            logMag = np.log(np.abs(coeffs)) + L - np.arange(K)[:, None] * np.log(radius)
+        snr[~np.isfinite(snr)] = 0
+        better = snr > bestSnr
+        newCoeffs = np.sum(better & (snr >= NUMSNR) & (bestSnr < NUMSNR))
+        bestSnr[better] = snr[better]
+        bestLog[better] = logMag[better]
+        bestSign[better] = np.sign(coeffs[better])
+        return newCoeffs
+
+    if addPass(r) is None:
+        return None
+    for step in (1/NUMSTEP, NUMSTEP):
+        radius, empty = r, 0
+        for i in range(NUMMAXPASS):
+            accepted = bestSnr >= NUMSNR
+            pending = False
+            for j in range(npoly):
+                idx = np.nonzero(accepted[:, j])[0]
+                if len(idx) == 0:
+                    pending = True
+                elif step < 1 and idx[0] > 0:
+                    pending = True
+                elif step > 1 and idx[-1] < K - 1:
+                    pending = True
+            if not pending:
+                break
+            radius *= step
+            newCoeffs = addPass(radius)
+            if newCoeffs is None:
+                break
+            if newCoeffs == 0:
+                empty += 1
+                if empty == 2:
+                    break
+            else:
+                empty = 0
+    polys = []
+    for j in range(npoly):
+        coeffs = []
+        for k in range(K):
+            if bestSnr[k, j] >= NUMSNR:
+                coeffs.append(int(bestSign[k, j]) * sp.exp(sp.Float(bestLog[k, j])))
+            else:
+                coeffs.append(sp.S.Zero)
+        while len(coeffs) > 1 and coeffs[-1] == 0:
+            coeffs.pop()
+        polys.append(coeffs)
+    numers = [[polys[1 + i*m + j] for j in range(m)] for i in range(p)]
+    return polys[0], numers
+
+def coeffs2poly(coeffs, var=ini.Laplace):
+    """
+    Returns the polynomial in *var* with the coefficients *coeffs*.
+
+    :param coeffs: Coefficients in ascending order of *var*
+    :type coeffs: list
+
+    :param var: Indeterminate of the polynomial
+    :type var: sympy.Symbol
+
+    :return: polynomial
+    :rtype: sympy.Expr
+    """
+    return sp.Add(*[coeffs[i] * var**i for i in range(len(coeffs)) if coeffs[i] != 0])
+
+def absSquared(coeffs, f=ini.frequency, numeric=True):
+    """
+    Returns |P(j.2.pi.f)|^2 of a polynomial P(s) with real coefficients as a
+    polynomial in the frequency *f*.
+
+    :param coeffs: Coefficients of P(s) in ascending order of s
+    :type coeffs: list
+
+    :param f: Frequency variable
+    :type f: sympy.Symbol
+
+    :param numeric: If True, pi will be evaluated numerically.
+    :type numeric: bool
+
+    :return: |P(j.2.pi.f)|^2
+    :rtype: sympy.Expr
+    """
+    omega = 2 * sp.pi
+    if numeric:
+        omega = omega.evalf()
+    terms = []
+    for k in range(0, 2 * len(coeffs) - 1, 2):
+        # coefficient of s^k of P(s).P(-s)
+        value = sp.Add(*[coeffs[a] * coeffs[k - a] * (-1)**(k - a)
+                         for a in range(max(0, k - len(coeffs) + 1), min(k, len(coeffs) - 1) + 1)])
+        if value != 0:
+            terms.append((-1)**(k//2) * value * omega**k * f**k)
+    return sp.Add(*terms)
+
+def detectorRow(n, detP, detN):
+    """
+    Returns the row vector that combines the positive and the negative
+    detector.
+
+    :param n: Dimension of the matrix
+    :type n: int
+
+    :param detP: Position (starting at 1) of the positive detector, 0 if None
+    :type detP: int
+
+    :param detN: Position (starting at 1) of the negative detector, 0 if None
+    :type detN: int
+
+    :return: Array with shape (1, n)
+    :rtype: numpy.ndarray
+    """
+    lhs = np.zeros((1, n))
+    if detP != 0:
+        lhs[0, detP - 1] += 1
+    if detN != 0:
+        lhs[0, detN - 1] -= 1
+    return lhs
+
+def numDCsolve(Mk, b):
+    """
+    Returns the zero-frequency solution of the matrix equation.
+
+    :param Mk: Coefficient matrices of M(s) with shape (order+1, n, n)
+    :type Mk: numpy.ndarray
+
+    :param b: Right-hand side with shape (n,) at s=0
+    :type b: numpy.ndarray
+
+    :return: Solution vector, or None if M(0) is singular.
+    :rtype: numpy.ndarray, NoneType
+    """
+    try:
+        x = np.linalg.solve(Mk[0], b)
+    except np.linalg.LinAlgError:
+        return None
+    if not np.all(np.isfinite(x)):
+        return None
+    return x
+
+def _equilibrate(A):
+    """
+    Returns row and column scale factors (powers of two) that make the
+    maximum magnitude in each row and column of *A* close to one.
+
+    :param A: Array with magnitudes of matrix entries
+    :type A: numpy.ndarray
+
+    :return: Tuple with the row and the column scale factors
+    :rtype: tuple
+    """
+    rowMax = np.max(A, axis=1)
+    R = 2.0**-np.round(np.log2(np.where(rowMax > 0, rowMax, 1)))
+    colMax = np.max(A * R[:, None], axis=0)
+    C = 2.0**-np.round(np.log2(np.where(colMax > 0, colMax, 1)))
+    return R, C
+
+def _balance(A, B, iterations=20):
+    """
+    Returns row and column scale factors (powers of two) for the pencil
+    (A, B) that minimize the spread of the magnitudes of the nonzero entries,
+    as proposed by R.C. Ward (1981).
+
+    :param A: Matrix A of the pencil
+    :type A: numpy.ndarray
+
+    :param B: Matrix B of the pencil
+    :type B: numpy.ndarray
+
+    :param iterations: Number of least-squares sweeps over rows and columns
+    :type iterations: int
+
+    :return: Tuple with the row and the column scale factors
+    :rtype: tuple
+    """
+    nzA = A != 0
+    nzB = B != 0
+    LA = np.log2(np.abs(A), where=nzA, out=np.zeros(A.shape))
+    LB = np.log2(np.abs(B), where=nzB, out=np.zeros(B.shape))
+    rowCount = np.maximum(np.sum(nzA, axis=1) + np.sum(nzB, axis=1), 1)
+    colCount = np.maximum(np.sum(nzA, axis=0) + np.sum(nzB, axis=0), 1)
+    r = np.zeros(A.shape[0])
+    c = np.zeros(A.shape[1])
+    for i in range(iterations):
+        r = -(np.sum(np.where(nzA, LA + c[None, :], 0), axis=1) +
+              np.sum(np.where(nzB, LB + c[None, :], 0), axis=1)) / rowCount
+        c = -(np.sum(np.where(nzA, LA + r[:, None], 0), axis=0) +
+              np.sum(np.where(nzB, LB + r[:, None], 0), axis=0)) / colCount
+    return 2.0**np.round(r), 2.0**np.round(c)
+
+def numEigs(Mk):
+    """
+    Returns the finite roots of det(M(s)) of a polynomial matrix M(s).
+
+    The roots are the finite generalized eigenvalues of the linearization
+    A + s.B of M(s). For M(s) = G + s.C this is the pencil (G, C) itself.
+    The Laplace variable is normalized to the frequency scale of M(s) and
+    the pencil is balanced before the eigenvalues are calculated with
+    scipy.linalg.eig(). Eigenvalues with a magnitude
+    larger than NUMEIGMAX times this frequency scale are considered infinite.
+
+    :param Mk: Coefficient matrices of M(s) with shape (order+1, n, n)
+    :type Mk: numpy.ndarray
+
+    :return: Array with the finite roots of det(M(s)), sorted by magnitude
+    :rtype: numpy.ndarray
+    """
+    order = Mk.shape[0] - 1
+    while order > 0 and not np.any(Mk[order]):
+        order -= 1
+    if order == 0:
+        return np.array([])
+    n = Mk.shape[1]
+    # Frequency scale: s = w.p
+    w = (np.linalg.norm(Mk[0]) / np.linalg.norm(Mk[order]))**(1/order)
+    if not np.isfinite(w) or w == 0:
+        w = 1
+    N = n * order
+    A = np.zeros((N, N))
+    B = np.zeros((N, N))
+    for i in range(order - 1):
+        # p.x_i = x_(i+1)
+        A[i*n:(i+1)*n, (i+1)*n:(i+2)*n] = np.eye(n)
+        B[i*n:(i+1)*n, i*n:(i+1)*n] = -np.eye(n)
+    for j in range(order):
+        A[(order-1)*n:, j*n:(j+1)*n] = Mk[j] * w**j
+    B[(order-1)*n:, (order-1)*n:] = Mk[order] * w**order
+    R, C = _balance(A, B)
+    A = A * R[:, None] * C[None, :]
+    B = B * R[:, None] * C[None, :]
+    alpha, beta = eig(A, -B, right=False, homogeneous_eigvals=True)
+    # Eigenvalues of a singular pencil (alpha = beta = 0) are undefined
+    tol = N * np.finfo(float).eps * max(np.linalg.norm(A), np.linalg.norm(B))
+    defined = np.maximum(np.abs(alpha), np.abs(beta)) > tol
+    finite = defined & (np.abs(alpha) < NUMEIGMAX * np.abs(beta))
+    roots = w * alpha[finite] / beta[finite]
+    return roots[np.lexsort((roots.imag, np.abs(roots)))]
+
+def augmentedMatrix(Mk, Bk, lhs):
+    """
+    Returns the coefficient matrices of the matrix [[M(s), b(s)], [lhs, 0]].
+
+    The determinant of this matrix equals -lhs.adj(M(s)).b(s), which is the
+    numerator of the transfer from b(s) to the detector.
+
+    :param Mk: Coefficient matrices of M(s) with shape (order+1, n, n)
+    :type Mk: numpy.ndarray
+
+    :param Bk: Coefficient matrices of b(s) with shape (order+1, n, 1)
+    :type Bk: numpy.ndarray
+
+    :param lhs: Detector row with shape (1, n)
+    :type lhs: numpy.ndarray
+
+    :return: Coefficient matrices with shape (order+1, n+1, n+1)
+    :rtype: numpy.ndarray
+    """
+    order = max(Mk.shape[0], Bk.shape[0])
+    n = Mk.shape[1]
+    Ak = np.zeros((order, n + 1, n + 1))
+    Ak[:Mk.shape[0], :n, :n] = Mk
+    Ak[:Bk.shape[0], :n, n:] = Bk
+    Ak[0, n, :n] = lhs[0]
+    return Ak
+
+def numDCgain(Mk, Bk, lhs):
+    """
+    Returns the zero-frequency value of lhs.M(s)^-1.b(s).
+
+    The result is infinite if M(0) is singular and zero if the augmented
+    matrix [[M(0), b(0)], [lhs, 0]] is singular. It is undefined if both are
+    singular, as with **SLiCAPmath.gainValue()**.
+
+    :param Mk: Coefficient matrices of M(s) with shape (order+1, n, n)
+    :type Mk: numpy.ndarray
+
+    :param Bk: Coefficient matrices of b(s) with shape (order+1, n, 1)
+    :type Bk: numpy.ndarray
+
+    :param lhs: Detector row with shape (1, n)
+    :type lhs: numpy.ndarray
+
+    :return: Zero-frequency gain
+    :rtype: sympy.Float, sympy.Expr
+    """
+    def singular(A):
+        R, C = _equilibrate(np.abs(A))
+        return np.linalg.cond(A * R[:, None] * C[None, :]) * np.finfo(float).eps * A.shape[0] > 1
+    M0 = Mk[0]
+    A0 = augmentedMatrix(Mk[:1], Bk[:1], lhs)[0]
+    poleAt0 = singular(M0)
+    zeroAt0 = singular(A0)
+    if poleAt0 and zeroAt0:
+        return sp.sympify("undefined")
+    elif zeroAt0:
+        return sp.N(0)
+    elif poleAt0:
+        return sp.oo
+    return sp.Float(np.dot(lhs[0], np.linalg.solve(M0, Bk[0, :, 0])))
+
+class acResponse(rationalResponse):
+    """
+    Frequency response of a detector, obtained from numeric solutions of the
+    matrix equation M(s).x = b(s) at the requested frequencies.
+
+    If M(s) = G + s.C, the pencil (G, C) is reduced once to the triangular
+    pencil (AA, BB) with the QZ decomposition G = Q.AA.Z^H, C = Q.BB.Z^H.
+    The solution at each frequency then only requires back substitution,
+    which is carried out for all frequencies at once. One step of iterative
+    refinement preserves the accuracy of small responses. The results are
+    checked with LU decompositions at the first, the middle and the last
+    frequency. If M(s) is of higher order, or if the check fails, the matrix
+    equation is solved with batched LU decompositions.
+
+    The magnitude and phase functions are those of **rationalResponse**; the
+    response at the last requested frequencies is cached.
+
+    :param Mk: Coefficient matrices of M(s) with shape (order+1, n, n)
+    :type Mk: numpy.ndarray
+
+    :param Bk: Coefficient matrices of b(s) with shape (order+1, n, 1)
+    :type Bk: numpy.ndarray
+
+    :param lhs: Detector row with shape (1, n)
+    :type lhs: numpy.ndarray
+
+    :param denom: Coefficients in ascending order of s of a polynomial by
+                  which the response will be divided, defaults to None
+    :type denom: list, numpy.ndarray, NoneType
+    """
+    def __init__(self, Mk, Bk, lhs, denom=None):
+        self.Mk    = Mk
+        """
+        Coefficient matrices (*numpy.ndarray*) of M(s).
+        """
+
+        self.Bk    = Bk[:, :, 0]
+        """
+        Coefficient vectors (*numpy.ndarray*) of b(s).
+        """
+
+        self.lhs   = lhs[0]
+        """
+        Detector row (*numpy.ndarray*).
+        """
+
+        self.denom = None
+        """
+        Coefficients (*numpy.ndarray*) of the denominator of b(s) in
+        descending order of s, or None.
+        """
+        if denom is not None:
+            self.denom = np.array([float(coeff) for coeff in denom][::-1])
+
+        self.qz    = None
+        """
+        Tuple with the triangular matrices AA, BB and the transformation
+        matrices Q, Z of the QZ decomposition of (G, C), or None if M(s) is
+        not of first order or if the decomposition failed.
+        """
+        if Mk.shape[0] <= 2:
+            G = Mk[0]
+            if Mk.shape[0] == 2:
+                C = Mk[1]
+            else:
+                C = np.zeros(G.shape)
+            try:
+                self.qz = qz(G, C, output='complex')
+            except (ValueError, np.linalg.LinAlgError):
+                self.qz = None
+
+        self._grid = None
+        self._values = None
+
+    def delay(self, x, delta=10**(-ini.disp)):
+        """
+        Returns the group delay of the frequency response at the frequencies
+        *x*.
+
+        :param x: Frequencies
+        :type x: float, list, numpy.ndarray
+
+        :param delta: Relative frequency step for the differentiation of the
+                      phase.
+        :type delta: float
+
+        :return: Group delays; a scalar for a scalar *x*
+        :rtype: numpy.ndarray, numpy.float64
+        """
+        f = np.atleast_1d(np.array(x, dtype=float))
+        y = self._response(f)
+        if ini.Hz:
+            s = 2j * np.pi * f
+        else:
+            s = 1j * f
+        delay = -np.angle(self.solve(s*(1 + delta))/y)/delta/f
+        if ini.Hz:
+            delay = delay/2/np.pi
+        return self._scalar(delay, x)
+
+    def solve(self, s):
+        """
+        Returns the detector values at the values *s* of the Laplace variable.
+
+        :param s: Values of the Laplace variable
+        :type s: numpy.ndarray
+
+        :return: Detector values
+        :rtype: numpy.ndarray
+        """
+        s = np.atleast_1d(np.array(s, dtype=complex))
+        y = None
+        if self.qz != None:
+            with np.errstate(all='ignore'):
+                y = self._qzSolve(s)
+            # Check the results at a few frequencies
+            check = np.unique(np.linspace(0, len(s) - 1, 3).astype(int))
+            yLU = self._luSolve(s[check])
+            with np.errstate(all='ignore'):
+                diff = np.abs(y[check] - yLU)
+                if not np.all(diff <= NUMACCHECK * np.abs(yLU)):
+                    y = None
+        if y is None:
+            y = self._luSolve(s)
+        if self.denom is not None:
+            with np.errstate(all='ignore'):
+                y = y / np.polyval(self.denom, s)
+        return y
+
+    def _qzSolve(self, s):
+        """
+        Returns the detector values at *s* by back substitution in the
+        triangular pencil (AA, BB), followed by one step of iterative
+        refinement with the residual of the original matrix equation.
+        """
+        AA, BB, Q, Z = self.qz
+        n = AA.shape[0]
+        G = self.Mk[0]
+        if self.Mk.shape[0] == 2:
+            C = self.Mk[1]
+        else:
+            C = np.zeros(G.shape)
+        y = np.zeros(len(s), dtype=complex)
+        chunk = max(1, NUMCHUNK // n)
+        for i in range(0, len(s), chunk):
+            si = s[i:i + chunk]
+            b = _evalPoly(self.Bk[:, :, None], si)[:, :, 0]
+            X = self._backSubs(b @ Q.conj(), si) @ Z.T
+            R = b - X @ G.T - si[:, None] * (X @ C.T)
+            X = X + self._backSubs(R @ Q.conj(), si) @ Z.T
+            y[i:i + chunk] = X @ self.lhs
+        return y
+
+    def _backSubs(self, c, s):
+        """
+        Solves (AA + s.BB).y = c by back substitution for all values of *s*.
+        Row k of *c* holds the right-hand side for s[k].
+        """
+        AA, BB = self.qz[:2]
+        n = AA.shape[0]
+        Y = np.zeros((len(s), n), dtype=complex)
+        for k in range(n - 1, -1, -1):
+            acc = c[:, k] - Y[:, k+1:] @ AA[k, k+1:] - s * (Y[:, k+1:] @ BB[k, k+1:])
+            Y[:, k] = acc / (AA[k, k] + s * BB[k, k])
+        return Y
+
+    def _luSolve(self, s):
+        """
+        Returns the detector values at *s* from batched LU decompositions of
+        M(s). Rows and columns are scaled with powers of two.
+        """
+        n = self.Mk.shape[1]
+        y = np.zeros(len(s), dtype=complex)
+        chunk = max(1, NUMCHUNK // (n * n))
+        for i in range(0, len(s), chunk):
+            with np.errstate(all='ignore'):
+                Ms = _evalPoly(self.Mk, s[i:i + chunk])
+                Bs = _evalPoly(self.Bk[:, :, None], s[i:i + chunk])
+                R = np.max(np.abs(Ms), axis=2)
+                R = 2.0**-np.round(np.log2(np.where(R > 0, R, 1)))
+                Ms = Ms * R[:, :, None]
+                C = np.max(np.abs(Ms), axis=1)
+                C = 2.0**-np.round(np.log2(np.where(C > 0, C, 1)))
+                Ms = Ms * C[:, None, :]
+            try:
+                X = np.linalg.solve(Ms, Bs * R[:, :, None])[:, :, 0] * C
+                y[i:i + chunk] = X @ self.lhs
+            except np.linalg.LinAlgError:
+                # At least one of the matrices is singular
+                for j in range(len(Ms)):
+                    try:
+                        X = np.linalg.solve(Ms[j], Bs[j, :, 0] * R[j]) * C[j]
+                        y[i + j] = np.dot(self.lhs, X)
+                    except np.linalg.LinAlgError:
+                        y[i + j] = np.nan
+        return y
+
+class steppedRational(object):
+    """
+    Results of parameter stepping of a rational function of one variable,
+    stored as arrays with the numeric coefficients of the numerator and the
+    denominator for all steps.
+
+    Indexing returns the function of a step as a sympy expression; it is
+    only created when requested. Numeric evaluations for all steps are
+    carried out at once.
+
+    Instances are created by **makeSteppedRational()**.
+
+    :param numer: Coefficients of the numerator with shape
+                  (number of steps, order+1), in ascending order of *var*
+    :type numer: numpy.ndarray
+
+    :param denom: Coefficients of the denominator with shape
+                  (number of steps, order+1), in ascending order of *var*
+    :type denom: numpy.ndarray
+
+    :param var: Variable of the rational function, defaults to ini.Laplace
+    :type var: sympy.Symbol
+
+    :param shape: Shape of the step grid (see **gridAxis**), defaults to None
+                  (one-dimensional)
+    :type shape: tuple, NoneType
+    """
+    def __init__(self, numer, denom, var=ini.Laplace, shape=None):
+        self.numer = numer
+        """
+        Coefficients (*numpy.ndarray*) of the numerators; row i holds those
+        of step i.
+        """
+
+        self.denom = denom
+        """
+        Coefficients (*numpy.ndarray*) of the denominators; row i holds those
+        of step i.
+        """
+
+        self.var   = var
+        """
+        Variable (*sympy.Symbol*) of the rational function.
+        """
+
+        self.shape = shape
+        """
+        Shape (*tuple*) of the step grid; the steps are numbered in
+        row-major order of this grid.
+        """
+        if shape == None:
+            self.shape = (numer.shape[0],)
+
+    def __len__(self):
+        return self.numer.shape[0]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        numer = coeffs2poly([sp.sympify(coeff) for coeff in self.numer[i]], self.var)
+        denom = coeffs2poly([sp.sympify(coeff) for coeff in self.denom[i]], self.var)
+        return sp.N(numer/denom)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __mul__(self, other):
+        try:
+            other = complex(other)
+        except TypeError:
+            return NotImplemented
+        if other.imag == 0:
+            other = other.real
+        return steppedRational(self.numer * other, self.denom, self.var, self.shape)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        try:
+            other = complex(other)
+        except TypeError:
+            return NotImplemented
+        if other.imag == 0:
+            other = other.real
+        return steppedRational(self.numer / other, self.denom, self.var, self.shape)
+
+    def evaluate(self, x):
+        """
+        Returns the values of the functions of all steps at the values *x* of
+        the variable.
+
+        :param x: Values of the variable
+        :type x: float, list, numpy.ndarray
+
+        :return: Array of which row i holds the values of step i
+        :rtype: numpy.ndarray
+        """
+        x = np.atleast_1d(np.array(x))
+        with np.errstate(all='ignore'):
+            return polyval(x, self.numer.T) / polyval(x, self.denom.T)
+
+    def gridValues(self, x):
+        """
+        Returns the values of the functions of all steps at the values *x* of
+        the variable, arranged as the step grid.
+
+        :param x: Values of the variable
+        :type x: float, list, numpy.ndarray
+
+        :return: Array with shape (*self.shape*, len(x)); the first indices
+                 are those of the step variables, the last one is that of *x*.
+        :rtype: numpy.ndarray
+        """
+        values = self.evaluate(x)
+        return values.reshape(self.shape + (values.shape[-1],))
+
+    def gridCoeffs(self, poly='numer'):
+        """
+        Returns the coefficients of the numerators or the denominators of all
+        steps, arranged as the step grid.
+
+        :param poly: 'numer' or 'denom'
+        :type poly: str
+
+        :return: Array with shape (*self.shape*, order+1); the first indices
+                 are those of the step variables, the last one is that of the
+                 coefficient.
+        :rtype: numpy.ndarray
+        """
+        if poly == 'numer':
+            coeffs = self.numer
+        else:
+            coeffs = self.denom
+        return coeffs.reshape(self.shape + (coeffs.shape[-1],))
+
+    def freqResponse(self, i):
+        """
+        Returns the frequency response of step *i*, which can be passed to
+        **magFunc_f()**, **dBmagFunc_f()**, **phaseFunc_f()** and
+        **delayFunc_f()**.
+
+        :param i: Step number
+        :type i: int
+
+        :return: Frequency response
+        :rtype: SLiCAPmath.rationalResponse
+        """
+        return rationalResponse(self.numer[i], self.denom[i])
+
+    def roots(self, poly='denom'):
+        """
+        Returns the roots of the numerators or the denominators of all steps.
+
+        :param poly: 'numer' or 'denom'
+        :type poly: str
+
+        :return: List with arrays with roots; item i holds those of step i
+        :rtype: list
+        """
+        if poly == 'numer':
+            coeffs = self.numer
+        else:
+            coeffs = self.denom
+        return [np.flip(np.roots(coeffs[i][::-1]), 0) for i in range(len(self))]
+
+class gridAxis(object):
+    """
+    Values of one step variable at all points of a Cartesian-product step
+    grid. The points are numbered in row-major order of the grid: the values
+    of the last step variable change fastest.
+
+    The values are not stored for all points: indexing returns the value at
+    a point as a sympy.Float that is created on request.
+
+    :param axes: Arrays with the values of all step variables of the grid
+    :type axes: list
+
+    :param dim: Index of the step variable in *axes*
+    :type dim: int
+    """
+    def __init__(self, axes, dim):
+        self.axis   = axes[dim]
+        """
+        Values (*numpy.ndarray*) of the step variable.
+        """
+
+        self.dim    = dim
+        """
+        Index (*int*) of the step variable in the grid.
+        """
+
+        self.shape  = tuple([len(axis) for axis in axes])
+        """
+        Shape (*tuple*) of the grid.
+        """
+
+        self.stride = int(np.prod(self.shape[dim + 1:]))
+        """
+        Number (*int*) of points between successive values of the step
+        variable.
+        """
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return sp.Float(self.axis[(i // self.stride) % len(self.axis)])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def broadcast(self):
+        """
+        Returns the values of the step variable as an array that broadcasts
+        along the axis of this variable in the grid.
+
+        :return: Array with the shape of the grid, except for a length of one
+                 for the axes of the other step variables.
+        :rtype: numpy.ndarray
+        """
+        shape = [1 for n in self.shape]
+        shape[self.dim] = len(self.axis)
+        return self.axis.reshape(shape)
+
+def makeSteppedRational(stepDict, function):
+    """
+    Returns the results of parameter stepping of *function* as a
+    **steppedRational** object.
+
+    The coefficients of the numerator and the denominator are obtained once
+    as functions of the step parameters and evaluated for all steps at once.
+    If the step values are given by **gridAxis** objects, the coefficients
+    are evaluated by broadcasting along the axes of the grid.
+
+    :param stepDict: Dictionary with key-value pair:
+                     key: step parameter name (*sympy.Symbol*)
+                     value: list with step values for this parameter.
+    :type stepDict:  Dictionary
+
+    :param function: Rational function of the Laplace variable or the
+                     frequency, with coefficients that only depend on the
+                     step parameters.
+    :type function: sympy.Expr
+
+    :return: Stepped function, or None if *function* does not meet these
+             requirements.
+    :rtype: SLiCAPnumeric.steppedRational, NoneType
+    """
+    if not isinstance(function, sp.Expr) or function.is_Matrix:
+        return None
+    stepVars = list(stepDict.keys())
+    symbols = function.free_symbols
+    if ini.frequency in symbols:
+        var = ini.frequency
+    else:
+        var = ini.Laplace
+    if not symbols <= set(stepVars) | set([var]) or (ini.frequency in symbols and ini.Laplace in symbols):
+        return None
+    numer, denom = function.as_numer_denom()
+    try:
+        numer = sp.Poly(sp.expand(numer), var).all_coeffs()[::-1]
+        denom = sp.Poly(sp.expand(denom), var).all_coeffs()[::-1]
+        if all([isinstance(stepDict[stepVar], gridAxis) for stepVar in stepVars]):
+            values = [stepDict[stepVar].broadcast() for stepVar in stepVars]
+            shape = stepDict[stepVars[0]].shape
+        else:
+            values = [np.array([float(value) for value in stepDict[stepVar]]) for stepVar in stepVars]
+            shape = (len(values[0]),)
+    except (sp.PolynomialError, TypeError):
+        return None
+    numSteps = int(np.prod(shape))
+    func = sp.lambdify(stepVars, numer + denom, 'numpy')
+    with np.errstate(all='ignore'):
+        coeffs = np.array([np.broadcast_to(coeff, shape).reshape(numSteps) for coeff in func(*values)]).T
+    if coeffs.dtype == object:
+        return None
+    return steppedRational(coeffs[:, :len(numer)], coeffs[:, len(numer):], var, shape)
+
+class mcResult(object):
+    """
+    Results of a Monte Carlo analysis. The statistics are updated with each
+    chunk of samples, the raw sample values are only kept on request.
+
+    The statistics are arrays with one entry per evaluated quantity: an entry
+    of a matrix result or a pole or zero of a rational function. Poles and
+    zeros are ordered by magnitude.
+
+    :param quantity: Name of the evaluated quantity: 'value', 'gain', 'poles'
+                     or 'zeros'.
+    :type quantity: str
+    """
+    def __init__(self, quantity='value'):
+        self.quantity   = quantity
+        """
+        Name (*str*) of the evaluated quantity.
+        """
+
+        self.params     = []
+        """
+        Parameters (*sympy.Symbol*) that have been varied.
+        """
+
+        self.nSamples   = 0
+        """
+        Number (*int*) of evaluated samples.
+        """
+
+        self.mean       = None
+        """
+        Mean values (*numpy.ndarray*) of the quantities.
+        """
+
+        self.std        = None
+        """
+        Standard deviations (*numpy.ndarray*) of the quantities. For complex
+        quantities this is the root of the mean squared magnitude of the
+        deviation from the mean.
+        """
+
+        self.min        = None
+        """
+        Minimum values (*numpy.ndarray*) of real quantities, None for complex
+        quantities.
+        """
+
+        self.max        = None
+        """
+        Maximum values (*numpy.ndarray*) of real quantities, None for complex
+        quantities.
+        """
+
+        self.passed     = 0
+        """
+        Number (*int*) of samples that meet the specification.
+        """
+
+        self.yieldRatio = None
+        """
+        Ratio (*float*) of the number of samples that meet the specification
+        and the total number of samples, None if no specification was given.
+        """
+
+        self.samples    = None
+        """
+        Array (*numpy.ndarray*) with shape (nSamples, number of quantities)
+        with all evaluated values, None if not requested.
+        """
+
+        self._M2        = None
+
+    def update(self, values, passed=None):
+        """
+        Merges the statistics of a chunk of samples with those of the previous
+        chunks.
+
+        :param values: Array with shape (samples, number of quantities)
+        :type values: numpy.ndarray
+
+        :param passed: Boolean array that indicates which samples meet the
+                       specification, or None if there is no specification.
+        :type passed: numpy.ndarray, NoneType
+        """
+        n = values.shape[0]
+        mean = np.mean(values, axis=0)
+        M2 = np.sum(np.abs(values - mean)**2, axis=0)
+        if self.nSamples == 0:
+            self.mean, self._M2 = mean, M2
+            if not np.iscomplexobj(values):
+                self.min, self.max = np.min(values, axis=0), np.max(values, axis=0)
+        else:
+            total = self.nSamples + n
+            delta = mean - self.mean
+            self.mean = self.mean + delta*n/total
+            self._M2 = self._M2 + M2 + np.abs(delta)**2*self.nSamples*n/total
+            if self.min is not None:
+                self.min = np.minimum(self.min, np.min(values, axis=0))
+                self.max = np.maximum(self.max, np.max(values, axis=0))
+        self.nSamples += n
+        self.std = np.sqrt(self._M2/self.nSamples)
+        if passed is not None:
+            self.passed += int(np.count_nonzero(passed))
+            self.yieldRatio = self.passed/self.nSamples
+
+def _mcSample(dist, rng, n):
+    """
+    Returns *n* samples from a distribution.
+
+    :param dist: Distribution: ('normal', mean, std), ('uniform', low, high),
+                 ('lognormal', mean, sigma) of the underlying normal
+                 distribution, or a function that takes a
+                 numpy.random.Generator and the number of samples as
+                 arguments and returns an array with the samples.
+    :type dist: tuple, list, function
+
+    :return: Array with samples, or None if the distribution is not known.
+    :rtype: numpy.ndarray, NoneType
+    """
+    if callable(dist):
+        return np.broadcast_to(dist(rng, n), (n,))
+    name, args = dist[0], [float(arg) for arg in dist[1:]]
+    if name == 'normal':
+        return rng.normal(args[0], args[1], n)
+    elif name == 'uniform':
+        return rng.uniform(args[0], args[1], n)
+    elif name == 'lognormal':
+        return rng.lognormal(args[0], args[1], n)
+    return None
+
+def _mcGain(expr, var):
+    """
+    Returns the zero-frequency value of a rational function of *var*. Common
+    factors *var* of the numerator and the denominator are cancelled first.
+
+    :param expr: Rational function of *var*
+    :type expr: sympy.Expr
+
+    :param var: Laplace variable
+    :type var: sympy.Symbol
+
+    :return: Zero-frequency value, or None if it is infinite or undefined.
+    :rtype: sympy.Expr, NoneType
+    """
+    numer, denom = expr.as_numer_denom()
+    try:
+        numerCoeffs = sp.Poly(sp.expand(numer), var).all_coeffs()[::-1]
+        denomCoeffs = sp.Poly(sp.expand(denom), var).all_coeffs()[::-1]
+    except sp.PolynomialError:
+        gain = numer.subs(var, 0)/denom.subs(var, 0)
+        if gain.has(sp.zoo, sp.oo, -sp.oo, sp.nan):
+            return None
+        return gain
+    # Lowest powers of var with coefficients that are not identically zero
+    numerOrder = next((i for i in range(len(numerCoeffs)) if numerCoeffs[i] != 0), None)
+    denomOrder = next((i for i in range(len(denomCoeffs)) if denomCoeffs[i] != 0), None)
+    if denomOrder == None or (numerOrder != None and numerOrder < denomOrder):
+        return None
+    elif numerOrder == None or numerOrder > denomOrder:
+        return sp.S(0)
+    return numerCoeffs[numerOrder]/denomCoeffs[denomOrder]
+
+def _mcRoots(coeffs):
+    """
+    Returns the roots of polynomials, ordered by magnitude.
+
+    :param coeffs: Array with shape (samples, order+1) with the coefficients
+                   of the polynomials in ascending order.
+    :type coeffs: numpy.ndarray
+
+    :return: Array with shape (samples, order) with the roots of the
+             polynomials.
+    :rtype: numpy.ndarray
+    """
+    n, order = coeffs.shape[0], coeffs.shape[1] - 1
+    if order < 1:
+        return np.zeros((n, 0), dtype=complex)
+    elif order == 1:
+        return (-coeffs[:, 0]/coeffs[:, 1]).astype(complex).reshape(n, 1)
+    elif order == 2:
+        # Avoid cancellation in the quadratic formula
+        c, b, a = coeffs.T.astype(complex)
+        q = -(b + np.where(b.real < 0, -1, 1)*np.sqrt(b**2 - 4*a*c))/2
+        roots = np.array([q/a, c/q]).T
+        # Complex roots of real polynomials are exact conjugates
+        pairs = roots[:, 0].imag != 0
+        roots[pairs, 1] = np.conj(roots[pairs, 0])
+    else:
+        # Companion matrices of the monic polynomials
+        C = np.zeros((n, order, order))
+        C[:, np.arange(1, order), np.arange(order - 1)] = 1
+        C[:, :, -1] = -coeffs[:, :-1]/coeffs[:, -1:]
+        roots = np.linalg.eigvals(C).astype(complex)
+    index = np.lexsort((roots.imag, np.abs(roots)), axis=-1)
+    return np.take_along_axis(roots, index, axis=-1)
+
+def monteCarlo(result, distributions, nSamples=10**5, quantity=None, spec=None,
+               samples=False, parDefs=None, seed=None, chunk=MCCHUNK):
+    """
+    Evaluates a symbolic result for random samples of its parameters.
+
+    The result is compiled once into a NumPy function with common
+    subexpression elimination. This function is evaluated for chunks of
+    *chunk* samples; the statistics are updated after each chunk, so the
+    memory use does not depend on the number of samples.
+
+    Parameters that are not varied are substituted with their definitions in
+    *parDefs*. Parameter definitions are substituted before sampling: a
+    parameter that is defined in terms of a varied parameter follows its
+    variations.
+
+    :param result: Results of an instruction with simType 'symbolic' and data
+                   type 'laplace', 'numer', 'denom', 'dc', 'solve' or
+                   'dcsolve', or a sympy expression or matrix.
+    :type result: SLiCAPprotos.allResults, sympy.Expr, sympy.Matrix
+
+    :param distributions: Dictionary with key-value pairs:
+
+                          - key (*sympy.Symbol, str*): parameter name, or a
+                            tuple with parameter names that share the same
+                            sample, e.g. for variations of a production lot.
+                          - value: distribution: ('normal', mean, std),
+                            ('uniform', low, high), ('lognormal', mean, sigma)
+                            or a function *f(rng, n)* that returns *n*
+                            samples.
+    :type distributions: dict
+
+    :param nSamples: Number of samples
+    :type nSamples: int
+
+    :param quantity: Quantity that is evaluated:
+
+                     - 'value': the result itself; it may not depend on the
+                       Laplace variable or the frequency
+                     - 'gain': the value of a rational function at zero
+                       frequency
+                     - 'poles': roots of the denominator of a rational
+                       function
+                     - 'zeros': roots of the numerator of a rational function
+
+                     Defaults to 'gain' for data types 'laplace', 'numer' and
+                     'denom' and to 'value' otherwise.
+    :type quantity: str, NoneType
+
+    :param spec: Specification for the yield calculation: a tuple (low, high)
+                 with limits for all quantities, or a function that takes an
+                 array with shape (samples, number of quantities) and returns
+                 a Boolean array that indicates which samples pass.
+    :type spec: tuple, function, NoneType
+
+    :param samples: True if the evaluated values of all samples must be kept
+    :type samples: bool
+
+    :param parDefs: Parameter definitions; defaults to the parameter
+                    definitions of *result* if it is an **allResults()**
+                    object.
+    :type parDefs: dict, NoneType
+
+    :param seed: Seed for the random number generator
+    :type seed: int, NoneType
+
+    :param chunk: Number of samples that is evaluated at once
+    :type chunk: int
+
+    :return: Monte Carlo results, or a list with these results for each step
+             of a stepped instruction, or None in case of errors.
+    :rtype: SLiCAPnumeric.mcResult, list, NoneType
+
+    :Example:
+
+    >>> result = instr.execute() # symbolic, data type 'laplace'
+    >>> mc = monteCarlo(result, {'R_a': ('normal', 1e3, 10),
+    >>>                          ('R_b', 'R_c'): ('uniform', 990, 1010)},
+    >>>                 nSamples=10**6, quantity='poles',
+    >>>                 spec=lambda p: np.all(p.real < -1e6, axis=1))
+    >>> print(mc.mean, mc.std, mc.yieldRatio)
+    """
+    errors = 0
+    stepped = False
+    if isinstance(result, allResults):
+        if result.dataType not in MCDATA.keys():
+            print("Error: Monte Carlo analysis is not available for data type '{0}'.".format(result.dataType))
+            return None
+        if parDefs == None:
+            if result.parDefs != None:
+                parDefs = result.parDefs
+            elif result.circuit != None:
+                parDefs = result.circuit.parDefs
+        if quantity == None:
+            if result.dataType in ['laplace', 'numer', 'denom']:
+                quantity = 'gain'
+            else:
+                quantity = 'value'
+        if result.dataType == 'denom' and quantity == 'poles':
+            # The poles are the roots of the denominator polynomial itself
+            quantity = 'zeros'
+        exprs = getattr(result, MCDATA[result.dataType])
+        stepped = result.step == True
+        if not stepped:
+            exprs = [exprs]
+    elif quantity == None:
+        exprs = [result]
+        quantity = 'value'
+    else:
+        exprs = [result]
+    if quantity not in ['value', 'gain', 'poles', 'zeros']:
+        print("Error: unknown quantity '{0}' for Monte Carlo analysis.".format(quantity))
+        return None
+    if parDefs == None:
+        parDefs = {}
+    # Parameters that share a sample are listed in one group
+    groups = []
+    for key in distributions.keys():
+        if type(key) == tuple:
+            group = [sp.Symbol(str(par)) for par in key]
+        else:
+            group = [sp.Symbol(str(key))]
+        groups.append((group, distributions[key]))
+    params = [par for group, dist in groups for par in group]
+    # Substitute the definitions of the fixed parameters
+    fixedDefs = {key: parDefs[key] for key in parDefs.keys() if key not in params}
+    var = ini.Laplace
+    results = []
+    rng = np.random.default_rng(seed)
+    for expr in exprs:
+        if isinstance(expr, sp.MatrixBase):
+            expr = list(expr)
+        else:
+            expr = [sp.sympify(expr)]
+        expr = [fullSubs(entry, fixedDefs) for entry in expr]
+        symbols = set().union(*[entry.free_symbols for entry in expr])
+        if quantity == 'value':
+            undefined = symbols - set(params)
+        else:
+            undefined = symbols - set(params) - set([var])
+        if undefined:
+            print("Error: undefined parameters in Monte Carlo analysis:", list(undefined))
+            return None
+        if quantity == 'gain':
+            expr = [_mcGain(entry, var) for entry in expr]
+            if None in expr:
+                print("Error: the zero-frequency gain is infinite or undefined.")
+                return None
+        elif quantity in ['poles', 'zeros']:
+            if len(expr) != 1:
+                print("Error: poles and zeros of a matrix cannot be evaluated.")
+                return None
+            numer, denom = expr[0].as_numer_denom()
+            if quantity == 'poles':
+                poly = denom
+            else:
+                poly = numer
+            try:
+                expr = sp.Poly(sp.expand(poly), var).all_coeffs()[::-1]
+            except sp.PolynomialError:
+                print("Error: cannot determine the {0} of a non-rational function.".format(quantity))
+                return None
+        func = sp.lambdify(params, expr, 'numpy', cse=True)
+        mc = mcResult(quantity)
+        mc.params = params
+        values = []
+        done = 0
+        while done < nSamples and errors == 0:
+            n = min(chunk, nSamples - done)
+            parValues = []
+            for group, dist in groups:
+                sample = _mcSample(dist, rng, n)
+                if sample is None:
+                    print("Error: unknown distribution '{0}'.".format(dist[0]))
+                    errors += 1
+                    break
+                parValues += [sample for par in group]
+            if errors == 0:
+                with np.errstate(all='ignore'):
+                    data = np.array([np.broadcast_to(value, (n,)) for value in func(*parValues)]).T
+                    if quantity in ['poles', 'zeros']:
+                        data = _mcRoots(data)
+                if spec == None:
+                    passed = None
+                elif callable(spec):
+                    passed = spec(data)
+                else:
+                    low, high = spec
+                    passed = np.ones(n, dtype=bool)
+                    if low != None:
+                        passed &= np.all(data >= low, axis=1)
+                    if high != None:
+                        passed &= np.all(data <= high, axis=1)
+                mc.update(data, passed)
+                if samples:
+                    values.append(data)
+                done += n
+        if errors != 0:
+            return None
+        if samples:
+            mc.samples = np.concatenate(values)
+        results.append(mc)
+    if stepped:
+        return results
+    return results[0]
+
+if __name__ == "__main__":
+    s = ini.Laplace
+    M = sp.Matrix([[1/sp.Integer(1000) + s/10**9, -1/sp.Integer(1000)],
+                   [-1/sp.Integer(1000), 1/sp.Integer(1000) + s/10**12]])
+    D, N = numCramer(polyMatrix(M), polyMatrix(sp.Matrix([1, 0])), detectorRow(2, 2, 0))
+    print(coeffs2poly(D), '\n', sp.expand(M.det()))
+    print(coeffs2poly(N[0][0]))
\ No newline at end of file
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Spyder Editor
+
+"""
+from .SLiCAPnumeric import *
\ No newline at end of file
@@ -6,7 +6,7 @@ SLiCAP module with plot functions.
 Imported by the module SLiCAPhtml.py
 
 """
-from SLiCAP.SLiCAPmatrices import *
+from SLiCAP.SLiCAPddd import *
 
 class trace(object):
     """
@@ -405,7 +405,7 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
       on the data type of the instruction:
 
       - data type == 'noise': funcType = 'onoise'
-      - data type == 'laplace', 'numer' or 'denom': funcType = 'mag'
+      - data type == 'laplace', 'numer', 'denom' or 'ac': funcType = 'mag'
       - data type == 'time', 'impulse' or 'step': funcType = 'time'
 
     The variable plotted along the x-axis defaults to the sweep variable. However,
@@ -414,10 +414,12 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
 
     - If sweepVar == 'auto', the sweep variable will be determined from the data type:
 
-      - data type == 'noise', 'laplace', 'numer' or 'denom': sweepVar = ini.frequency
-        for data types 'laplace', 'numer' or 'denom' the laplace variable will
+      - data type == 'noise', 'laplace', 'numer', 'denom' or 'ac': sweepVar = ini.frequency
+        for data types 'laplace', 'numer', 'denom' or 'ac' the laplace variable will
         be replaced with sympy.i*ini.frequency or with 2*sympy.pi*sympy.i*ini.frequency
         before sweeping, when ini.Hz == False, or ini.Hz== True, respectively.
+      - data type == 'ac': the response is calculated numerically at the sweep
+        points (see **SLiCAPnumeric.acResponse()**).
       - dataType == 'time', 'impulse' or 'step': sweepVar = sympy.Symbol('t')
 
     The type of axis can be 'lin', 'log', 'semilogx', 'semilogy' or 'polar'.
@@ -495,10 +497,10 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
     :return: fig
     :rtype: SLiCAPplots.figure
     """
-    plotDataTypes = ['laplace', 'numer', 'denom', 'noise', 'step', 'impulse', 'time', 'params', None]
+    plotDataTypes = ['laplace', 'numer', 'denom', 'noise', 'step', 'impulse', 'time', 'params', 'ac', None]
     funcTypes  = ['mag', 'dBmag', 'phase', 'delay', 'time', 'onoise', 'inoise', 'param']
     axisTypes  = ['lin', 'log', 'semilogx', 'semilogy', 'polar']
-    freqTypes  = ['laplace', 'numer', 'denom', 'noise']
+    freqTypes  = ['laplace', 'numer', 'denom', 'noise', 'ac']
     timeTypes  = ['time', 'impulse', 'step']
     fig = figure(fileName)
     fig.show = show
@@ -656,6 +658,9 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
                 elif result.dataType == 'laplace':
                     yData = normalizeRational(result.laplace, ini.Laplace)
                     yLabel = ''
+                elif result.dataType == 'ac':
+                    yData = result.ac
+                    yLabel = ''
                 elif result.dataType == 'time':
                     yData = result.time
                     yLabel = '$' + sp.latex(sp.Symbol(result.detLabel)) + '$'
@@ -771,19 +776,44 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
                         print("Error: cannot understand 'sources={0}'.".format(str(sources)))
                         return fig
             else:
-                if result.stepMethod != 'array':
+                if result.stepMethod == 'grid':
+                    stepNum = int(np.prod([len(axis) for axis in result.stepGrid]))
+                elif result.stepMethod != 'array':
                     stepNum = len(result.stepList)
                 else:
                     stepNum = len(result.stepArray[0])
+                noiseData = None
+                if result.dataType == 'noise':
+                    if funcType == 'onoise':
+                        noiseData = result.onoise
+                    elif funcType == 'inoise':
+                        noiseData = result.inoise
+                    if isinstance(noiseData, steppedRational):
+                        # Evaluate the spectra of all steps at once
+                        noiseData = np.real(noiseData.evaluate(x))
+                    else:
+                        noiseData = None
                 for i in range(stepNum):
                     if result.dataType == 'numer':
-                        yData = result.numer[i]
+                        if isinstance(result.numer, steppedRational):
+                            yData = result.numer.freqResponse(i)
+                        else:
+                            yData = result.numer[i]
                         yLabel = 'numer: '
                     elif result.dataType == 'denom':
-                        yData = result.denom[i]
+                        if isinstance(result.denom, steppedRational):
+                            yData = result.denom.freqResponse(i)
+                        else:
+                            yData = result.denom[i]
                         yLabel = 'denom: '
                     elif result.dataType == 'laplace':
-                        yData = normalizeRational(result.laplace[i], ini.Laplace)
+                        if isinstance(result.laplace, steppedRational):
+                            yData = result.laplace.freqResponse(i)
+                        else:
+                            yData = normalizeRational(result.laplace[i], ini.Laplace)
+                        yLabel = ''
+                    elif result.dataType == 'ac':
+                        yData = result.ac[i]
                         yLabel = ''
                     elif result.dataType == 'time':
                         yData = result.time[i]
@@ -792,7 +822,9 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
                     elif result.dataType == 'impulse':
                         yData = result.impulse[i]
                     elif result.dataType == 'noise':
-                        if funcType == 'onoise':
+                        if noiseData is not None:
+                            yData = noiseData[i]
+                        elif funcType == 'onoise':
                             yData = normalizeRational(result.onoise[i], ini.frequency)
                         elif funcType == 'inoise':
                             yData = normalizeRational(result.inoise[i], ini.frequency)
@@ -810,7 +842,7 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
                                 yLabel += result.gainType
                             except:
                                 print("Warning: missing trace label.")
-                    if result.stepMethod == 'array':
+                    if result.stepMethod == 'array' or result.stepMethod == 'grid':
                         yLabel += ', run: %s'%(i+1)
                     else:
                         yLabel += ', %s = %8.1e'%(result.stepVar, result.stepList[i])
@@ -844,7 +876,10 @@ def plotSweep(fileName, title, results, sweepStart, sweepStop, sweepNum, sweepVa
                             newTrace = trace([x, y])
                     elif funcType == 'onoise' or funcType == 'inoise':
                         if not ax.polar:
-                            y = makeNumData(yData, ini.frequency, x)
+                            if noiseData is not None:
+                                y = yData
+                            else:
+                                y = makeNumData(yData, ini.frequency, x)
                             newTrace = trace([x, y])
                     newTrace.color = ini.defaultColors[colNum % numColors]
                     colNum += 1
@@ -1003,7 +1038,7 @@ def plotPZ(fileName, title, results, xmin = None, xmax = None, ymin = None, ymax
                     polesTrace.label = 'poles ' + result.gainType
                 else:
                     polesTrace.label = 'poles ' + result.label
-                if result.stepMethod == 'array':
+                if result.stepMethod == 'array' or result.stepMethod == 'grid':
                     polesTrace.label += ', run: 1'
                 else:
                     polesTrace.label += ', %s = %8.1e'%(result.stepVar, result.stepList[0])
@@ -1026,7 +1061,7 @@ def plotPZ(fileName, title, results, xmin = None, xmax = None, ymin = None, ymax
                     polesTrace.label = 'poles ' + result.gainType
                 else:
                     polesTrace.label = 'poles ' + result.label
-                if result.stepMethod == 'array':
+                if result.stepMethod == 'array' or result.stepMethod == 'grid':
                     polesTrace.label += ', run: %s'%(len(poles))
                 else:
                     polesTrace.label += ', %s = %8.1e'%(result.stepVar, result.stepList[-1])
@@ -1053,7 +1088,7 @@ def plotPZ(fileName, title, results, xmin = None, xmax = None, ymin = None, ymax
                     polesTrace.label = 'poles ' + result.gainType
                 else:
                     polesTrace.label = 'poles ' + result.label
-                if result.stepMethod == 'array':
+                if result.stepMethod == 'array' or result.stepMethod == 'grid':
                     polesTrace.label += ', run: 1 ... %s'%(len(poles))
                 else:
                     polesTrace.label += ', %s = %8.1e ... %8.1e'%(result.stepVar, result.stepList[0], result.stepList[-1])
@@ -1077,7 +1112,7 @@ def plotPZ(fileName, title, results, xmin = None, xmax = None, ymin = None, ymax
                     zerosTrace.label = 'zeros ' + result.gainType
                 else:
                     zerosTrace.label = 'zeros ' + result.label
-                if result.stepMethod == 'array':
+                if result.stepMethod == 'array' or result.stepMethod == 'grid':
                     zerosTrace.label += ', run: 1'
                 else:
                     zerosTrace.label += ', %s = %8.1e'%(result.stepVar, result.stepList[0])
@@ -1099,7 +1134,7 @@ def plotPZ(fileName, title, results, xmin = None, xmax = None, ymin = None, ymax
                     zerosTrace.label = 'zeros ' + result.gainType
                 else:
                     zerosTrace.label = 'zeros ' + result.label
-                if result.stepMethod == 'array':
+                if result.stepMethod == 'array' or result.stepMethod == 'grid':
                     zerosTrace.label += ', run: %s'%(len(zeros))
                 else:
                     zerosTrace.label += ', %s = %8.1e'%(result.stepVar, result.stepList[-1])
@@ -1126,7 +1161,7 @@ def plotPZ(fileName, title, results, xmin = None, xmax = None, ymin = None, ymax
                     zerosTrace.label = 'zeros ' + result.gainType
                 else:
                     zerosTrace.label = 'zeros ' + result.label
-                if result.stepMethod == 'array':
+                if result.stepMethod == 'array' or result.stepMethod == 'grid':
                     zerosTrace.label += ', run: 1 ... %s'%(len(zeros))
                 else:
                     zerosTrace.label += ', %s = %8.1e ... %8.1e'%(result.stepVar, result.stepList[0], result.stepList[-1])
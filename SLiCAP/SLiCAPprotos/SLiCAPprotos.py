@@ -158,6 +158,20 @@ class circuit(object):
           reference node '0'.
         """
 
+        self.mnaTemplate = None
+        """
+        Stamped MNA matrix (*SLiCAPmatrices.mnaTemplate*) of the circuit,
+        created by **makeMatrices()**. It is discarded after a change of the
+        parameter definitions or of the circuit data.
+        """
+
+        self.parResolver = parResolver()
+        """
+        Resolver (*SLiCAPmath.parResolver*) with the stored fully-resolved
+        values of the parameters. It is synchronized with **self.parDefs**
+        before use.
+        """
+
     def delPar(self, parName):
         """
         Deletes a parameter definition and updates the list
@@ -176,6 +190,7 @@ class circuit(object):
         """
         self.parDefs.pop(sp.Symbol(str(parName)), None)
         self.parUnits.pop(sp.Symbol(str(parName)), None)
+        self.mnaTemplate = None
         self.updateParams()
         return
 
@@ -214,6 +229,7 @@ class circuit(object):
             parName = sp.Symbol(str(parName))
             parValue = checkExpression(parValue)
             self.parDefs[parName] = parValue
+            self.mnaTemplate = None
             if type(units) == str:
                 # ToDo: checkUnits() calculate wir SI units.
                 self.parUnits[parName] = units
@@ -256,6 +272,7 @@ class circuit(object):
                     parValue = str(parDict[key])
                     parValue = checkExpression(parValue)
                     self.parDefs[parName] = parValue
+                    self.mnaTemplate = None
                 else:
                     print("Error: cannot define a number as parameter.")
         else:
@@ -295,6 +312,8 @@ class circuit(object):
         >>> my_instr.symType = 'numeric'
         >>> my_instr.getParValues(['R', 'C'])
         """
+        if numeric:
+            self.parResolver.update(self.parDefs)
         if type(parNames) == list:
             parValues = {}
             for par in parNames:
@@ -302,14 +321,14 @@ class circuit(object):
                 for key in list(self.parDefs.keys()):
                     if par == key:
                         if numeric == True:
-                            parValues[par] = fullSubs(self.parDefs[key], self.parDefs)
+                            parValues[par] = self.parResolver.resolve(key)
                         else:
                            parValues[par] = self.parDefs[key]
             return parValues
         parNames = sp.Symbol(str(parNames))
         try:
             if numeric:
-                parValue = sp.N(fullSubs(self.parDefs[parNames], self.parDefs))
+                parValue = sp.N(fullSubs(self.parDefs[parNames], self.parResolver))
             else:
                 parValue = self.parDefs[parNames]
         except BaseException:
@@ -392,6 +411,8 @@ class circuit(object):
         >>> print my_instr.getElementValue(['R1', 'C1'])
         {'C1': 5.0e-7/pi, 'R1': 1000.00000000000}
         """
+        if numeric:
+            self.parResolver.update(self.parDefs)
         if type(elementID) == list:
             elementValues = {}
             for elID in elementID:
@@ -399,7 +420,7 @@ class circuit(object):
                     if param in list(self.elements[elID].params.keys()):
                         value = self.elements[elID].params[param]
                         if numeric:
-                            value = fullSubs(value, self.parDefs)
+                            value = fullSubs(value, self.parResolver)
                         elementValues[elID] = value
                     else:
                         print("Error: Parameter '{0}' undefined for element '{1}'.".format(param, elID))
@@ -411,7 +432,7 @@ class circuit(object):
                 if param in list(self.elements[elementID].params.keys()):
                     value = self.elements[elementID].params[param]
                     if numeric:
-                        value = fullSubs(value, self.parDefs)
+                        value = fullSubs(value, self.parResolver)
                     elementValues = value
                 else:
                     print("Error: Parameter '{0}' undefined for element '{1}'.".format(param, elementID))
@@ -1001,6 +1022,11 @@ class allResults(object):
         Laplace transfer functions.
         """
 
+        self.ac          = []
+        """
+        Numeric frequency responses (*SLiCAPnumeric.acResponse*).
+        """
+
         self.time        = []
         """
         Time-domain responses.
@@ -1127,6 +1153,15 @@ class allResults(object):
         the execution of the instruction. This instance will be a deep copy.
         """
 
+        self.stepGrid = []
+        """
+        List with the values (*numpy.ndarray*) of the step variables for step
+        method 'grid'.
+
+        Will be copied from **SLiCAPinstruction.instruction** at the start of
+        the execution of the instruction.
+        """
+
         self.source = None
         """
         Refdes of the signal source (independent v or i source).
@@ -1143,6 +1178,22 @@ class allResults(object):
         the execution of the instruction.
         """
 
+        self.sources = None
+        """
+        List with refdes of signal sources for the data type 'transfermatrix'.
+
+        Will be copied from **SLiCAPinstruction.instruction** at the start of
+        the execution of the instruction.
+        """
+
+        self.detectors = None
+        """
+        List with detectors for the data type 'transfermatrix'.
+
+        Will be copied from **SLiCAPinstruction.instruction** at the start of
+        the execution of the instruction.
+        """
+
         self.lgRef = None
         """
         Refdes of the controlled source that is assigned as loop gain reference.
@@ -1240,6 +1291,27 @@ class allResults(object):
         """
         return [str(var) for var in self.Dv]
 
+    def factorNoise(self):
+        """
+        Factors the noise spectra and their contributions obtained from a
+        noise analysis. The spectra are not factored during the execution of
+        the instruction. Stepped spectra that are stored as numeric
+        coefficient arrays (SLiCAPnumeric.steppedRational) are left unchanged.
+        """
+        def factorSpectrum(spectrum):
+            if type(spectrum) == list:
+                return [factorSpectrum(item) for item in spectrum]
+            elif hasattr(spectrum, 'evaluate'):
+                return spectrum
+            return sp.factor(spectrum)
+
+        self.onoise = factorSpectrum(self.onoise)
+        self.inoise = factorSpectrum(self.inoise)
+        for key in list(self.onoiseTerms.keys()):
+            self.onoiseTerms[key] = factorSpectrum(self.onoiseTerms[key])
+        for key in list(self.inoiseTerms.keys()):
+            self.inoiseTerms[key] = factorSpectrum(self.inoiseTerms[key])
+
 def makeDir(dirName):
     """
     Creates the directory 'dirName' if it does not yet exist.
@@ -7,6 +7,18 @@ Imported by the module **SLiCAPplots.py**.
 """
 from SLiCAP.SLiCAPlex import *
 
+MAXIMA_EOR = '<<SLiCAP_EOR %d>>'
+"""
+End-of-result sentinel printed by the Maxima function slicapEOR(id_) in
+SLiCAP_python.mac, id_ is the number of the instruction. The call of
+slicapEOR(id_) is part of the instruction itself (see **maximaRun()**).
+"""
+
+QUICKACK = getattr(socket, 'TCP_QUICKACK', None)
+"""
+Socket option for disabling delayed ACKs, only available on Linux.
+"""
+
 def start_new_thread(function):
     def decorator(*args, **kwargs):
         t = Thread(target=function, args=args, kwargs=kwargs)
@@ -22,8 +34,85 @@ def wait_until(somepredicate, timeout, period=0.25, *args, **kwargs):
     sleep(period)
   return False
 
+def splitMaxima(maxInstr):
+    """
+    Splits Maxima input into statements. Terminators and comments in strings
+    are not recognized as such; comments are removed.
+
+    :param maxInstr: Maxima input.
+    :type maxInstr: str
+
+    :return: List with tuples (statement, terminator); the terminator is ';'
+             or '$'. A statement without terminator at the end of the input
+             is terminated with ';'.
+    :rtype: list
+    """
+    statements = []
+    statement  = ''
+    i = 0
+    while i < len(maxInstr):
+        char = maxInstr[i]
+        if char == '"':
+            # String with backslash escapes
+            end = i + 1
+            while end < len(maxInstr) and maxInstr[end] != '"':
+                if maxInstr[end] == '\\':
+                    end += 1
+                end += 1
+            statement += maxInstr[i:end + 1]
+            i = end + 1
+        elif maxInstr[i:i + 2] == '/*':
+            end = maxInstr.find('*/', i + 2)
+            if end == -1:
+                end = len(maxInstr)
+            statement += ' '
+            i = end + 2
+        elif char == '\\':
+            statement += maxInstr[i:i + 2]
+            i += 2
+        elif char == ';' or char == '$':
+            if statement.strip() != '':
+                statements.append((statement.strip(), char))
+            statement = ''
+            i += 1
+        else:
+            statement += char
+            i += 1
+    if statement.strip() != '':
+        statements.append((statement.strip(), ';'))
+    return statements
+
+def maximaRun(maxInstr, count):
+    """
+    Returns the Maxima input that evaluates the statements of 'maxInstr' as
+    one expression and prints the end-of-result sentinel of instruction
+    'count' afterwards.
+
+    The results of statements terminated with ';' are printed. Maxima CAS
+    reads the complete expression before evaluating it; the answer to a
+    question during the evaluation is thus read from the input that follows
+    and can never be the request for the sentinel. Errors are caught, such
+    that the sentinel is printed after an error as well.
+
+    :param maxInstr: Maxima input.
+    :type maxInstr: str
+
+    :param count: Number of the instruction.
+    :type count: int
+
+    :return: Maxima input.
+    :rtype: str
+    """
+    statements = []
+    for statement, terminator in splitMaxima(maxInstr):
+        if terminator == ';':
+            statement = 'print(' + statement + ')'
+        statements.append(statement)
+    if len(statements) == 0:
+        statements = ['done']
+    return '(errcatch(' + ', '.join(statements) + '), slicapEOR(%d))$\n'%(count)
+
 class maximaHandler():
-    mut = Lock()
     active = False
 
     def __init__(self, port, host, maxima, timeout = 0.5):
@@ -31,6 +120,10 @@ class maximaHandler():
         self.HOST = host
         self.maxima = maxima
         self.timeout = timeout
+        self.count = 0
+        self.status = None
+        # Each handler has its own mutex, handlers in a pool run in parallel
+        self.mut = Lock()
 
     def __del__(self):
         self.active = False
@@ -49,7 +142,10 @@ class maximaHandler():
             s.bind((self.HOST, self.PORT))
             s.listen(1)
             self.conn, self.addr = s.accept()
-            self.conn.settimeout(self.timeout)
+            self.conn.setblocking(False)
+            self.conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.conn, selectors.EVENT_READ)
             # Release mutex such that other functions can grab the connection
             self.mut.release()
             self.active = True
@@ -64,17 +160,95 @@ class maximaHandler():
         self.startMaxima()
 
     def getResponse(self):
-        receive_data = ""
-        while True:
-            try:
-                while True:
-                    receive_data += self.conn.recv(4096).decode()
-            except BaseException:
-                pass
-            if receive_data != "":
+        """
+        Reads the response of Maxima CAS from the socket.
+
+        Reading stops when the end-of-result sentinel MAXIMA_EOR of the
+        current instruction is received, when Maxima CAS stays silent for
+        self.timeout seconds after sending a question, or after
+        ini.MaximaTimeOut seconds.
+
+        If Maxima CAS stays silent after reporting an error that was not
+        caught, such as a syntax error, the request for the sentinel is sent
+        again, because Maxima CAS did not evaluate it.
+
+        :return: Tuple with the response without the sentinel and the status:
+
+                 - 'result'  : the response is complete
+                 - 'question': Maxima CAS waits for an answer
+                 - 'timeout' : no complete response within ini.MaximaTimeOut
+                 - 'closed'  : Maxima CAS closed the connection
+
+        :rtype: tuple
+        """
+        eor     = (MAXIMA_EOR%(self.count)).encode()
+        data    = bytearray()
+        pos     = 0
+        resent  = False
+        mustend = time() + ini.MaximaTimeOut
+        status  = 'timeout'
+        while time() < mustend:
+            chunk = self.receive(self.timeout)
+            if chunk == b'':
+                # Connection closed by Maxima CAS
+                status = 'closed'
                 break
-        #print(receive_data.encode("utf-8"))
-        return receive_data
+            elif chunk != None:
+                data += chunk
+                # Only search the newly received part for the sentinel
+                end = data.find(eor, pos)
+                if end != -1:
+                    del data[end:]
+                    status = 'result'
+                    break
+                pos = max(0, len(data) - len(eor) + 1)
+            elif b'?' in data:
+                status = 'question'
+                break
+            elif not resent and (b'-- an error' in data or b'incorrect syntax' in data):
+                self.send(('\nslicapEOR(%d)$\n'%(self.count)).encode())
+                resent = True
+        return data.decode(), status
+
+    def send(self, data):
+        """
+        Sends data to Maxima CAS.
+
+        :param data: Data to be sent.
+        :type data: bytes
+        """
+        self.conn.sendall(data)
+
+    def receive(self, timeout):
+        """
+        Receives data from Maxima CAS.
+
+        :param timeout: Maximum time in seconds to wait for data.
+        :type timeout: float
+
+        :return: Received data, b'' if the connection has been closed, or
+                 None if no data has been received within the time-out.
+        :rtype: bytes, NoneType
+        """
+        if self.selector.select(timeout):
+            try:
+                chunk = self.conn.recv(65536)
+            except (BlockingIOError, socket.timeout):
+                return None
+            if QUICKACK:
+                # Do not delay the ACK, Maxima CAS may wait for it
+                self.conn.setsockopt(socket.IPPROTO_TCP, QUICKACK, 1)
+            return chunk
+        return None
+
+    def flush(self):
+        """
+        Discards data that is still pending, such as the input prompt that
+        Maxima CAS sends after the end-of-result sentinel.
+        """
+        chunk = self.receive(0)
+        while chunk:
+            chunk = self.receive(0)
 
     def parseMaxima(self, maxInstr):
         output = "ERROR"
@@ -83,13 +257,17 @@ class maximaHandler():
         wait_until(self.active, 2)
         self.mut.acquire() # Lock mutex, wait untill available
         #print(maxInstr.encode("utf-8"))
-        self.conn.sendall(maxInstr.encode("utf-8"))
+        self.flush()
+        # Let Maxima CAS print the sentinel after the instruction
+        self.count += 1
+        self.send(maximaRun(maxInstr, self.count).encode("utf-8"))
 
         # Check if a question is present?
         while True:
             # Grab the response
-            receive_data = self.getResponse()
-            if "?" in receive_data:
+            receive_data, status = self.getResponse()
+            self.status = status
+            if status == 'question':
                 while len(send_data) == 0:
                     send_data = input(receive_data.strip() + '\n>> ')
                     receive_data = ""
@@ -97,9 +275,10 @@ class maximaHandler():
                     send_data = 'quit();'
                 if len(send_data) > 0 and send_data[-1] != ';' and send_data[-1] != '$':
                     send_data += ';'
-                self.conn.sendall(send_data.encode())
+                self.send(send_data.encode())
                 if send_data == 'quit();' or send_data == 'quit()$':
                     break
+                send_data = ''
             else:
                 try:
                     output = receive_data.replace("\n","").replace("\\", "").split('"')[1]
@@ -107,7 +286,15 @@ class maximaHandler():
                 except IndexError:
                     output = "ERROR"
                     print(receive_data)
-                    print("""
+                    if status == 'timeout':
+                        print("""
+Maxima CAS did not return a result within %s seconds, this limit can be
+increased with: 'ini.MaximaTimeOut=nnn', where nnn is the number of seconds.
+"""%(ini.MaximaTimeOut))
+                    elif status == 'closed':
+                        print("\nMaxima CAS stopped during the evaluation of the instruction.\n")
+                    else:
+                        print("""
 Error in Maxima instruction!
 
 Known causes:
@@ -145,6 +332,310 @@ Known causes:
         result = self.parseMaxima(maxExpr)
         return result
 
+class MaximaPool():
+    """
+    Pool of Maxima CAS servers running on consecutive ports.
+
+    Each call to **MaximaPool.maxEval()** is handed to a server that is not
+    busy. Calls from different threads will thus be evaluated in parallel.
+
+    The pool provides the same methods as **maximaHandler**, and it is stored
+    in ini.maximaHandler by **startMaxima()**.
+    """
+    def __init__(self, size, port, host, maxima, timeout = 0.5):
+        self.size = max(1, int(size))
+        """
+        Number (*int*) of Maxima CAS servers in the pool.
+        """
+        self.handlers = [maximaHandler(port=port+i, host=host, maxima=maxima,
+                                       timeout=timeout) for i in range(self.size)]
+        """
+        List with the handlers (*maximaHandler*) of the servers.
+        """
+        self.free = Queue()
+        """
+        Queue with the handlers that are available for a calculation.
+        """
+
+    def __del__(self):
+        for handler in self.handlers:
+            handler.__del__()
+
+    def startMaxima(self):
+        """
+        Starts all servers of the pool.
+        """
+        for handler in self.handlers:
+            handler.startMaxima()
+            self.free.put(handler)
+
+    def restartMaxima(self):
+        """
+        Restarts all servers of the pool. Servers that are busy will be
+        restarted after finishing their calculation.
+        """
+        handlers = [self.free.get() for i in range(self.size)]
+        for handler in handlers:
+            handler.restartMaxima()
+        for handler in handlers:
+            self.free.put(handler)
+
+    def maxEval(self, maxExpr):
+        """
+        Evaluates the expression 'maxExpr' with the first available Maxima
+        CAS server of the pool and returns the result.
+
+        If the evaluation fails, this server will be restarted and the SLiCAP
+        Maxima functions will be loaded again.
+
+        :param maxExpr: Expression in Maxima format to be evaluated.
+        :type maxExpr: str
+
+        :return: String that can be converted into a sympy expression.
+        :rtype: str
+        """
+        handler = self.free.get()
+        try:
+            result = handler.maxEval(maxExpr)
+            if result == "ERROR":
+                handler.restartMaxima()
+                loadMaximaFunctions(handler)
+        finally:
+            self.free.put(handler)
+        return result
+
+class maximaSession(maximaHandler):
+    """
+    Long-lived Maxima CAS process that communicates through its standard
+    input and output. It is used if ini.socket == False, and it does not
+    require a TCP port.
+
+    The SLiCAP Maxima functions are loaded once at start-up. The process will
+    be restarted if it stopped, or if it did not return a result within
+    ini.MaximaTimeOut seconds.
+    """
+    def __init__(self, maxima, timeout = 0.5):
+        maximaHandler.__init__(self, None, None, maxima, timeout)
+        self.process = None
+
+    def __del__(self):
+        self.active = False
+        self.stopMaxima()
+
+    def readOutput(self, process, output):
+        """
+        Reads the output of the Maxima CAS process and puts it in the queue
+        'output'. Runs in a separate thread because reading from a pipe cannot
+        be done with a time-out on all platforms.
+        """
+        while True:
+            chunk = process.stdout.read(65536)
+            output.put(chunk)
+            if not chunk:
+                break
+
+    def startMaxima(self):
+        """
+        Starts the Maxima CAS process and loads the SLiCAP Maxima functions.
+        """
+        self.output = Queue()
+        self.process = subprocess.Popen([self.maxima, '--very-quiet'],
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, bufsize=0)
+        thread = Thread(target = self.readOutput, args = (self.process, self.output))
+        thread.daemon = True
+        thread.start()
+        self.active = True
+        if not loadMaximaFunctions(self):
+            print("Could not load the SLiCAP functions in Maxima CAS.")
+
+    def stopMaxima(self):
+        """
+        Stops the Maxima CAS process.
+        """
+        if self.process != None:
+            try:
+                self.process.kill()
+                self.process.wait()
+            except BaseException:
+                pass
+            self.process = None
+
+    def restartMaxima(self):
+        self.stopMaxima()
+        self.startMaxima()
+
+    def send(self, data):
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            # The process stopped, getResponse() will report it
+            pass
+
+    def receive(self, timeout):
+        try:
+            return self.output.get(timeout = timeout)
+        except Empty:
+            return None
+
+    def maxEval(self, maxExpr):
+        """
+        Evaluates the expression 'maxExpr' with Maxima CAS and returns the
+        result. Starts the Maxima CAS process if it is not running, and
+        restarts it after a crash or time-out.
+
+        :param maxExpr: Expression in Maxima format to be evaluated.
+        :type maxExpr: str
+
+        :return: String that can be converted into a sympy expression.
+        :rtype: str
+        """
+        if self.process == None or self.process.poll() != None:
+            self.restartMaxima()
+        result = self.parseMaxima(maxExpr)
+        if self.status in ['timeout', 'closed']:
+            self.restartMaxima()
+        return result
+
+class maximaCache():
+    """
+    Content-addressed on-disk cache with results of Maxima instructions.
+
+    Each result is stored in a file in the directory 'path'. The file name is
+    the SHA-256 hash of the instruction and the contents of SLiCAP_python.mac.
+    The instruction includes the setting of ini.assumePosMaxVars.
+
+    The modification time of a file is updated when its result is used. If
+    the total size of the files exceeds 'maxSize' bytes, the least recently
+    used results will be removed.
+    """
+    def __init__(self, path, maxSize):
+        self.path = path
+        """
+        Directory (*str*) with the cached results.
+        """
+        self.maxSize = maxSize
+        """
+        Maximum size in bytes (*int*) of the cache.
+        """
+        self.hits = 0
+        """
+        Number (*int*) of instructions of which the result was found in the
+        cache.
+        """
+        self.misses = 0
+        """
+        Number (*int*) of instructions that had to be evaluated by Maxima CAS.
+        """
+        self.mut = Lock()
+        f = open(ini.installPath + 'SLiCAPpythonMaxima/SLiCAP_python.mac', 'rb')
+        self.macHash = hashlib.sha256(f.read()).hexdigest()
+        f.close()
+        os.makedirs(self.path, exist_ok = True)
+        self.size = sum([os.path.getsize(self.path + fileName) for fileName in os.listdir(self.path)])
+
+    def key(self, maxExpr):
+        """
+        Returns the hash key of a Maxima instruction.
+
+        :param maxExpr: Expression in Maxima format.
+        :type maxExpr: str
+
+        :return: hash key
+        :rtype: str
+        """
+        return hashlib.sha256((self.macHash + maxExpr).encode("utf-8")).hexdigest()
+
+    def get(self, maxExpr):
+        """
+        Returns the cached result of a Maxima instruction.
+
+        :param maxExpr: Expression in Maxima format.
+        :type maxExpr: str
+
+        :return: Result, or None if the result has not been cached.
+        :rtype: str, NoneType
+        """
+        fileName = self.path + self.key(maxExpr)
+        try:
+            f = open(fileName, 'r')
+            result = f.read()
+            f.close()
+        except OSError:
+            # Not cached, or removed by another thread or process
+            with self.mut:
+                self.misses += 1
+            return None
+        try:
+            os.utime(fileName)
+        except FileNotFoundError:
+            pass
+        with self.mut:
+            self.hits += 1
+        return result
+
+    def put(self, maxExpr, result):
+        """
+        Stores the result of a Maxima instruction in the cache.
+
+        :param maxExpr: Expression in Maxima format.
+        :type maxExpr: str
+
+        :param result: Result of the instruction.
+        :type result: str
+        """
+        fileName = self.path + self.key(maxExpr)
+        with self.mut:
+            try:
+                f = open(fileName + '.tmp', 'w')
+                f.write(result)
+                f.close()
+                os.replace(fileName + '.tmp', fileName)
+                self.size += os.path.getsize(fileName)
+            except OSError:
+                return
+            if self.size > self.maxSize:
+                self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used results until the size of the cache is
+        below 90% of its maximum size.
+        """
+        files = []
+        for fileName in os.listdir(self.path):
+            try:
+                fileStat = os.stat(self.path + fileName)
+                files.append((fileStat.st_mtime, fileStat.st_size, fileName))
+            except OSError:
+                pass
+        files.sort()
+        self.size = sum([fileSize for mtime, fileSize, fileName in files])
+        for mtime, fileSize, fileName in files:
+            if self.size <= 0.9 * self.maxSize:
+                break
+            try:
+                os.remove(self.path + fileName)
+                self.size -= fileSize
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Removes all results from the cache and resets the counters.
+        """
+        with self.mut:
+            for fileName in os.listdir(self.path):
+                try:
+                    os.remove(self.path + fileName)
+                except OSError:
+                    pass
+            self.size   = 0
+            self.hits   = 0
+            self.misses = 0
+
 def maxLimit(expr, var, val, pm, numeric = True):
     """
     Calculates the limit of an expression for 'var' approaches 'val' from 'pm'.
@@ -224,12 +715,19 @@ def python2maxima(expr):
     """
     Converts a sympy expression into a Maxima expression.
 
-    :param expr: sympy expression
-    :type expr: sympy.Ex
+    :param expr: sympy expression or (sparse) matrix
+    :type expr: sympy.Expr, sympy.Matrix, sympy.SparseMatrix
 
     :return: maxima expression
     :rtype: str
     """
+    if isinstance(expr, sp.SparseMatrix):
+        # Only convert the nonzero entries into strings
+        rows, cols = expr.shape
+        text = [['0' for j in range(cols)] for i in range(rows)]
+        for (i, j), value in expr.todok().items():
+            text[i][j] = str(value)
+        expr = 'Matrix([[' + '], ['.join([', '.join(row) for row in text]) + ']])'
     expr = ' ' + str(expr) + ' ' # Add a space for expressions ending with pi, e, E or I
     # Remove extra brackets in matrix
     expr = re.sub(r'Matrix\(\[\[(.*)\]\]\)', r'matrix([\1])', expr)
@@ -319,50 +817,81 @@ def maxEval(maxExpr):
         maxExpr = "assume_pos:true$" + maxExpr
     else:
         maxExpr = "assume_pos:false$" + maxExpr
+    cache = getMaximaCache()
+    if cache != None:
+        result = cache.get(maxExpr)
+        if result != None:
+            return maxima2python(result)
     if ini.socket == True:
-        result = maxima2python(ini.maximaHandler.maxEval(maxExpr))
-        if result == "ERROR":
-            restartMaxima()
+        # The pool restarts a server if the evaluation failed
+        result = ini.maximaHandler.maxEval(maxExpr)
     else:
-        preambule = 'load("' + ini.installPath + 'SLiCAPpythonMaxima/SLiCAP_python.mac")$'
-        maxExpr = preambule + maxExpr
-        output = "ERROR"
+        if ini.maximaSession == None:
+            ini.maximaSession = maximaSession(maxima=ini.maxima, timeout=0.05)
+        result = ini.maximaSession.maxEval(maxExpr)
+    if cache != None and result != "ERROR":
+        cache.put(maxExpr, result)
+    return maxima2python(result)
+
+def getMaximaCache():
+    """
+    Returns the cache with results of Maxima instructions of the active
+    project. The cache is created if it does not exist.
+
+    :return: Cache, or None if ini.maximaCacheSize == 0.
+    :rtype: SLiCAPpythonMaxima.maximaCache, NoneType
+    """
+    if not ini.maximaCacheSize:
+        return None
+    path = ini.cachePath + 'maxima/'
+    if ini.maximaCache == None or ini.maximaCache.path != path:
         try:
-            output = subprocess.run([ini.maxima, '--very-quiet', '-batch-string', maxExpr], capture_output=True, timeout=ini.MaximaTimeOut, text=True)
-            result = output.stdout.split('"')[-2] # The quoted string is the result of the calculation
-            result = result.replace('\\\n', '')   # Remove the maxima newline characters from this result
-            result = maxima2python(result)        # Convert the maxima output into a string that can be 'sympified' by python
-        except BaseException:
-            exc_type, value, exc_traceback = sys.exc_info()
-            print('\n', value)
-            print("""\nMaxima CAS calculation failed or timed out. A time-out occurs if Maxima requires additional input, or if Maxima CAS requires more time.
-The latter case can be solved by increasing the time limit using the command: 'ini.MaximaTimeOut=nnn', where nnn is the number of seconds.\n""")
-            result = output
-            result = maxima2python(result)
-    return result
+            ini.maximaCache = maximaCache(path, int(ini.maximaCacheSize * 2**20))
+        except OSError:
+            print("Warning: could not create the Maxima cache in:", path)
+            return None
+    ini.maximaCache.maxSize = int(ini.maximaCacheSize * 2**20)
+    return ini.maximaCache
 
 def startMaxima():
-    ini.maximaHandler = maximaHandler(port=ini.PORT, host=ini.HOST, maxima=ini.maxima, timeout=0.05)
+    ini.maximaHandler = MaximaPool(ini.maximaPoolSize, port=ini.PORT, host=ini.HOST, maxima=ini.maxima, timeout=0.05)
     ini.maximaHandler.startMaxima()
     checkMaxima()
 
 def restartMaxima():
-    if ini.maximaHandler != None:
+    if ini.maximaHandler != None and ini.maximaHandler.size != ini.maximaPoolSize:
+        # Pool size has been changed: replace the pool
+        ini.maximaHandler.__del__()
+        sleep(2)
+        startMaxima()
+    elif ini.maximaHandler != None:
         ini.maximaHandler.restartMaxima()
         checkMaxima()
     else:
         startMaxima()
 
+def loadMaximaFunctions(handler):
+    """
+    Loads the SLiCAP Maxima functions into the Maxima CAS server of 'handler'.
+
+    :param handler: Handler of the Maxima CAS server.
+    :type handler: SLiCAPpythonMaxima.maximaHandler
+
+    :return: True if the server is active and the functions have been loaded.
+    :rtype: bool
+    """
+    # The end-of-result sentinel requires the SLiCAP Maxima functions, hence
+    # these functions are loaded with the first instruction.
+    result = handler.parseMaxima('load("' + ini.installPath + 'SLiCAPpythonMaxima/SLiCAP_python.mac")$M_:matrix([a,b],[c,d])$string(det(M_));kill(M_);')
+    return result == 'a*d-b*c'
+
 def checkMaxima():
-    result = ini.maximaHandler.maxEval('stringdisp:true$string(1-1);')
     try:
-        if result == '0':
-            result = ini.maximaHandler.maxEval('load("' + ini.installPath + 'SLiCAPpythonMaxima/SLiCAP_python.mac")$M_:matrix([a,b],[c,d])$string(det(M_));kill(M_);')
-            if result == 'a*d-b*c':
-                print("Maxima CAS client is active and functions have been uploaded.")
-            else:
-                ini.socket = False
-                print("Maxima CAS client is NOT active, switched to subprocess communication.")
+        active = True
+        for handler in ini.maximaHandler.handlers:
+            active = active and loadMaximaFunctions(handler)
+        if active:
+            print("Maxima CAS client is active and functions have been uploaded.")
         else:
             ini.socket = False
             print("Maxima CAS client is NOT active, switched to subprocess communication.")
@@ -376,6 +905,13 @@ if __name__ == '__main__':
 
     ini.socket = True
     startMaxima()
+    # Round-trip latency of the socket protocol
+    nCalls = 100
+    t0 = time()
+    for i in range(nCalls):
+        maxEval('string(1+1);')
+    t1 = time()
+    print("Round-trip latency of maxEval('string(1+1);'): %.3f ms"%(1000*(t1-t0)/nCalls))
     # ini.socket should not need to be global, classes are nice
     def test():
         x = sp.Symbol('x')
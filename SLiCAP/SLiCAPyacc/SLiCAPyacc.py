@@ -63,59 +63,372 @@ DEVICETYPES     = list(DEVICES.keys())
 # List with default SLiCAP libraries
 SLiCAPLIBS      = ['SLiCAP.lib', 'SLiCAPmodels.lib']
 
+class libraryDict(dict):
+    """
+    Dictionary with subcircuit or model definitions from libraries that are
+    compiled on first use.
+
+    The text of the definitions that have not yet been used is stored in the
+    index of the dictionary. A definition is parsed and checked when its name
+    is looked up for the first time; the compiled object then replaces the
+    text.
+
+    :param models: True if the dictionary holds model definitions, False if it
+                   holds subcircuit definitions.
+    :type models: bool
+    """
+    def __init__(self, models=False):
+        dict.__init__(self)
+        self.models = models
+        """
+        True (*bool*) if the dictionary holds model definitions.
+        """
+
+        self.index  = {}
+        """
+        Dictionary with the netlist text (*str*) of definitions that have not
+        yet been compiled; keys are the names of the subcircuits or models.
+        """
+
+    def __missing__(self, name):
+        if name in self.index:
+            compileLibraryEntry(self, name)
+        return dict.__getitem__(self, name)
+
+    def __contains__(self, name):
+        if name in self.index:
+            compileLibraryEntry(self, name)
+        return dict.__contains__(self, name)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """
+        Returns the names of the compiled and the uncompiled definitions.
+
+        :return: Names of the definitions
+        :rtype: list
+        """
+        return list(dict.keys(self)) + list(self.index.keys())
+
+    def clear(self):
+        """
+        Removes all compiled and uncompiled definitions.
+        """
+        dict.clear(self)
+        self.index.clear()
+
+    def define(self, name, text):
+        """
+        Adds the text of a definition to the index. It replaces an earlier
+        definition with the same name.
+
+        :param name: Name of the subcircuit or model
+        :type name: str
+
+        :param text: Netlist text of the definition
+        :type text: str
+        """
+        dict.pop(self, name, None)
+        self.index[name] = text
+
+    def merge(self, library):
+        """
+        Adds the compiled and uncompiled definitions of another library
+        dictionary without compiling them.
+
+        :param library: Library dictionary
+        :type library: SLiCAPyacc.libraryDict
+        """
+        for name, value in dict.items(library):
+            self.index.pop(name, None)
+            dict.__setitem__(self, name, value)
+        for name, text in library.index.items():
+            self.define(name, text)
+
 # SLiCAP built-in models
-SLiCAPMODELS    = {}
+SLiCAPMODELS    = libraryDict(models=True)
 
 # SLiCAP global parameters
 SLiCAPPARAMS    = {}
 
 # SLiCAP built-in subcircuits
-SLiCAPCIRCUITS  = {}
+SLiCAPCIRCUITS  = libraryDict()
 
 # User include files and library files
 USERLIBS        = []
 
 # User defined models from library files
-USERMODELS      = {}
+USERMODELS      = libraryDict(models=True)
 
 # User defined circuit from library files
-USERCIRCUITS    = {}
+USERCIRCUITS    = libraryDict()
 
 # User defined global parameters from library files
 USERPARAMS      = {}
 
+# Hash key of the compiled SLiCAP libraries
+SLiCAPLIBKEY    = None
+
+# Flattened circuits kept in memory, key: hash key of the netlist, value:
+# tuple with the hashes of the user libraries, the user libraries compiled
+# before and after flattening, and the pickled circuit object
+CIRCUITCACHE    = {}
+
+# Maximum number of flattened circuits kept in memory
+CIRCUITCACHESIZE = 32
+
+def libraryHash(fileName):
+    """
+    Returns the SHA-256 hash of the contents of a library file.
+
+    :param fileName: Path of the library file
+    :type fileName: str
+
+    :return: Hash of the file contents
+    :rtype: str
+    """
+    f = open(fileName, 'rb')
+    fileHash = hashlib.sha256(f.read()).hexdigest()
+    f.close()
+    return fileHash
+
+def loadLibraryCache(key):
+    """
+    Returns compiled library data from the library cache in the subdirectory
+    'libraries/' of ini.cachePath.
+
+    :param key: Hash key of the compiled library data
+    :type key: str
+
+    :return: Compiled library data, or None if it has not been cached or if
+             ini.libraryCache == False.
+    :rtype: tuple, NoneType
+    """
+    if not ini.libraryCache or ini.cachePath == None:
+        return None
+    return loadPickle(ini.cachePath + 'libraries/' + key + '.pickle')
+
+def saveLibraryCache(key, data):
+    """
+    Stores compiled library data in the library cache in the subdirectory
+    'libraries/' of ini.cachePath.
+
+    :param key: Hash key of the compiled library data
+    :type key: str
+
+    :param data: Compiled library data
+    :type data: tuple
+
+    :return: None
+    :rtype: NoneType
+    """
+    if not ini.libraryCache or ini.cachePath == None:
+        return
+    savePickle(ini.cachePath + 'libraries/', key + '.pickle', data)
+
+def loadPickle(fileName):
+    """
+    Returns the data from a pickled cache file.
+
+    :param fileName: Path of the file
+    :type fileName: str
+
+    :return: Data, or None if the file does not exist or cannot be read.
+    :rtype: object, NoneType
+    """
+    try:
+        f = open(fileName, 'rb')
+        data = pickle.load(f)
+        f.close()
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        data = None
+    return data
+
+def savePickle(path, fileName, data):
+    """
+    Writes data to a pickled cache file.
+
+    :param path: Directory of the file, it will be created if it does not
+                 exist.
+    :type path: str
+
+    :param fileName: Name of the file
+    :type fileName: str
+
+    :param data: Data
+    :type data: object
+
+    :return: None
+    :rtype: NoneType
+    """
+    fileName = path + fileName
+    try:
+        os.makedirs(path, exist_ok = True)
+        # Write to a temporary file first: other processes may read the cache
+        f = open(fileName + '.' + str(os.getpid()), 'wb')
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        f.close()
+        os.replace(fileName + '.' + str(os.getpid()), fileName)
+    except (OSError, pickle.PicklingError, RecursionError):
+        print("Warning: could not write the cache file:", fileName)
+
+def libraryIndex(netlist):
+    """
+    Scans the text of a library for subcircuit and model definitions, without
+    parsing them.
+
+    :param netlist: Text of the library
+    :type netlist: str
+
+    :return: Tuple with the text of the library without these definitions,
+             and two dictionaries with the text of the subcircuit definitions
+             and of the model definitions, respectively; keys are their names.
+    :rtype: tuple
+    """
+    rest = []
+    circuits = {}
+    models = {}
+    block = rest
+    depth = 0
+    for line in netlist.splitlines():
+        words = line.split()
+        if len(words) > 0:
+            cmd = words[0].lower()
+        else:
+            cmd = ''
+        if depth > 0:
+            # Subcircuit definition, may hold nested definitions
+            block.append(line)
+            if cmd == '.subckt':
+                depth += 1
+            elif cmd == '.ends':
+                depth -= 1
+        elif cmd == '.subckt' and len(words) > 1:
+            block = [line]
+            circuits[words[1]] = block
+            depth = 1
+        elif cmd == '.model' and len(words) > 1:
+            block = [line]
+            models[words[1]] = block
+        elif cmd == '' or cmd[0] in '+*;':
+            # Continuation lines and comments belong to the last definition
+            block.append(line)
+        else:
+            block = rest
+            rest.append(line)
+    circuits = {name: '\n'.join(circuits[name]) + '\n' for name in circuits.keys()}
+    models = {name: '\n'.join(models[name]) + '\n' for name in models.keys()}
+    return '\n'.join(rest) + '\n', circuits, models
+
+def compileLibrary(netlist, cirName, circuits, models, params):
+    """
+    Parses the global parameters and the library calls of a library, and adds
+    its subcircuit and model definitions to the indices of *circuits* and
+    *models*. These definitions will be compiled on first use.
+
+    :param netlist: Text of the library
+    :type netlist: str
+
+    :param cirName: Name of the library circuit
+    :type cirName: str
+
+    :param circuits: Library dictionary with subcircuit definitions
+    :type circuits: SLiCAPyacc.libraryDict
+
+    :param models: Library dictionary with model definitions
+    :type models: SLiCAPyacc.libraryDict
+
+    :param params: Dictionary with global parameter definitions
+    :type params: dict
+
+    :return: None
+    :rtype: NoneType
+    """
+    global CIRCUITNAMES
+    rest, cirIndex, modelIndex = libraryIndex(netlist)
+    depth = len(CIRCUITNAMES)
+    libCircuits = {}
+    parseNetlist(rest, cirName, libCircuits)
+    del CIRCUITNAMES[depth:]
+    for param in list(libCircuits[cirName].parDefs.keys()):
+        params[param] = libCircuits[cirName].parDefs[param]
+    for name in cirIndex.keys():
+        circuits.define(name, cirIndex[name])
+    for name in modelIndex.keys():
+        models.define(name, modelIndex[name])
+
+def compileLibraryEntry(library, name):
+    """
+    Parses and checks a subcircuit or model definition from the index of a
+    library dictionary and stores the result in this dictionary.
+
+    :param library: Library dictionary
+    :type library: SLiCAPyacc.libraryDict
+
+    :param name: Name of the subcircuit or model
+    :type name: str
+
+    :return: None
+    :rtype: NoneType
+    """
+    global CIRCUITNAMES
+    text = library.index.pop(name)
+    depth = len(CIRCUITNAMES)
+    libCircuits = {}
+    parseNetlist('"__library__"\n' + text, '__library__', libCircuits)
+    del CIRCUITNAMES[depth:]
+    libCircuit = libCircuits.pop('__library__')
+    if library.models:
+        for model in list(libCircuit.modelDefs.keys()):
+            dict.__setitem__(library, model, libCircuit.modelDefs[model])
+    else:
+        for cir in list(libCircuits.keys()):
+            dict.__setitem__(library, cir, libCircuits[cir])
+        # PASS 2
+        for cir in list(libCircuits.keys()):
+            checkReferences(libCircuits[cir])
+
 def compileSLiCAPLibraries():
     """
     Compiles the SLiCAP bult-in libraries and writes the subcircuit, models,
     and global parameters to SLiCAPCIRCUITS, SLiCAPMODELS, and SLiCAPPARAMS, 
-    respectively.
+    respectively. The subcircuits and models are compiled on first use.
+
+    If ini.libraryCache == True, the compiled libraries are loaded from the
+    library cache if the library files and the SLiCAP version did not change.
     
     :return: None
     :rtype: NoneType
     """
-    global SLiCAPCIRCUITS, SLiCAPMODELS, SLiCAPPARAMS
+    global SLiCAPCIRCUITS, SLiCAPMODELS, SLiCAPPARAMS, SLiCAPLIBKEY
+    hashes = [VERSION] + [libraryHash(ini.defaultLib + '/' + fi) for fi in SLiCAPLIBS]
+    SLiCAPLIBKEY = hashlib.sha256(' '.join(hashes).encode("utf-8")).hexdigest()
+    cached = loadLibraryCache(SLiCAPLIBKEY)
+    if cached != None:
+        SLiCAPCIRCUITS.merge(cached[0])
+        SLiCAPMODELS.merge(cached[1])
+        SLiCAPPARAMS.update(cached[2])
+        return
     for fi in SLiCAPLIBS:
         print("Compiling library: " + fi + ".")
         f = open(ini.defaultLib + '/' + fi, 'r')
         netlist = f.read()
         f.close()
         cirName  = fi.split('.')[0] 
-        parseNetlist(netlist, cirName, SLiCAPCIRCUITS)
-        for model in list(SLiCAPCIRCUITS[cirName].modelDefs.keys()):
-            SLiCAPMODELS[model] = SLiCAPCIRCUITS[cirName].modelDefs[model]
-        for param in list(SLiCAPCIRCUITS[cirName].parDefs.keys()):
-            SLiCAPPARAMS[param] = SLiCAPCIRCUITS[cirName].parDefs[param]
-        del SLiCAPCIRCUITS[cirName]
-    # PASS 2 and 3     
-    for cir in list(SLiCAPCIRCUITS.keys()):
-        checkReferences(SLiCAPCIRCUITS[cir])
-        #expandCircuit(SLiCAPCIRCUITS[cir])
+        compileLibrary(netlist, cirName, SLiCAPCIRCUITS, SLiCAPMODELS, SLiCAPPARAMS)
+    saveLibraryCache(SLiCAPLIBKEY, (SLiCAPCIRCUITS, SLiCAPMODELS, SLiCAPPARAMS))
 
 def compileUSERLibrary(fileName):
     """
     Parses a user library file and writes the subcircuit, models,
     and global parameters to USERCIRCUITS, USERPMODELS, and USERPARAMS, 
-    respectively.
+    respectively. The subcircuits and models are compiled on first use.
+
+    If ini.libraryCache == True, the results are loaded from the library
+    cache if this library, the libraries compiled before and the libraries
+    included by it did not change.
     
     :param fileName: Path of the library file
     
@@ -125,20 +438,145 @@ def compileUSERLibrary(fileName):
     :rtype: NoneType
     """
     global CIRCUITNAMES, USERCIRCUITS, USERPARAMS, USERMODELS
+    # The compiled data also depends on the libraries compiled before
+    hashes = [VERSION, str(SLiCAPLIBKEY)] + [lib + ' ' + libraryHash(lib) for lib in USERLIBS]
+    key = hashlib.sha256(' '.join(hashes).encode("utf-8")).hexdigest()
+    cached = loadLibraryCache(key)
+    if cached != None:
+        try:
+            valid = all([libraryHash(lib) == libHash for lib, libHash in cached[3]])
+        except OSError:
+            valid = False
+        if valid:
+            USERCIRCUITS.clear()
+            USERCIRCUITS.merge(cached[0])
+            USERMODELS.clear()
+            USERMODELS.merge(cached[1])
+            USERPARAMS.clear()
+            USERPARAMS.update(cached[2])
+            for lib, libHash in cached[3]:
+                if lib not in USERLIBS:
+                    USERLIBS.append(lib)
+            return
+    numLibs = len(USERLIBS)
     print("Compiling library: " + fileName + ".")
     f = open(fileName, 'r')
     netlist = f.read()
     f.close()
-    cirName  = '__library__'
-    parseNetlist(netlist, cirName, USERCIRCUITS)
-    for model in list(USERCIRCUITS[cirName].modelDefs.keys()):
-        USERMODELS[model] = USERCIRCUITS[cirName].modelDefs[model]
-    for param in list(USERCIRCUITS[cirName].parDefs.keys()):
-        USERPARAMS[param] = USERCIRCUITS[cirName].parDefs[param]
-    del USERCIRCUITS[cirName]
-    # PASS 2 and 3     
-    for cir in list(USERCIRCUITS.keys()):
-        checkReferences(USERCIRCUITS[cir])
+    compileLibrary(netlist, '__library__', USERCIRCUITS, USERMODELS, USERPARAMS)
+    # Libraries included by this library
+    libs = [(lib, libraryHash(lib)) for lib in USERLIBS[numLibs:]]
+    saveLibraryCache(key, (USERCIRCUITS, USERMODELS, USERPARAMS, libs))
+
+def circuitKey(netlist):
+    """
+    Returns the hash key of the flattened circuit of a netlist.
+
+    The key depends on the SLiCAP version and libraries, the paths used for
+    finding library files, and the netlist text. The user libraries are
+    checked by loadCircuitCache().
+
+    :param netlist: Text of the netlist
+    :type netlist: str
+
+    :return: Hash key
+    :rtype: str
+    """
+    hashes = [VERSION, str(SLiCAPLIBKEY), os.getcwd(), str(ini.circuitPath),
+              str(ini.libraryPath), str(ini.Laplace), str(ini.frequency), netlist]
+    return hashlib.sha256('\n'.join(hashes).encode("utf-8")).hexdigest()
+
+def loadCircuitCache(key):
+    """
+    Returns a flattened circuit from the circuit cache in memory, or from the
+    subdirectory 'circuits/' of ini.cachePath.
+
+    Each call returns a new copy of the circuit object, hence it can be
+    modified without affecting the cache.
+
+    :param key: Hash key of the flattened circuit
+    :type key: str
+
+    :return: Circuit object, or None if it has not been cached, if ini.circuitCache
+             == False, if one of the user libraries has changed, or if the
+             compiled user libraries differ from those before or after
+             flattening the cached circuit.
+    :rtype: SLiCAPprotos.circuit, NoneType
+    """
+    if not ini.circuitCache:
+        return None
+    if key in CIRCUITCACHE:
+        cached = CIRCUITCACHE[key]
+    elif ini.cachePath != None:
+        cached = loadPickle(ini.cachePath + 'circuits/' + key + '.pickle')
+    else:
+        cached = None
+    if cached == None:
+        return None
+    libs, libsBefore, libsAfter, data = cached
+    if USERLIBS != libsBefore and USERLIBS != libsAfter:
+        return None
+    try:
+        valid = all([libraryHash(lib) == libHash for lib, libHash in libs])
+    except OSError:
+        valid = False
+    if not valid:
+        CIRCUITCACHE.pop(key, None)
+        return None
+    storeCircuitCache(key, cached)
+    return pickle.loads(data)
+
+def saveCircuitCache(key, cir, libsBefore):
+    """
+    Stores a flattened circuit in the circuit cache in memory, and in the
+    subdirectory 'circuits/' of ini.cachePath, together with the hashes of
+    the user libraries.
+
+    :param key: Hash key of the flattened circuit
+    :type key: str
+
+    :param cir: Circuit object
+    :type cir: SLiCAPprotos.circuit
+
+    :param libsBefore: User libraries compiled before flattening the circuit
+    :type libsBefore: list
+
+    :return: None
+    :rtype: NoneType
+    """
+    if not ini.circuitCache:
+        return
+    try:
+        data = pickle.dumps(cir, pickle.HIGHEST_PROTOCOL)
+        libs = [(lib, libraryHash(lib)) for lib in USERLIBS]
+    except (OSError, pickle.PicklingError, RecursionError):
+        print("Warning: could not cache the circuit:", cir.title)
+        return
+    cached = (libs, libsBefore, list(USERLIBS), data)
+    storeCircuitCache(key, cached)
+    if ini.cachePath != None:
+        savePickle(ini.cachePath + 'circuits/', key + '.pickle', cached)
+
+def storeCircuitCache(key, cached):
+    """
+    Stores a cache entry in the circuit cache in memory. If the cache is full,
+    the least recently used entry is removed.
+
+    :param key: Hash key of the flattened circuit
+    :type key: str
+
+    :param cached: Tuple with the hashes of the user libraries, the user
+                   libraries compiled before and after flattening, and the
+                   pickled circuit object
+    :type cached: tuple
+
+    :return: None
+    :rtype: NoneType
+    """
+    CIRCUITCACHE.pop(key, None)
+    CIRCUITCACHE[key] = cached
+    while len(CIRCUITCACHE) > CIRCUITCACHESIZE:
+        del CIRCUITCACHE[next(iter(CIRCUITCACHE))]
 
 
 def parseNetlist(netlist, cirName = 'main', circuitDict = CIRCUITS):
@@ -639,10 +1077,10 @@ def checkElementModelParams(circuitObject, el):
         if elModel in list(circuitObject.modelDefs.keys()):
             modelParams = circuitObject.modelDefs[elModel].params
             basicModel =  circuitObject.modelDefs[elModel].type
-        elif elModel in list(USERMODELS.keys()):
+        elif elModel in USERMODELS:
             modelParams = USERMODELS[elModel].params
             basicModel = USERMODELS[elModel].type
-        elif elModel in list(SLiCAPMODELS.keys()):
+        elif elModel in SLiCAPMODELS:
             modelParams = SLiCAPMODELS[elModel].params
             basicModel = SLiCAPMODELS[elModel].type
         else:
@@ -702,10 +1140,10 @@ def checkSubCircuitElementModelParams(circuitObject, el):
         if el.model in list(circuitObject.circuits.keys()):
             validParams = circuitObject.circuits[el.model].params
             el.model = circuitObject.circuits[el.model]
-        elif el.model in list(USERCIRCUITS.keys()):
+        elif el.model in USERCIRCUITS:
             validParams = USERCIRCUITS[el.model].params
             el.model = USERCIRCUITS[el.model]
-        elif el.model in list(SLiCAPCIRCUITS.keys()):
+        elif el.model in SLiCAPCIRCUITS:
             validParams = SLiCAPCIRCUITS[el.model].params
             el.model = SLiCAPCIRCUITS[el.model]
         else:
@@ -730,48 +1168,144 @@ def expandCircuit(circuitObject):
     This functions flattens the hierarchy of circuitObject:
         
     1. Sub circuits and model expansions will be expanded and connected to 
-       the main circuit
+       the main circuit, at all levels of the hierarchy
     2. Parameter definitions will be updated:
 
+    The hierarchy is flattened in one pass. Elements are expanded in
+    breadth-first order: the elements of an expansion are appended to the
+    queue of elements that still need to be checked for expansion.
+
+    The elements of the prototype circuits are not copied. An expansion
+    template is made once for each prototype circuit, and each instance
+    creates new elements with its own nodes and parameters from it.
+
     :param circuitObject: SLiCAP circuit object to be expanded
     
     :return: SLiCAP circuit object of the expanded circuit
     :rtype: SLiCAP circuit object
     """
-    elNames = list(circuitObject.elements.keys())
-    for elName in elNames:
-        el = circuitObject.elements[elName]
-        if type(el.model) == circuit:
-            parentRefDes    = el.refDes
-            parentNodes     = el.nodes
-            prototypeNodes  = el.model.nodes
-            parentParams    = el.params
-            prototypeParams = el.model.params
-            parentParDefs   = circuitObject.parDefs
-            # Update the parameter definitions of the parent circuit
-            childParDefs  = el.model.parDefs
-            circuitObject.parDefs = updateParDefs(parentParDefs, childParDefs, parentParams, prototypeParams, parentRefDes)
-            for subElement in list(el.model.elements.keys()):
-                newElement = deepcopy(el.model.elements[subElement])
-                # Update the refDes
-                newElement.refDes = el.model.elements[subElement].refDes + '_' + el.refDes
-                # Update the nodes
-                newElement = updateNodes(newElement, parentNodes, prototypeNodes, parentRefDes)
-                # Update the parameters used in element expressions and in parameter definitions
-                newElement, newParDefs = updateElementParams(newElement, parentParams, prototypeParams, parentRefDes)
-                for key in list(newParDefs.keys()):
-                    if key not in list(circuitObject.parDefs.keys()):
-                        circuitObject.parDefs[key] = newParDefs[key]
-                # Apply hierarchy
-                if el.model.elements[subElement].model == circuit:
-                    circuitObject = expandCircuit(el.model.elements[subElement])
-                # Add the new element to the parent circuit
-                circuitObject.elements[newElement.refDes] = newElement
-            # Remove the parent element
-            del circuitObject.elements[elName]
+    templates = {}
+    elements  = {}
+    queue     = deque(circuitObject.elements.values())
+    while len(queue) > 0:
+        el = queue.popleft()
+        if type(el.model) != circuit:
+            elements[el.refDes] = el
+            continue
+        prototype = el.model
+        if id(prototype) not in templates:
+            templates[id(prototype)] = expansionTemplate(prototype)
+        template = templates[id(prototype)]
+        # Update the parameter definitions of the parent circuit
+        circuitObject.parDefs = updateParDefs(circuitObject.parDefs, template, el.params, el.refDes)
+        for subElement, params in template.elements:
+            newElement = element()
+            newElement.refDes = subElement.refDes + '_' + el.refDes
+            newElement.type   = subElement.type
+            newElement.refs   = list(subElement.refs)
+            newElement.model  = subElement.model
+            # Update the nodes
+            newElement.nodes  = updateNodes(subElement.nodes, el.nodes, template.nodePos, el.refDes)
+            # Update the parameters used in element expressions and in parameter definitions
+            newElement.params, newParDefs = updateElementParams(subElement.params, params, template, el.params, el.refDes)
+            for key in newParDefs:
+                if key not in circuitObject.parDefs:
+                    circuitObject.parDefs[key] = newParDefs[key]
+            # Expand the new element if it is a subcircuit or a model expansion
+            queue.append(newElement)
+    circuitObject.elements = elements
     return circuitObject
 
-def updateNodes(newElement, parentNodes, prototypeNodes, parentRefDes):
+class expansionTemplate(object):
+    """
+    Data of a prototype circuit that is shared by all its instances during
+    the expansion of a circuit.
+
+    :param prototype: Prototype circuit
+    :type prototype: SLiCAPprotos.circuit
+    """
+    def __init__(self, prototype):
+        self.prototype = prototype
+        """
+        Prototype circuit (*SLiCAPprotos.circuit*).
+        """
+
+        self.nodePos   = {}
+        """
+        (*dict*) with the nodes (*str*) of the prototype circuit as key and
+        their position (*int*) in its node list as value.
+        """
+
+        self.elements  = []
+        """
+        (*list*) with a tuple for each element of the prototype circuit: the
+        element object and a list with the parameters (*sympy.Symbol*) used
+        in its expressions and their names (*str*).
+        """
+
+        self.parDefParams = []
+        """
+        (*list*) with the parameters (*sympy.Symbol*) that are defined in the
+        prototype circuit or that are used in these definitions, and their
+        names (*str*).
+        """
+
+        self.scope     = {}
+        """
+        (*dict*) with the parameters (*sympy.Symbol*) of the element
+        expressions and the parameter definitions as key and a tuple as value
+        that tells how they are updated if they are not passed with the
+        instance, see expansionTemplate.lookup().
+        """
+
+        for i in range(len(prototype.nodes)):
+            if prototype.nodes[i] not in self.nodePos:
+                self.nodePos[prototype.nodes[i]] = i
+        for subElement in prototype.elements.values():
+            params = []
+            for parName in subElement.params:
+                params += list(subElement.params[parName].atoms(sp.Symbol))
+            self.elements.append((subElement, [(par, str(par)) for par in dict.fromkeys(params)]))
+        params = [sp.Symbol(parName) for parName in prototype.parDefs]
+        for parName in prototype.parDefs:
+            params += list(prototype.parDefs[parName].atoms(sp.Symbol))
+        self.parDefParams = [(par, str(par)) for par in dict.fromkeys(params)]
+
+    def lookup(self, parName, name):
+        """
+        Returns how a parameter that is not passed with an instance of the
+        prototype circuit is updated:
+
+        - ('value', <value>): it obtains the value given with the prototype
+          circuit
+        - ('global', <value>): it is defined in a user library or in a system
+          library
+        - ('keep', None): it is the Laplace or the frequency variable
+        - ('rename', None): it will receive the postfix: _<parentRefDes>
+
+        :param parName: Parameter
+        :type parName: sympy.Symbol
+
+        :param name: Name of the parameter
+        :type name: str
+
+        :return: Tuple with the update method and the value
+        :rtype: tuple
+        """
+        if parName not in self.scope:
+            if name in self.prototype.params:
+                self.scope[parName] = ('value', self.prototype.params[name])
+            elif name in USERPARAMS:
+                self.scope[parName] = ('global', USERPARAMS[name])
+            elif name in SLiCAPPARAMS:
+                self.scope[parName] = ('global', SLiCAPPARAMS[name])
+            elif parName == ini.Laplace or parName == ini.frequency:
+                self.scope[parName] = ('keep', None)
+            else:
+                self.scope[parName] = ('rename', None)
+        return self.scope[parName]
+
+def updateNodes(nodes, parentNodes, nodePos, parentRefDes):
     """
     Determines the nodes of a subcircuit element. 
     
@@ -781,32 +1315,34 @@ def updateNodes(newElement, parentNodes, prototypeNodes, parentRefDes):
        receive the name of the node of the pprototype circuit with the postfix
        _<refDes of parent element>.
     
-    :param newElement: Element of the subciorcuit that needs to be connected to
-                       the parent circuit.
-    :type newElement: SLiCAPprotos.element
+    :param nodes: Node list of the element of the prototype circuit
+    :type nodes: list
     
     :param parentNodes: Node list of the parent element.
     :type parentNodes: list
     
-    :param prototypeNodes: Node list of the prototype expansion (circuit)
-    :type prototypeNodes: list
+    :param nodePos: Dictionary with the nodes of the prototype expansion
+                    (circuit) as key and their position in its node list as
+                    value.
+    :type nodePos: dict
     
     :param parentRrefDes: Reference designator of the parent element
     :type parentRefDes: str
     
-    :return: newElement with updated node list
-    :rtype: SLiCAPprotos.element
+    :return: Node list of the new element
+    :rtype: list
     """
-    for i in range(len(newElement.nodes)):
-        if newElement.nodes[i] != '0':
-            try:
-                pos = prototypeNodes.index(newElement.nodes[i])
-                newElement.nodes[i] = parentNodes[pos]
-            except ValueError:
-                    newElement.nodes[i] += '_' + parentRefDes
-    return newElement
+    newNodes = []
+    for node in nodes:
+        if node == '0':
+            newNodes.append(node)
+        elif node in nodePos:
+            newNodes.append(parentNodes[nodePos[node]])
+        else:
+            newNodes.append(node + '_' + parentRefDes)
+    return newNodes
 
-def updateElementParams(newElement, parentParams, prototypeParams, parentRefDes):
+def updateElementParams(elementParams, params, template, parentParams, parentRefDes):
     """ 
     After expansion of the elements, the element parameters can be:
     'value'
@@ -833,61 +1369,95 @@ def updateElementParams(newElement, parentParams, prototypeParams, parentRefDes)
     #. Else: the parameter name will receive the postfix: _<parentRefDes)>.
     
     
-    :param newElement: Element of the subciorcuit that needs to be connected to
-                       the parent circuit.
-    :type newElement: SLiCAPprotos.element
-    
+    :param elementParams: Dictionary with the parameters of the element of the
+                          prototype circuit.
+    :type elementParams: dict
+
+    :param params: List with the parameters (*sympy.Symbol*) used in the
+                   expressions of elementParams and their names (*str*).
+    :type params: list
+
+    :param template: Expansion template of the prototype circuit
+    :type template: SLiCAPyacc.expansionTemplate
+
     :param parentParams: Dictionary with key-value pairs of parameters of the 
                          parent element:
         
                          - key *str*: name of the parameter
                          - value: *SympyExpression*: value or expression of
                            this parameter
-                           
-    :param prototypeParams: Dictionary with key-value pairs of parameters of
-                            the prototype circuit:
-        
-                            - key *str*: name of the parameter
-                            - value: *SympyExpression*: value or expression of
-                              this parameter
     
     :param parentRrefDes: Reference designator of the parent element
     :type parentRefDes: str
     
-    :return: newElement with updated node list
-    :rtype: SLiCAPprotos.element
+    :return: Tuple with the parameters of the new element and the parameter
+             definitions from libraries that are used in them.
+    :rtype: tuple
     """
-    parNames  = list(newElement.params.keys())
-    params    = []
     substDict = {}
     newParDefs = {}
-    for parName in parNames:
-        params += list(newElement.params[parName].atoms(sp.Symbol))
-    for parName in params:
-        if str(parName) in list(parentParams.keys()):
-            substDict[parName] = parentParams[str(parName)]
-        elif str(parName) in list(prototypeParams.keys()):
-            substDict[parName] = prototypeParams[str(parName)]
-        elif str(parName) in list(USERPARAMS.keys()):
-            newParDefs[parName] = USERPARAMS[str(parName)]
-            
-            # recursively add parameters from expression in parameter definition
-            # from USERPARAMS
-            
-        elif str(parName) in list(SLiCAPPARAMS.keys()):
-            newParDefs[parName] = SLiCAPPARAMS[str(parName)]
-            
-            # recursively add parameters from expression in parameter definition
-            # from SLiAPPARAMS
-            
-        elif parName != ini.Laplace and parName != ini.frequency:
-            substDict[parName] = sp.Symbol(str(parName) + '_' + parentRefDes)
+    for parName, name in params:
+        if name in parentParams:
+            substDict[parName] = parentParams[name]
+        else:
+            method, value = template.lookup(parName, name)
+            if method == 'value':
+                substDict[parName] = value
+            elif method == 'global':
+                newParDefs[parName] = value
+            elif method == 'rename':
+                substDict[parName] = sp.Symbol(name + '_' + parentRefDes)
     # Perform the full substitution in the parameter values of the element
-    for parName in parNames:
-        newElement.params[parName] = fullSubs(newElement.params[parName], substDict)
-    return newElement, newParDefs
+    recursive = recursiveSubs(substDict)
+    newParams = {}
+    for parName in elementParams:
+        newParams[parName] = paramSubs(elementParams[parName], substDict, recursive)
+    return newParams, newParDefs
+
+def recursiveSubs(substDict):
+    """
+    Returns True if one of the values of a substitution dictionary contains
+    one of its keys.
+
+    :param substDict: Substitution dictionary
+    :type substDict: dict
+
+    :return: True if the substitution must be repeated
+    :rtype: bool
+    """
+    for value in substDict.values():
+        if isinstance(value, sp.Symbol):
+            if value in substDict:
+                return True
+        elif isinstance(value, sp.Basic) and not value.is_Atom:
+            if not value.atoms(sp.Symbol).isdisjoint(substDict):
+                return True
+    return False
+
+def paramSubs(valExpr, substDict, recursive):
+    """
+    Returns valExpr after substitution of substDict. If recursive == False
+    one substitution gives the same result as fullSubs().
+
+    :param valExpr: Expression
+    :type valExpr: sympy.Expr
+
+    :param substDict: Substitution dictionary
+    :type substDict: dict
+
+    :param recursive: Result of recursiveSubs(substDict)
+    :type recursive: bool
+
+    :return: Expression after substitution
+    :rtype: sympy.Expr
+    """
+    if recursive:
+        return fullSubs(valExpr, substDict)
+    elif isinstance(valExpr, sp.Basic):
+        return valExpr.xreplace(substDict)
+    return valExpr
 
-def updateParDefs(parentParDefs, childParDefs, parentParams, prototypeParams, parentRefDes):
+def updateParDefs(parentParDefs, template, parentParams, parentRefDes):
     """  
     The parameter definitions of the parent circuit will be updated:
         
@@ -906,60 +1476,53 @@ def updateParDefs(parentParDefs, childParDefs, parentParams, prototypeParams, pa
        definitions of the parent circuit.
     #. Else: the parameter name will receive the postfix: _<parentRefDes)>.
     
-    :param newElement: Element of the subciorcuit that needs to be connected to
-                       the parent circuit.
-    :type newElement: SLiCAPprotos.element
-    
+    :param parentParDefs: Parameter definitions of the parent circuit
+    :type parentParDefs: dict
+
+    :param template: Expansion template of the prototype circuit
+    :type template: SLiCAPyacc.expansionTemplate
+
     :param parentParams: Dictionary with key-value pairs of parameters of the 
                          parent element:
         
                          - key *str*: name of the parameter
                          - value: *SympyExpression*: value or expression of
                            this parameter
-                           
-    :param prototypeParams: Dictionary with key-value pairs of parameters of
-                            the prototype circuit:
-        
-                            - key *str*: name of the parameter
-                            - value: *SympyExpression*: value or expression of
-                              this parameter
     
     :param parentRrefDes: Reference designator of the parent element
     :type parentRefDes: str
     
-    :return: newElement with updated node list
-    :rtype: SLiCAPprotos.element
+    :return: Updated parameter definitions of the parent circuit
+    :rtype: dict
     """
-    # Create a list with all parameters
-    allParams = list(childParDefs.keys())
-    allAtoms = []
-    for parName in allParams:
-        allAtoms += childParDefs[parName].atoms(sp.Symbol)
-    allParams = [sp.Symbol(par) for par in allParams]
-    allParams += allAtoms
+    childParDefs    = template.prototype.parDefs
+    prototypeParams = template.prototype.params
     substDictNames  = {}
     substDictValues = {}
-    for parName in allParams:
-        if parName != ini.Laplace and parName != ini.frequency:
-            if str(parName) in list(parentParams.keys()):
-                substDictValues[parName] = parentParams[str(parName)]
-            elif str(parName) in list(prototypeParams.keys()):
-                substDictValues[parName] = prototypeParams[str(parName)]
-            elif str(parName) in list(USERPARAMS.keys()):
-                parentParDefs = addParDefsParam(parName, parentParDefs)
-            elif str(parName) in list(SLiCAPPARAMS.keys()):
-                parentParDefs = addParDefsParam(parName, parentParDefs)
-            else :
-                substDictNames[parName] = sp.Symbol(str(parName) + '_' + parentRefDes)
-                substDictValues[parName] = sp.Symbol(str(parName) + '_' + parentRefDes)
-    for parName in list(childParDefs.keys()):
+    for parName, name in template.parDefParams:
+        if parName == ini.Laplace or parName == ini.frequency:
+            pass
+        elif name in parentParams:
+            substDictValues[parName] = parentParams[name]
+        else:
+            method, value = template.lookup(parName, name)
+            if method == 'value':
+                substDictValues[parName] = value
+            elif method == 'global':
+                parentParDefs = addParDefsParam(name, parentParDefs)
+            elif method == 'rename':
+                substDictNames[parName] = sp.Symbol(name + '_' + parentRefDes)
+                substDictValues[parName] = substDictNames[parName]
+    recursiveNames  = recursiveSubs(substDictNames)
+    recursiveValues = recursiveSubs(substDictValues)
+    for parName in childParDefs:
         """
         Add a child parameter definition to the parent parameter definitions if:
             - the parameter is not the Laplace or Fourier variable
             - the parameter is not in the prototype definition
         """
-        if sp.Symbol(parName) != ini.Laplace and sp.Symbol(parName) != ini.frequency and parName not in list(prototypeParams.keys()):
-            parentParDefs[fullSubs(sp.Symbol(parName), substDictNames)] = fullSubs(childParDefs[parName], substDictValues)
+        if sp.Symbol(parName) != ini.Laplace and sp.Symbol(parName) != ini.frequency and parName not in prototypeParams:
+            parentParDefs[paramSubs(sp.Symbol(parName), substDictNames, recursiveNames)] = paramSubs(childParDefs[parName], substDictValues, recursiveValues)
     return parentParDefs
 
 def addParDefsParam(parName, parDict):
@@ -975,13 +1538,13 @@ def addParDefsParam(parName, parDict):
     :rtype: dict
     """
     parName = str(parName)
-    if parName not in list(parDict.keys()):
-        if parName in list(USERPARAMS.keys()):
+    if parName not in parDict:
+        if parName in USERPARAMS:
             parDict[parName] = USERPARAMS[parName]
             newParams = list(USERPARAMS[parName].atoms(sp.Symbol))
             for newParam in newParams:
                 addParDefsParam(newParam, parDict)
-        elif parName in list(SLiCAPPARAMS.keys()):
+        elif parName in SLiCAPPARAMS:
             parDict[parName] = SLiCAPPARAMS[parName]
             newParams = list(SLiCAPPARAMS[parName].atoms(sp.Symbol))
             for newParam in newParams:
@@ -1011,61 +1574,62 @@ def updateCirData(circuitObject):
     :return: Updated circuit object
     :rtype: SLiCAPprotos.circuit
     """
+    # Discard the stamped MNA matrix
+    circuitObject.mnaTemplate = None
     # Convert *char* keys in the .parDefs attribute into sympy symbols.
     for key in list(circuitObject.parDefs.keys()):
         if type(key) == str:
             circuitObject.parDefs[sp.Symbol(key)] = circuitObject.parDefs[key]
             del(circuitObject.parDefs[key])
-    circuitObject.params =[]
+    circuitObject.params = []
     circuitObject.nodes = []
     circuitObject.depVars = []
     circuitObject.indepVars = []
-    for elmt in list(circuitObject.elements.keys()):
-        circuitObject.nodes += circuitObject.elements[elmt].nodes
-        if circuitObject.elements[elmt].type in INDEPSCRCS:
+    circuitObject.controlled = []
+    # Number of connections per node
+    connections = {}
+    for elmt in circuitObject.elements:
+        el = circuitObject.elements[elmt]
+        for node in el.nodes:
+            connections[node] = connections.get(node, 0) + 1
+        if el.type in INDEPSCRCS:
             circuitObject.indepVars.append(elmt)
-        elif circuitObject.elements[elmt].type in CONTROLLED:
+        elif el.type in CONTROLLED:
             circuitObject.controlled.append(elmt)
-        for i in range(len(MODELS[circuitObject.elements[elmt].model].depVars)):
-            depVar = MODELS[circuitObject.elements[elmt].model].depVars[i]
+        for depVar in MODELS[el.model].depVars:
             circuitObject.depVars.append(depVar + '_' + elmt)
         # Add parameters used in element expressions to circuit.params
-        for par in list(circuitObject.elements[elmt].params.keys()):
+        for par in el.params:
             try:
-                circuitObject.params += list(circuitObject.elements[elmt].params[par].atoms(sp.Symbol))
+                circuitObject.params += list(el.params[par].atoms(sp.Symbol))
             except:
                 pass
     # Add parameters used in parDef expressions to circuit.params
-    for par in list(circuitObject.parDefs.keys()):
+    for par in circuitObject.parDefs:
         circuitObject.params.append(par)
         circuitObject.params += list(circuitObject.parDefs[par].atoms(sp.Symbol))
     circuitObject.params = list(set(circuitObject.params))
     # Try to find required global parameter definitions for undefined params
-    for par in circuitObject.params:        
-        if par != ini.Laplace and par != ini.frequency and par not in list(circuitObject.parDefs.keys()):
-            if str(par) in list(SLiCAPPARAMS.keys()):
+    for par in circuitObject.params:
+        if par != ini.Laplace and par != ini.frequency and par not in circuitObject.parDefs:
+            if str(par) in SLiCAPPARAMS:
                 circuitObject.parDefs[par] = SLiCAPPARAMS[str(par)]
                 newParams = list(SLiCAPPARAMS[str(par)].atoms(sp.Symbol))
                 for newParam in newParams:
                     # Parameters in the expression of a global parameter also have a global definition
                     circuitObject.parDefs[newParam] = SLiCAPPARAMS[str(newParam)]
-        elif par == ini.Laplace or par == ini.frequency:
-            circuitObject.params.remove(par)
-    for par in circuitObject.parDefs.keys(): 
-        if par in circuitObject.params:
-            circuitObject.params.remove(par)
+    # Remove the Laplace variable, the frequency and the defined parameters
+    circuitObject.params = [par for par in circuitObject.params if par != ini.Laplace and par != ini.frequency and par not in circuitObject.parDefs]
     # check for two connections per node (warning)
-    connections = {i:circuitObject.nodes.count(i) for i in circuitObject.nodes}
-    for key in list(connections.keys()):
+    for key in connections:
         if connections[key] < 2:
             print("Warning less than two connections at node: '{0}'.".format(key))
-    # Remove duplicate entries from node list and sort the list."
-    circuitObject.nodes = list(set(circuitObject.nodes))
-    circuitObject.nodes.sort()
-    if '0' not in circuitObject.nodes:
+    # Sorted list of nodes without duplicates
+    circuitObject.nodes = sorted(connections.keys())
+    if '0' not in connections:
         circuitObject.errors += 1
         print("Error: could not find ground node '0'.")
-    nodeVoltages = ['V_' + circuitObject.nodes[i] for i in range(len(circuitObject.nodes))]
+    nodeVoltages = ['V_' + node for node in circuitObject.nodes]
     #circuitObject.depVars = nodeVoltages + circuitObject.depVars
     circuitObject.depVars += nodeVoltages
     circuitObject = createDepVarIndex(circuitObject)
@@ -1119,20 +1683,30 @@ def checkCircuit(fileName):
     f = open(fileName, 'r')
     netlist = f.read()
     f.close()
+    # Flattened circuits are only cached if they have no errors
+    key = circuitKey(netlist)
+    cached = loadCircuitCache(key)
+    if cached != None:
+        CIRCUITS['main'] = cached
+        ini.htmlPrefix = ('-'.join(CIRCUITS['main'].title.split()) + '_')
+        ini.htmlIndex = 'index.html'
+        htmlPage(CIRCUITS['main'].title, index = True)
+        return CIRCUITS['main']
+    libsBefore = list(USERLIBS)
     # Check the circuit
     # PASS 1
     parseNetlist(netlist) # Tokenize and parse the netlist to a nested circuit object
     # PASS 2
-    
+
     if CIRCUITS['main'].errors == 0:
         checkReferences(CIRCUITS['main']) # Complete all data, include libraries and replace models and circuits to be expanded with thei prototype circuit
         if CIRCUITS['main'].errors == 0:
             # PASS 3
             CIRCUITS['main'] = expandCircuit(CIRCUITS['main']) # Expand subcircuits and models
-            CIRCUITS['main'] = expandCircuit(CIRCUITS['main']) # Expand subcircuits and models
             # PASS 4
             CIRCUITS['main'] = updateCirData(CIRCUITS['main']) # Complete data for instructions
         if CIRCUITS['main'].errors == 0:
+            saveCircuitCache(key, CIRCUITS['main'], libsBefore)
             ini.htmlPrefix = ('-'.join(CIRCUITS['main'].title.split()) + '_')
             ini.htmlIndex = 'index.html'
             htmlPage(CIRCUITS['main'].title, index = True)
@@ -1156,6 +1730,39 @@ if __name__ == '__main__':
     compileSLiCAPLibraries()
     t1=time()
 
+    # Benchmark of expandCircuit() with generated netlists. Each instance of
+    # the subcircuit 'cell' has ten elements and four instances of the
+    # subcircuit 'tr' with ten elements each.
+    def benchmarkNetlist(nCells):
+        lines = ['"Expansion benchmark"',
+                 '.subckt cell in out I_D={10u}',
+                 '.subckt tr d g s g_m={1m} c_gs={1p}',
+                 '.param r_o={20/g_m} c_dg={c_gs/5}',
+                 'G1 d s g s {g_m}', 'R1 d s {r_o}', 'C1 g s {c_gs}',
+                 'C2 d g {c_dg}', 'R2 g 1 {10*r_o}', 'C3 1 s {c_gs/2}',
+                 'R3 d 1 {r_o}', 'C4 d s {c_dg}', 'R4 s 0 {1/g_m}',
+                 'C5 g 0 {c_gs/10}', '.ends',
+                 '.param g_m1={I_D/50m}',
+                 'X1 in 1 0 tr g_m={g_m1}', 'X2 1 2 0 tr g_m={2*g_m1}',
+                 'X3 2 3 0 tr c_gs={2p}', 'X4 3 out 0 tr',
+                 'R1 in 1 {R_b}', 'R2 1 2 {R_b}', 'R3 2 3 {R_b}',
+                 'R4 3 out {R_b}', 'C1 1 0 {C_b}', 'C2 2 0 {C_b}',
+                 'C3 3 0 {C_b}', 'C4 out 0 {C_b}', 'R5 in 0 {2*R_b}',
+                 'C5 in 0 {C_b}', '.ends',
+                 'V1 n0 0 V value={1}']
+        for i in range(nCells):
+            lines.append('X%d n%d n%d 0 cell I_D={%d*I_0}'%(i, i, i + 1, i + 1))
+        lines += ['R1 n%d 0 {R_L}'%(nCells), '.param R_b=1k C_b=1p I_0=1u R_L=10k', '.end']
+        return '\n'.join(lines) + '\n'
+
+    for nCells in [20, 200, 1000]:
+        parseNetlist(benchmarkNetlist(nCells))
+        checkReferences(CIRCUITS['main'])
+        t2 = time()
+        expanded = expandCircuit(CIRCUITS['main'])
+        t3 = time()
+        print("Expanded %d elements in %.2f s."%(len(expanded.elements), t3 - t2))
+
     fi = 'hierarchy.cir'
     ini.circuitPath = '/mnt/DATA/SLiCAP/SLiCAP_python_tests/basicTests/cir/'
     ini.libraryPath = '/mnt/DATA/SLiCAP/SLiCAP_python_tests/basicTests/lib/'
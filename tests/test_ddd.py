@@ -0,0 +1,55 @@
+import pytest
+
+from SLiCAP import *  # TODO: change imports when import chain is reworked
+import SLiCAP.SLiCAPddd as sd
+
+s = ini.Laplace
+R, C, g_m = sp.symbols('R C g_m')
+MATRIX = sp.Matrix([[1/R + s*C, -1/R, 0, 1],
+                    [-1/R, 2/R + s*C, -1/R, 0],
+                    [g_m, -1/R, 1/R + 2*s*C, 0],
+                    [0, 0, 1, 0]])
+
+
+def test_ddd():
+    D = sd.ddd(MATRIX)
+    det = MATRIX.det(method='berkowitz')
+    assert sp.cancel(D.evaluate() - det) == 0
+    assert sp.cancel(D.poly(s) - det) == 0
+    coeffs = D.coeffs(s)
+    assert len(coeffs) == 2
+    for k in range(2):
+        assert sp.cancel(coeffs[k] - sp.expand(det).coeff(s, k)) == 0
+    # Terms of the expanded determinant before cancellation
+    assert D.numTerms() == 3
+    assert sd.ddd(sp.Matrix([[1, 2], [2, 4]])).evaluate() == 0
+
+
+def test_ddd_dominantTerms():
+    values = {R: 1e3, C: 1e-9, g_m: 1e-2}
+    terms = sd.ddd(MATRIX).dominantTerms(values, num=4, var=s, order=0)
+    magnitudes = [abs(value) for term, value in terms]
+    assert magnitudes == sorted(magnitudes, reverse=True)
+    det = sp.expand(MATRIX.det(method='berkowitz'))
+    assert len(terms) == 2
+    assert sp.expand(terms[0][0]) == det.coeff(s, 0).coeff(g_m)*g_m
+
+
+def test_dddNumer():
+    Iv = sp.Matrix([0, 0, 0, sp.Symbol('V')])
+    diagram, sign = sd.dddNumer(MATRIX, Iv, 3, 1)
+    X = MATRIX.LUsolve(Iv)
+    expected = sp.cancel((X[2] - X[0])*MATRIX.det(method='berkowitz'))
+    assert sp.cancel(sign*diagram.evaluate() - expected) == 0
+
+
+def test_ddd_difference():
+    LG1, LG2 = sp.symbols('_LGREF_1 _LGREF_2')
+    M = MATRIX.copy()
+    M[2, 0] = LG1
+    M[1, 2] += LG2
+    values = {LG1: g_m, LG2: 2*g_m}
+    D_0, delta = sd.ddd(M).difference({LG1: 0, LG2: 0}, values)
+    D_M = M.subs(values).det(method='berkowitz')
+    assert sp.cancel(D_0 - M.subs({LG1: 0, LG2: 0}).det(method='berkowitz')) == 0
+    assert sp.cancel(D_0 + delta - D_M) == 0
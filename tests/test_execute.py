@@ -0,0 +1,41 @@
+import pytest
+
+from SLiCAP import *  # TODO: change imports when import chain is reworked
+import SLiCAP.SLiCAPexecute as se
+from types import SimpleNamespace
+
+
+def _stepLaplace(instr, result):
+    R = instr.parDefs[sp.Symbol('R')]
+    # Later steps finish first
+    sleep(0.01/R)
+    result.laplace.append(R*ini.Laplace)
+    result.onoiseTerms['R1'] = [R]
+    return result
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_stepInstruction(workers):
+    socket, stepWorkers = ini.socket, ini.stepWorkers
+    ini.socket, ini.stepWorkers = True, workers
+    try:
+        R = sp.Symbol('R')
+        values = [1, 2, 3, 4, 5, 6]
+        instr = SimpleNamespace(stepDict={R: values}, parDefs={R: 0})
+        result = se.stepInstruction(instr, allResults(), _stepLaplace)
+    finally:
+        ini.socket, ini.stepWorkers = socket, stepWorkers
+    assert result.laplace == [value*ini.Laplace for value in values]
+    assert result.onoiseTerms['R1'] == values
+    assert instr.parDefs[R] == values[-1]
+
+
+def test_setStepGrid():
+    stepGrid = [['lin', 0, 1, 3], ['1k', '2k']]
+    instr = instruction()
+    instr.setStepGrid(stepGrid)
+    assert instr.errors == 0
+    assert list(instr.stepGrid[0]) == [0, 0.5, 1]
+    assert list(instr.stepGrid[1]) == [1e3, 2e3]
+    # The specification itself is not converted
+    assert stepGrid == [['lin', 0, 1, 3], ['1k', '2k']]
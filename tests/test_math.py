@@ -44,6 +44,74 @@ def test_det_nonsq():
         (sp.Matrix([[1, 2], [-1, -2]]), sp.N(0)),
         (sp.Matrix([[1, 0, 0], [0, 1, 0], [0, 0, 1]]), sp.N(1)),
         (SYMBOLIC_MATRIX, DETERMINANT),
+        (sp.SparseMatrix(SYMBOLIC_MATRIX), DETERMINANT),
     ])
 def test_det(matrix, determinant):
     assert sp.simplify(sm.det(matrix) - determinant) == 0
+
+
+@pytest.mark.parametrize("method", ['ME', 'bareiss'])
+def test_det_method(method):
+    s, R, C = sp.symbols('s R C')
+    M = sp.Matrix([[1/R + s*C, -1/R, 0, 1],
+                   [-1/R, 2/R, -1/R, 0],
+                   [0, -1/R, 1/R + 2*s*C, 0],
+                   [1, 0, 0, 0]])
+    assert sp.cancel(sm.det(M, method=method) - M.det(method='berkowitz')) == 0
+    M[3, 0] = 0
+    assert sm.det(M, method=method) == 0
+
+
+def test_parResolver():
+    R, R_a, R_b, C, tau = sp.symbols('R R_a R_b C tau')
+    resolver = sm.parResolver({R_a: R, R_b: 2*R_a, tau: R_b*C,
+                               R: sp.Integer(1000), C: sp.Rational(1, 10**9)})
+    assert sm.fullSubs(tau, resolver) == sp.Rational(1, 500000)
+    assert resolver.dependencies(tau) == {tau, R_b, R_a, R, C}
+    # Only the values that depend on R are discarded
+    assert resolver.update({R_a: R, R_b: 2*R_a, tau: R_b*C,
+                            R: sp.Integer(10), C: sp.Rational(1, 10**9)}) == [R]
+    assert C in resolver.values and tau not in resolver.values
+    assert resolver.resolve(R_b) == 20
+    params, func = resolver.lambdify(['R'])
+    values = func(np.array([1e3, 2e3]))
+    assert values.shape == (len(params), 2)
+    assert list(values[params.index(tau)]) == pytest.approx([2e-6, 4e-6])
+
+
+def test_rationalResponse():
+    s = ini.Laplace
+    tau = 1e-3
+    H = 10*(1 - s*tau/4)/(1 + s*tau)
+    response = sm.makeRationalResponse(H)
+    assert sm.makeRationalResponse(H) is response
+    f = np.geomspace(1, 1e5, 11)
+    w = 2*np.pi*f if ini.Hz else f
+    expected = sp.lambdify(s, H)(1j*w)
+    assert sm.magFunc_f(H, f) == pytest.approx(np.abs(expected), rel=1e-12)
+    assert response.response(f) is response.response(list(f))
+    # Group delay of the pole and the right half plane zero
+    delay = tau/(1 + (w*tau)**2) + tau/4/(1 + (w*tau/4)**2)
+    assert sm.delayFunc_f(H, f) == pytest.approx(delay, rel=1e-12)
+    assert sm.makeRationalResponse(sp.exp(-s*tau)) is None
+    assert sm.makeRationalResponse(sp.Symbol('R')*s) is None
+
+
+def test_rationalResponse_scalar():
+    s = ini.Laplace
+    H = 10*(1 - s*1e-3/4)/(1 + s*1e-3)
+    f = np.geomspace(1, 1e5, 11)
+    for func in [sm.magFunc_f, sm.dBmagFunc_f, sm.phaseFunc_f, sm.delayFunc_f]:
+        values = func(H, f)
+        value = func(H, f[3])
+        assert np.ndim(value) == 0
+        assert float(value) == pytest.approx(values[3], rel=1e-12)
+    assert np.ndim(sm.makeRationalResponse(H).response(10.0)) == 0
+
+
+def test_phaseMargin():
+    s = ini.Laplace
+    mrgn, freq = sm.phaseMargin(1e3/(1 + s*1e-3)/(1 + s*1e-6))
+    assert np.ndim(mrgn) == 0 and np.ndim(freq) == 0
+    assert sm.magFunc_f(1e3/(1 + s*1e-3)/(1 + s*1e-6), freq) == pytest.approx(1, rel=1e-6)
+    assert float(mrgn) == pytest.approx(float(sm.phaseFunc_f(1e3/(1 + s*1e-3)/(1 + s*1e-6), freq)))
@@ -0,0 +1,48 @@
+import pytest
+
+from SLiCAP import *  # TODO: change imports when import chain is reworked
+import SLiCAP.SLiCAPmatrices as sm
+from types import SimpleNamespace
+
+
+def _element(refDes, model, nodes, value):
+    elmt = element()
+    elmt.refDes = refDes
+    elmt.type = refDes[0]
+    elmt.model = model
+    elmt.nodes = nodes
+    elmt.params = {'value': sp.sympify(value)}
+    return elmt
+
+
+def _circuit():
+    # Two RC sections driven by a voltage source
+    cir = circuit()
+    for elmt in (_element('V1', 'V', ['in', '0'], 1),
+                 _element('R1', 'R', ['in', 'a'], 'R'),
+                 _element('C1', 'C', ['a', '0'], 'C_a'),
+                 _element('R2', 'R', ['a', 'out'], '2*R'),
+                 _element('C2', 'C', ['out', '0'], 'C_b')):
+        cir.elements[elmt.refDes] = elmt
+    cir.parDefs = {sp.Symbol('R'): sp.Integer(1000), sp.Symbol('C_a'): sp.Symbol('C'),
+                   sp.Symbol('C_b'): sp.Rational(1, 10**9), sp.Symbol('C'): sp.Rational(1, 10**6)}
+    return updateCirData(cir)
+
+
+def test_makeMatrices_update():
+    cir = _circuit()
+    instr = SimpleNamespace(circuit=cir, parDefs=dict(cir.parDefs), numeric=True)
+    sm.makeMatrices(instr)
+    template = cir.mnaTemplate
+    assert template.index[sp.Symbol('C')] == {'C1'}
+    assert template.index[sp.Symbol('R')] == {'R1', 'R2'}
+    for par, value in ((sp.Symbol('C'), sp.Rational(1, 10**3)),
+                       (sp.Symbol('R'), sp.Integer(10))):
+        instr.parDefs[par] = value
+        M, Dv = sm.makeMatrices(instr)
+        assert cir.mnaTemplate is template
+        fresh = sm.mnaTemplate(cir, instr.parDefs, True).matrices()
+        assert M == fresh[0]
+        assert Dv == fresh[1]
+    cir.defPar('C_b', '1n')
+    assert cir.mnaTemplate is None
@@ -0,0 +1,135 @@
+import pytest
+
+from SLiCAP import *  # TODO: change imports when import chain is reworked
+import SLiCAP.SLiCAPpythonMaxima as sx
+
+
+def test_cache_get_put(tmp_path):
+    cache = sx.maximaCache(str(tmp_path) + '/', 2**20)
+    assert cache.get('string(1+1);') is None
+    cache.put('string(1+1);', '2')
+    assert cache.get('string(1+1);') == '2'
+    assert cache.get('string(1+2);') is None
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_cache_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    cache = sx.maximaCache(str(tmp_path) + '/', 2**20)
+    cache.put('a;', 'a')
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(cache.get, 1000*['a;', 'b;']))
+    assert results == 1000*['a', None]
+    assert cache.hits == 1000
+    assert cache.misses == 1000
+    # A result that is removed by another process is a miss
+    os.remove(str(tmp_path) + '/' + cache.key('a;'))
+    assert cache.get('a;') is None
+    assert cache.misses == 1001
+
+
+def test_cache_lru(tmp_path):
+    cache = sx.maximaCache(str(tmp_path) + '/', 1000)
+    cache.put('a;', 400*'a')
+    cache.put('b;', 400*'b')
+    # Use 'a' such that 'b' becomes the least recently used result
+    os.utime(str(tmp_path) + '/' + cache.key('b;'), (0, 0))
+    assert cache.get('a;') == 400*'a'
+    cache.put('c;', 400*'c')
+    assert cache.get('b;') is None
+    assert cache.get('a;') == 400*'a'
+    assert cache.get('c;') == 400*'c'
+    assert cache.size <= 1000
+
+
+def test_maxEval_cached(tmp_path):
+    cachePath, cacheSize = ini.cachePath, ini.maximaCacheSize
+    ini.cachePath = str(tmp_path) + '/'
+    ini.maximaCacheSize = 1
+    try:
+        cache = sx.getMaximaCache()
+        cache.put('assume_pos:true$string(x+y);', 'x+y')
+        assumePos, ini.assumePosMaxVars = ini.assumePosMaxVars, True
+        assert sx.maxEval('string(x+y);') == 'x+y'
+        ini.assumePosMaxVars = assumePos
+        assert cache.hits == 1
+    finally:
+        ini.cachePath, ini.maximaCacheSize = cachePath, cacheSize
+        ini.maximaCache = None
+
+
+def _maximaStub(conn):
+    """
+    Answers like 'maxima -s PORT' to instructions with asksign(a): the
+    question is answered with the next expression in the input, as Maxima
+    CAS does.
+    """
+    pending = []
+    def nextExpr():
+        data = ''
+        while len(pending) == 0:
+            chunk = conn.recv(65536)
+            if not chunk:
+                return None
+            data += chunk.decode()
+            if data.rstrip()[-1:] in [';', '$']:
+                pending.extend([stmt for stmt, term in sx.splitMaxima(data)])
+                data = ''
+        return pending.pop(0)
+    expr = nextExpr()
+    while expr != None:
+        if 'asksign(a)' in expr:
+            answer = None
+            while answer not in ['pos', 'neg', 'zero']:
+                conn.sendall(b'Is a positive, negative or zero?\n')
+                answer = nextExpr()
+                if answer == None:
+                    return
+            conn.sendall(b'"a"\n')
+        eor = re.search(r'slicapEOR\((\d+)\)', expr)
+        if eor:
+            conn.sendall(('\n' + sx.MAXIMA_EOR%(int(eor.group(1))) + '\n').encode())
+        expr = nextExpr()
+
+
+def test_parseMaxima_question(monkeypatch):
+    # TCP connection on the loopback interface, like 'maxima -s PORT'
+    server = socket.create_server(('127.0.0.1', 0))
+    stub = socket.create_connection(server.getsockname())
+    conn = server.accept()[0]
+    server.close()
+    Thread(target=_maximaStub, args=(stub,), daemon=True).start()
+    handler = sx.maximaHandler(None, None, None, timeout=0.05)
+    handler.conn = conn
+    handler.conn.setblocking(False)
+    handler.selector = selectors.DefaultSelector()
+    handler.selector.register(conn, selectors.EVENT_READ)
+    handler.active = True
+    monkeypatch.setattr(ini, 'MaximaTimeOut', 5)
+    monkeypatch.setattr('builtins.input', lambda prompt: 'pos')
+    try:
+        # The answer to the question must not consume the sentinel
+        t0 = time()
+        assert handler.parseMaxima('assume_pos:false$string(asksign(a));') == 'a'
+        assert handler.status == 'result'
+        assert time() - t0 < 2
+    finally:
+        conn.close()
+        stub.close()
+
+
+def test_maximaRun():
+    maxInstr = 'load("C:\\a;b$")$/* x; */M_:matrix([a,b],[c,d])$string(det(M_));'
+    assert sx.splitMaxima(maxInstr) == [('load("C:\\a;b$")', '$'),
+                                        ('M_:matrix([a,b],[c,d])', '$'),
+                                        ('string(det(M_))', ';')]
+    assert sx.maximaRun(maxInstr, 3) == ('(errcatch(load("C:\\a;b$"), M_:matrix([a,b],[c,d]), '
+                                         'print(string(det(M_)))), slicapEOR(3))$\n')
+
+
+def test_python2maxima_sparse():
+    s = ini.Laplace
+    M = sp.SparseMatrix(3, 3, {(0, 0): 1 + s, (1, 2): sp.Symbol('R'), (2, 1): -1})
+    assert sx.python2maxima(M) == sx.python2maxima(sp.Matrix(M))
+    assert sx.python2maxima(M).strip() == 'matrix([s + 1, 0, 0], [0, 0, R], [0, -1, 0])'
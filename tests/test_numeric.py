@@ -0,0 +1,239 @@
+import os
+import pytest
+
+from SLiCAP import *  # TODO: change imports when import chain is reworked
+import SLiCAP.SLiCAPnumeric as sn
+import SLiCAP.SLiCAPyacc as sy
+
+s = ini.Laplace
+
+
+def _assert_poly_close(coeffs, expr, rel=1e-9):
+    expected = sp.Poly(sp.expand(expr), s).all_coeffs()[::-1]
+    assert len(coeffs) == len(expected)
+    for c, e in zip(coeffs, expected):
+        assert float(c) == pytest.approx(float(e), rel=rel)
+
+
+def test_polyMatrix():
+    M = sp.Matrix([[1 + 2*s, -s**2], [0, sp.Rational(1, 4)]])
+    Mk = sn.polyMatrix(M)
+    assert Mk.shape == (3, 2, 2)
+    assert Mk[1, 0, 0] == 2
+    assert Mk[2, 0, 1] == -1
+    assert Mk[0, 1, 1] == 0.25
+    assert sn.polyMatrix(sp.Matrix([[1/s]])) is None
+    assert sn.polyMatrix(sp.Matrix([[sp.Symbol('R')*s]])) is None
+
+
+def test_numCramer_ladder():
+    # RC ladder with time constants spread over nine decades
+    g = [sp.Rational(1, 10**k) for k in (0, 3, 5, 2)]
+    c = [sp.Rational(1, 10**k) for k in (3, 12, 7, 9)]
+    n = len(g)
+    M = sp.zeros(n)
+    for i in range(n):
+        M[i, i] += g[i] + c[i]*s
+        if i + 1 < n:
+            M[i, i] += g[i + 1]
+            M[i + 1, i + 1] += g[i + 1]
+            M[i, i + 1] -= g[i + 1]
+            M[i + 1, i] -= g[i + 1]
+    b = sp.Matrix([1] + [0]*(n - 1))
+    D, N = sn.numCramer(sn.polyMatrix(M), sn.polyMatrix(b), sn.detectorRow(n, n, 1))
+    Mp = M.copy()
+    Mp[:, n - 1] = b
+    Mn = M.copy()
+    Mn[:, 0] = b
+    _assert_poly_close(D, M.det(method='berkowitz'))
+    _assert_poly_close(N[0][0], Mp.det(method='berkowitz') - Mn.det(method='berkowitz'))
+
+
+def test_numCramer_adjoint():
+    M = sp.Matrix([[2 + s, -1, 0], [-1, 3, -1], [0, -1, 1 + 2*s]])
+    B = sp.Matrix([[1, 0], [0, 1], [-1, s]])
+    D, N = sn.numCramer(sn.polyMatrix(M), sn.polyMatrix(B), sn.detectorRow(3, 3, 0))
+    X = M.LUsolve(B)
+    for j in range(2):
+        _assert_poly_close(N[0][j], sp.cancel(X[2, j]*M.det()))
+
+
+def test_absSquared():
+    f = ini.frequency
+    coeffs = [sp.Float(2), sp.Float(3), sp.Float(1)]
+    P = coeffs[0] + coeffs[1]*s + coeffs[2]*s**2
+    expected = sp.expand(P*P.subs(s, -s)).subs(s, sp.I*2*sp.pi*f)
+    value = sn.absSquared(coeffs, f)
+    for fx in (0.1, 1.0, 7.0):
+        assert float(value.subs(f, fx)) == pytest.approx(float(sp.re(expected.subs(f, fx))))
+
+
+def test_absSquared_symbolic():
+    f = ini.frequency
+    R, C = sp.symbols('R C')
+    P = R + R*C*s
+    value = sn.absSquared([R, R*C], f, numeric=False)
+    assert not value.has(sp.Float)
+    assert sp.expand(value - (P*P.subs(s, -s)).subs(s, sp.I*2*sp.pi*f)) == 0
+
+
+@pytest.mark.parametrize('M', [
+    sp.Matrix([[2 + s, -1, 0], [-1, 3, -1], [0, -1, 1 + 2*s]]),
+    sp.Matrix([[2 + s**2, -1, 0], [-1, 3, -1], [0, -1, 1 + 2*s]]),
+])
+def test_acResponse(M):
+    b = sp.Matrix([1, 0, s])
+    denom = 1 + s/10
+    response = sn.acResponse(sn.polyMatrix(M), sn.polyMatrix(b), sn.detectorRow(3, 3, 1),
+                             [1, sp.Rational(1, 10)])
+    assert (response.qz is None) == (M.has(s**2))
+    f = np.geomspace(0.01, 100, 7)
+    expected = sp.lambdify(s, (M.LUsolve(b)[2] - M.LUsolve(b)[0])/denom)(2j*np.pi*f)
+    assert response.response(f) == pytest.approx(expected, rel=1e-12)
+    assert response.mag(f) == pytest.approx(np.abs(expected), rel=1e-12)
+
+
+def test_steppedRational():
+    R, C = sp.symbols('R C')
+    function = 1/(1 + s*R*C + (s*R*C)**2/2)
+    stepDict = {R: [1e3, 2e3, 5e3], C: [1e-9, 1e-9, 2e-9]}
+    stepped = sn.makeSteppedRational(stepDict, function)
+    assert stepped.numer.shape == (3, 1)
+    assert stepped.denom.shape == (3, 3)
+    f = np.geomspace(1e3, 1e7, 5)
+    for i in range(3):
+        expected = sp.lambdify(s, function.subs({R: stepDict[R][i], C: stepDict[C][i]}))(2j*np.pi*f)
+        assert stepped.freqResponse(i).response(f) == pytest.approx(expected, rel=1e-12)
+        assert stepped.evaluate(2j*np.pi*f)[i] == pytest.approx(expected, rel=1e-12)
+        assert sp.lambdify(s, stepped[i])(2j*np.pi*f) == pytest.approx(expected, rel=1e-12)
+    assert stepped.roots()[0] == pytest.approx(np.roots([5e-13, 1e-6, 1])[::-1])
+    assert (stepped/2).numer == pytest.approx(stepped.numer/2)
+    # Other parameters or non-rational functions cannot be stepped in this way
+    assert sn.makeSteppedRational(stepDict, function*sp.Symbol('A')) is None
+    assert sn.makeSteppedRational(stepDict, sp.exp(-s*R*C)) is None
+
+
+def test_factorNoise_stepped():
+    R = sp.Symbol('R')
+    f = ini.frequency
+    result = allResults()
+    result.onoise = sn.makeSteppedRational({R: [1e3, 2e3]}, 4e-21*R/(1 + (f*R*1e-9)**2))
+    result.inoise = [f**2 + 2*f + 1]
+    result.onoiseTerms = {'I1': result.onoise}
+    result.factorNoise()
+    assert isinstance(result.onoise, sn.steppedRational)
+    assert result.onoiseTerms['I1'] is result.onoise
+    assert result.inoise == [(f + 1)**2]
+
+
+def test_steppedRational_grid():
+    R, C = sp.symbols('R C')
+    axes = [np.array([1e3, 2e3, 5e3]), np.array([1e-9, 1e-8])]
+    stepDict = {R: sn.gridAxis(axes, 0), C: sn.gridAxis(axes, 1)}
+    assert len(stepDict[R]) == 6
+    assert [float(value) for value in stepDict[C]] == [1e-9, 1e-8]*3
+    assert stepDict[R][-1] == 5e3
+    stepped = sn.makeSteppedRational(stepDict, 1/(1 + s*R*C))
+    assert stepped.gridCoeffs('denom').shape == (3, 2, 2)
+    f = np.array([1e3, 1e6])
+    values = stepped.gridValues(2j*np.pi*f)
+    assert values.shape == (3, 2, 2)
+    for i in range(3):
+        for j in range(2):
+            expected = 1/(1 + 2j*np.pi*f*axes[0][i]*axes[1][j])
+            assert values[i, j] == pytest.approx(expected, rel=1e-12)
+
+
+def test_monteCarlo():
+    R1, R2, C = sp.symbols('R1 R2 C')
+    gain = R2/(R1 + R2)
+    dists = {R1: ('normal', 1e3, 10), 'R2': ('normal', 1e3, 10)}
+    mc = sn.monteCarlo(gain, dists, nSamples=2*10**5, spec=(0.495, 0.505), samples=True,
+                       seed=1, chunk=30000)
+    assert mc.nSamples == 2*10**5
+    assert mc.samples.shape == (2*10**5, 1)
+    assert mc.mean[0] == pytest.approx(0.5, rel=1e-3)
+    assert mc.std[0] == pytest.approx(0.25*np.sqrt(2)*0.01, rel=2e-2)
+    assert mc.std[0] == pytest.approx(np.std(mc.samples), rel=1e-9)
+    assert mc.min[0] == np.min(mc.samples)
+    assert mc.yieldRatio == pytest.approx(0.8427, abs=1e-2)
+    # Parameters that share a sample
+    mc = sn.monteCarlo(gain, {(R1, R2): ('normal', 1e3, 10)}, nSamples=1000)
+    assert mc.std[0] == pytest.approx(0, abs=1e-12)
+    # Poles with fixed parameters from the parameter definitions
+    mc = sn.monteCarlo(1/(1 + s*R1*C), {R1: ('uniform', 900, 1100)}, quantity='poles',
+                       parDefs={C: 1e-9}, seed=2)
+    assert mc.mean[0].real == pytest.approx(-1e9*np.log(1100/900)/200, rel=1e-2)
+    assert mc.min is None
+    assert sn.monteCarlo(gain, {R1: ('normal', 1e3, 10)}) is None
+    # Factors s of the numerator and the denominator cancel at zero frequency
+    mc = sn.monteCarlo(s*R1/(s + s**2*R1*C), {R1: ('normal', 1e3, 10)}, quantity='gain',
+                       parDefs={C: 1e-9}, seed=3)
+    assert mc.mean[0] == pytest.approx(1e3, rel=1e-3)
+    mc = sn.monteCarlo(s*R1*C/(1 + s*R1*C), {R1: ('normal', 1e3, 10)}, quantity='gain',
+                       parDefs={C: 1e-9}, nSamples=100)
+    assert mc.max[0] == 0
+    assert sn.monteCarlo(1/(s*R1*C), {R1: ('normal', 1e3, 10)}, quantity='gain',
+                         parDefs={C: 1e-9}) is None
+
+
+def test_numEigs():
+    M = sp.Matrix([[2 + s, -1, 0], [-1, 3, -1], [0, -1, 1 + 2*s**2]])
+    b = sp.Matrix([1, 0, s])
+    lhs = sn.detectorRow(3, 3, 1)
+    poles = sn.numEigs(sn.polyMatrix(M))
+    expected = sp.Poly(M.det(), s).nroots()
+    assert len(poles) == len(expected)
+    for p in expected:
+        assert min(abs(poles - complex(p))) < 1e-12*abs(complex(p))
+    zeros = sn.numEigs(sn.augmentedMatrix(sn.polyMatrix(M), sn.polyMatrix(b), lhs))
+    numer = sp.cancel((M.LUsolve(b)[2] - M.LUsolve(b)[0])*M.det())
+    expected = sp.Poly(numer, s).nroots()
+    assert len(zeros) == len(expected)
+    for z in expected:
+        assert min(abs(zeros - complex(z))) < 1e-12*abs(complex(z))
+    DCgain = sn.numDCgain(sn.polyMatrix(M), sn.polyMatrix(b), lhs)
+    assert float(DCgain) == pytest.approx(float(numer.subs(s, 0)/M.det().subs(s, 0)))
+
+
+def test_transferMatrix(tmp_path, monkeypatch):
+    monkeypatch.setattr(ini, 'circuitPath', os.getcwd() + '/tests/test_files/')
+    monkeypatch.setattr(ini, 'cachePath', str(tmp_path) + '/')
+    monkeypatch.setattr(sy, 'htmlPage', lambda *args, **kwargs: None)
+    monkeypatch.setattr(sy, 'CIRCUITCACHE', {})
+    monkeypatch.setattr(ini, 'numEngine', True)
+    i1 = instruction()
+    i1.setCircuit('myFirstRCnetwork.cir')
+    i1.setGainType('gain')
+    i1.setDataType('transfermatrix')
+    i1.setSimType('numeric')
+    i1.setSources(['V1'])
+    i1.setDetectors(['V_out', ['V_1', 'V_out']])
+    result = i1.execute()
+    assert result.laplace.shape == (2, 1)
+    # Time constant R*C = 1/(2*pi*f_c), f_c = 1kHz
+    s_c = 2j*np.pi*1e3
+    assert complex(result.laplace[0, 0].subs(s, s_c)) == pytest.approx(1/(1 + 1j))
+    assert complex(result.laplace[1, 0].subs(s, s_c)) == pytest.approx(1j/(1 + 1j))
+
+
+def test_transferMatrix_ddd(tmp_path, monkeypatch):
+    import SLiCAP.SLiCAPexecute as se
+    monkeypatch.setattr(ini, 'circuitPath', os.getcwd() + '/tests/test_files/')
+    monkeypatch.setattr(ini, 'cachePath', str(tmp_path) + '/')
+    monkeypatch.setattr(sy, 'htmlPage', lambda *args, **kwargs: None)
+    monkeypatch.setattr(sy, 'CIRCUITCACHE', {})
+    monkeypatch.setattr(ini, 'numEngine', True)
+    monkeypatch.setattr(ini, 'dddEngine', True)
+    # The DDD engine is used if the numeric engine fails
+    monkeypatch.setattr(se, 'numCramer', lambda *args: None)
+    i1 = instruction()
+    i1.setCircuit('myFirstRCnetwork.cir')
+    i1.setGainType('gain')
+    i1.setDataType('transfermatrix')
+    i1.setSimType('numeric')
+    i1.setSources(['V1'])
+    i1.setDetectors(['V_out'])
+    result = i1.execute()
+    s_c = 2j*np.pi*1e3
+    assert complex(result.laplace[0, 0].subs(s, s_c)) == pytest.approx(1/(1 + 1j))
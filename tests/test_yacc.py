@@ -0,0 +1,188 @@
+import os
+import pytest
+
+from SLiCAP import *  # TODO: change imports when import chain is reworked
+import SLiCAP.SLiCAPyacc as sy
+
+USERLIB = """"userLib"
+.param R_u = {2*R_v} R_v = 1k
+.subckt divider 1 2 3 R_a={R_u} R_b={R_v}
+R1 1 2 {R_a}
+R2 2 3 {R_b}
+.ends
+"""
+
+
+@pytest.fixture
+def libraries(tmp_path, monkeypatch):
+    monkeypatch.setattr(ini, 'defaultLib', os.getcwd() + '/files/lib')
+    monkeypatch.setattr(ini, 'cachePath', str(tmp_path) + '/')
+    libs = [sy.SLiCAPCIRCUITS, sy.SLiCAPMODELS, sy.SLiCAPPARAMS,
+            sy.USERCIRCUITS, sy.USERMODELS, sy.USERPARAMS]
+    saved = [dict(lib) for lib in libs]
+    userLibs = list(sy.USERLIBS)
+    yield tmp_path
+    for lib, savedLib in zip(libs, saved):
+        lib.clear()
+        lib.update(savedLib)
+    sy.USERLIBS[:] = userLibs
+
+
+def test_libraryCache(libraries, monkeypatch):
+    libs = [sy.SLiCAPCIRCUITS, sy.SLiCAPMODELS, sy.SLiCAPPARAMS]
+    for lib in libs:
+        lib.clear()
+    sy.compileSLiCAPLibraries()
+    compiled = [dict(lib) for lib in libs]
+    assert os.listdir(libraries / 'libraries') == [sy.SLiCAPLIBKEY + '.pickle']
+    for lib in libs:
+        lib.clear()
+    # The cached libraries are not parsed again
+    parseNetlist = sy.parseNetlist
+    monkeypatch.setattr(sy, 'parseNetlist', None)
+    sy.compileSLiCAPLibraries()
+    assert [sorted(lib.keys()) for lib in libs] == [sorted(lib.keys()) for lib in compiled]
+    assert sy.SLiCAPPARAMS == compiled[2]
+    monkeypatch.setattr(sy, 'parseNetlist', parseNetlist)
+    assert sy.SLiCAPCIRCUITS['ABCD'].params == compiled[0]['ABCD'].params
+
+
+def test_userLibraryCache(libraries, monkeypatch):
+    fileName = str(libraries / 'user.lib')
+    with open(fileName, 'w') as f:
+        f.write(USERLIB)
+    sy.USERLIBS[:] = [fileName]
+    sy.compileUSERLibrary(fileName)
+    assert sy.USERPARAMS['R_u'] == 2*sp.Symbol('R_v')
+    assert 'divider' in sy.USERCIRCUITS
+    parseNetlist = sy.parseNetlist
+    monkeypatch.setattr(sy, 'parseNetlist', None)
+    sy.USERCIRCUITS.clear()
+    sy.USERPARAMS.clear()
+    sy.compileUSERLibrary(fileName)
+    assert sy.USERPARAMS['R_u'] == 2*sp.Symbol('R_v')
+    monkeypatch.setattr(sy, 'parseNetlist', parseNetlist)
+    assert sy.USERCIRCUITS['divider'].params == {'R_a': sp.Symbol('R_u'), 'R_b': sp.Symbol('R_v')}
+    # A modified library is compiled again
+    with open(fileName, 'w') as f:
+        f.write(USERLIB.replace('R_v = 1k', 'R_v = 2k'))
+    sy.compileUSERLibrary(fileName)
+    assert float(sy.USERPARAMS['R_v']) == 2000
+
+
+def test_libraryDict(libraries):
+    netlist = USERLIB + """.subckt tee 1 2 3 R={R_v}
+X1 1 2 3 divider R_a={R} R_b={R}
+R3 2 3 {R}
+.ends
+.model myOpamp OV
++ av = 100k ; voltage gain
++ zo = 20
+.end
+"""
+    rest, circuits, models = sy.libraryIndex(netlist)
+    assert sorted(circuits.keys()) == ['divider', 'tee']
+    assert list(models.keys()) == ['myOpamp']
+    assert '.subckt' not in rest and '+ zo' not in rest
+    circuitDict, modelDict, params = sy.libraryDict(), sy.libraryDict(models=True), {}
+    sy.compileLibrary(netlist, '__library__', circuitDict, modelDict, params)
+    assert float(params['R_v']) == 1000
+    assert dict.keys(circuitDict) == set() and sorted(circuitDict.keys()) == ['divider', 'tee']
+    # Only the subcircuit that is used is compiled
+    assert 'divider' in circuitDict
+    assert list(dict.keys(circuitDict)) == ['divider'] and list(circuitDict.index) == ['tee']
+    assert 'unknown' not in circuitDict
+    assert float(modelDict['myOpamp'].params['zo']) == 20
+    assert list(circuitDict.index) == ['tee']
+
+
+def test_circuitCache(libraries, monkeypatch):
+    monkeypatch.setattr(ini, 'circuitPath', str(libraries) + '/')
+    monkeypatch.setattr(sy, 'htmlPage', lambda *args, **kwargs: None)
+    monkeypatch.setattr(sy, 'CIRCUITCACHE', {})
+    fileName = str(libraries / 'user.lib')
+    with open(fileName, 'w') as f:
+        f.write(USERLIB)
+    with open(libraries / 'divider.cir', 'w') as f:
+        f.write('"divider"\n.lib user.lib\nV1 1 0 1\nX1 1 2 0 divider\n.end\n')
+    sy.USERLIBS[:] = []
+    cir = sy.checkCircuit('divider.cir')
+    assert cir.errors == 0
+    assert sorted(cir.elements.keys()) == ['R1_X1', 'R2_X1', 'V1']
+    assert os.listdir(libraries / 'circuits') == [key + '.pickle' for key in sy.CIRCUITCACHE]
+    # Cached circuits are not parsed again and can be modified independently
+    parseNetlist = sy.parseNetlist
+    monkeypatch.setattr(sy, 'parseNetlist', None)
+    cached = sy.checkCircuit('divider.cir')
+    assert cached is not cir and sorted(cached.elements.keys()) == sorted(cir.elements.keys())
+    del cached.elements['V1']
+    assert 'V1' in sy.checkCircuit('divider.cir').elements
+    # The disk cache is used by new sessions
+    sy.CIRCUITCACHE.clear()
+    assert 'V1' in sy.checkCircuit('divider.cir').elements
+    # A modified library invalidates the cached circuit
+    monkeypatch.setattr(sy, 'parseNetlist', parseNetlist)
+    sy.USERLIBS[:] = []
+    with open(fileName, 'w') as f:
+        f.write(USERLIB.replace('R1 1 2', 'R3 1 2'))
+    cir = sy.checkCircuit('divider.cir')
+    assert sorted(cir.elements.keys()) == ['R2_X1', 'R3_X1', 'V1']
+
+
+def test_expandCircuit():
+    netlist = """"nested"
+.subckt outer a b R={1k}
+.subckt mid a b R_m={2k}
+.subckt inner a b R_i={3k}
+R1 a b {R_i}
+.ends
+X1 a 1 inner R_i={R_m}
+R1 1 b {R_m}
+.ends
+X1 a 1 mid R_m={2*R}
+C1 1 b {C_x}
+.ends
+V1 in 0 V value={1}
+X1 in 0 outer R={R_0}
+.end
+"""
+    sy.parseNetlist(netlist)
+    cir = sy.CIRCUITS['main']
+    sy.checkReferences(cir)
+    assert cir.errors == 0
+    inner = cir.circuits['outer'].circuits['mid'].circuits['inner']
+    # All levels of the hierarchy are expanded in one pass
+    cir = sy.expandCircuit(cir)
+    assert list(cir.elements.keys()) == ['V1', 'C1_X1', 'R1_X1_X1', 'R1_X1_X1_X1']
+    R_0, C_x = sp.symbols('R_0 C_x_X1')
+    assert cir.elements['C1_X1'].nodes == ['1_X1', '0']
+    assert cir.elements['C1_X1'].params['value'] == C_x
+    assert cir.elements['R1_X1_X1'].nodes == ['1_X1_X1', '1_X1']
+    assert cir.elements['R1_X1_X1_X1'].nodes == ['in', '1_X1_X1']
+    assert cir.elements['R1_X1_X1_X1'].params['value'] == 2*R_0
+    # The prototype circuits are not modified
+    assert inner.elements['R1'].nodes == ['a', 'b']
+    assert inner.elements['R1'].params['value'] == sp.Symbol('R_i')
+
+
+def test_updateCirData():
+    netlist = """"update"
+V1 in 0 V value={V_s}
+R1 in out {R}
+E1 out 0 in 1 {A}
+C1 1 0 {C}
+.param R={1/(2*pi*f_c*C)} C=1n
+.end
+"""
+    sy.parseNetlist(netlist)
+    cir = sy.CIRCUITS['main']
+    sy.checkReferences(cir)
+    cir = sy.expandCircuit(cir)
+    for i in range(2):
+        cir = sy.updateCirData(cir)
+        assert cir.nodes == ['0', '1', 'in', 'out']
+        assert cir.indepVars == ['V1']
+        assert cir.controlled == ['E1']
+        assert cir.depVars == ['I_V1', 'Io_E1', 'V_0', 'V_1', 'V_in', 'V_out']
+        assert cir.varIndex == {'I_V1': 0, 'Io_E1': 1, '0': 2, '1': 3, 'in': 4, 'out': 5}
+        assert sorted(cir.params, key=str) == list(sp.symbols('A V_s f_c'))